@@ -1,3 +1,13 @@
-from .simple_sockets import TCPServer, TCPClient
-from .secure_sockets import SecureServer, SecureClient
+from .simple_sockets import TCPServer, TCPClient, TCPClientPool
+from .secure_sockets import SecureServer, SecureClient, SecureClientPool
+from .async_sockets import AsyncTCPServer, AsyncTCPClient, AsyncSecureServer, AsyncSecureClient
+from ._support_files.dispatch import Dispatcher
+from ._support_files.inbox import Inbox
+from ._support_files.prefork import ProcessGroup
+from ._support_files.compression import Compression
+from ._support_files.codec import Codec
+from ._support_files.reconnect import Reconnect
+from ._support_files.tracing import Tracer
+from ._support_files.sockopts import SocketOptions
+from ._support_files.coalesce import Coalesce
 from . import typehints
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from threading import Event as Event_
+from collections import deque
+from threading import Condition
 from typing import Union
 
 
@@ -28,22 +29,70 @@ class Event:
 
 @dataclass(frozen=False)
 class Event_System:
-    events: list = field(init=False, default_factory=list)
-    _lock: Event_ = field(init=False, default_factory=Event_, repr=False)
+    """
+    Thread safe event queue. Events are stored in a deque together with a sequence number, the amount of queued events
+    is counted per name, so `__contains__` and `clear_name()` are O(1): cleared events are skipped when they reach the
+    front of the queue. Waiting threads are woken up by a Condition.
+    """
+    _queue: deque = field(init=False, default_factory=deque, repr=False)  # (sequence number, event)
+    _counts: dict = field(init=False, default_factory=dict, repr=False)  # key: name, value: amount of queued events
+    _cleared: dict = field(init=False, default_factory=dict, repr=False)  # key: name, value: sequence number
+    _size: int = field(init=False, default=0, repr=False)
+    _sequence: int = field(init=False, default=0, repr=False)
+    _condition: Condition = field(init=False, default_factory=Condition, repr=False)
 
     def __bool__(self):
-        return len(self.events) > 0
+        return self._size > 0
 
     def __len__(self):
-        return len(self.events)
+        return self._size
 
     def __contains__(self, item):
-        return item in self.events
+        name = item.name if isinstance(item, Event) else item
+        return self._counts.get(name, 0) > 0
 
     def __iter__(self):
         for ev in self.events:
             yield ev
 
+    @property
+    def events(self) -> list:
+        """a list of the queued events"""
+        with self._condition:
+            return [ev for sequence, ev in self._queue if self._alive(sequence, ev)]
+
+    def count(self, name: str) -> int:
+        """
+        returns how many events with the given name are queued
+
+        Args:
+            name: name
+
+        Returns:
+            returns the amount of events
+        """
+        return self._counts.get(name, 0)
+
+    def _alive(self, sequence: int, event: Event) -> bool:
+        return sequence >= self._cleared.get(event.name, 0)
+
+    def _take(self, event: Event):
+        count = self._counts[event.name] - 1
+        if count:
+            self._counts[event.name] = count
+        else:
+            del self._counts[event.name]
+        self._size -= 1
+
+    def _drop_dead(self):
+        queue = self._queue
+        while queue and not self._alive(*queue[0]):
+            queue.popleft()
+
+    def _compact(self):
+        if len(self._queue) > 64 and len(self._queue) > 2 * self._size:
+            self._queue = deque(item for item in self._queue if self._alive(*item))
+
     def happened(self, event: Event):
         """
         adds an event to the event queue/list
@@ -55,8 +104,12 @@ class Event_System:
             TypeError: If event isn't a Event
         """
         if isinstance(event, Event):
-            self.events.append(event)
-            self._lock.set()
+            with self._condition:
+                self._queue.append((self._sequence, event))
+                self._sequence += 1
+                self._counts[event.name] = self._counts.get(event.name, 0) + 1
+                self._size += 1
+                self._condition.notify()
         else:
             raise TypeError(f"Type should be Event not {type(event)}")
 
@@ -67,8 +120,11 @@ class Event_System:
         Returns:
 
         """
-        self.events.clear()
-        self._lock.clear()
+        with self._condition:
+            self._queue.clear()
+            self._counts.clear()
+            self._cleared.clear()
+            self._size = 0
 
     def first_event(self, pop: bool = True) -> Union[Event, None]:
         """
@@ -81,16 +137,30 @@ class Event_System:
             Returns an event if one was collected else None
 
         """
-        if self:
+        with self._condition:
+            self._drop_dead()
+            if not self._queue:
+                return
             if pop:
-                pop_ = self.events.pop(0)
-                if self is False:
-                    self._lock.clear()
-                return pop_
-            else:
-                return self.events[0]
-        else:
-            return
+                sequence, ev = self._queue.popleft()
+                self._take(ev)
+                return ev
+            return self._queue[0][1]
+
+    def next_event(self, timeout: Union[int, float] = None) -> Union[Event, None]:
+        """
+        waits till an event occurs and pops it
+
+        Args:
+            timeout: timeout in milliseconds
+
+        Returns:
+            Returns the first event or None if the timeout expired
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.__bool__, None if timeout is None else timeout / 1000):
+                return
+            return self.first_event()
 
     def remove(self, event: Event):
         """
@@ -99,12 +169,16 @@ class Event_System:
         Args:
             event: event to be removed
 
-        Returns:
-
+        Raises:
+            ValueError: if the event isn't queued
         """
-        self.events.remove(event)
-        if self is False:
-            self._lock.clear()
+        with self._condition:
+            for index, (sequence, ev) in enumerate(self._queue):
+                if ev == event and self._alive(sequence, ev):
+                    del self._queue[index]
+                    self._take(ev)
+                    return
+        raise ValueError("the event isn't queued")
 
     def pop(self, index: int) -> Event:
         """
@@ -116,11 +190,30 @@ class Event_System:
         Returns:
             returns the event at the given index
 
-        """
-        pop = self.events.pop(index)
-        if self is False:
-            self._lock.clear()
-        return pop
+        Raises:
+            IndexError: if no event is queued at the index
+        """
+        with self._condition:
+            queue = self._queue
+            self._drop_dead()
+            while queue and not self._alive(*queue[-1]):
+                queue.pop()
+            if len(queue) != self._size:  # cleared events are left in the middle, the index has to skip them
+                if index < 0:
+                    index += self._size
+                if not 0 <= index < self._size:
+                    raise IndexError("event index out of range")
+                alive = (position for position, item in enumerate(queue) if self._alive(*item))
+                index = next(position for count, position in enumerate(alive) if count == index)
+            if index == 0:
+                sequence, ev = queue.popleft()
+            elif index == -1:
+                sequence, ev = queue.pop()
+            else:
+                sequence, ev = queue[index]
+                del queue[index]
+            self._take(ev)
+            return ev
 
     def await_event(self, timeout: Union[int, float] = None) -> bool:
         """
@@ -133,21 +226,8 @@ class Event_System:
             Returns True if an event occurred
 
         """
-        while True:
-            if timeout is None:
-                r = self._lock.wait()
-            else:
-                r = self._lock.wait(timeout / 1000)
-            if self and r:
-                break
-            elif r is not True:
-                break
-            else:
-                self._lock.clear()
-        if r:
-            return True
-        else:
-            return False
+        with self._condition:
+            return self._condition.wait_for(self.__bool__, None if timeout is None else timeout / 1000)
 
     def clear_name(self, name: str):
         """
@@ -156,8 +236,10 @@ class Event_System:
         Args:
             name: name
         """
-        events = self.events.copy()
-        for ev in events:
-            if ev.name == name:
-                self.remove(ev)
-        self.events = events
+        with self._condition:
+            count = self._counts.pop(name, 0)
+            if not count:
+                return
+            self._size -= count
+            self._cleared[name] = self._sequence
+            self._compact()
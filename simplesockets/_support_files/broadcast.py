@@ -0,0 +1,127 @@
+import selectors
+import socket
+import threading
+from collections import deque
+
+from simplesockets._support_files.error import SetupError
+from simplesockets._support_files.framing import send_buffers
+
+#: flag for a non-blocking send on a blocking socket, Windows doesn't have it, so the Broadcaster isn't available there
+MSG_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0)
+
+_WAKEUP = object()
+
+
+class Broadcaster:
+    """
+    Writes frames to the blocking sockets of the threaded engine without blocking the caller. A frame is first written
+    with MSG_DONTWAIT, the rest is queued in the outbox of the client and written by one thread, which waits with
+    `selectors` till the sockets are writeable again. So a slow client doesn't stall the sending to the others.
+
+    The sockets are shared with the receiving threads, so they can't be switched to non-blocking mode. Without
+    MSG_DONTWAIT (on Windows) the Broadcaster can't be created, the selector engine broadcasts without it.
+    """
+
+    def __init__(self):
+        """
+        Raises:
+            SetupError: if the platform doesn't support MSG_DONTWAIT
+        """
+        if not MSG_DONTWAIT:
+            raise SetupError("broadcasting without blocking on slow clients needs MSG_DONTWAIT, which this platform "
+                             "doesn't support, use the selector engine: setup(engine=\"selector\")")
+        self.selector = selectors.DefaultSelector()
+        self._calls = deque()
+        self._closed = False
+
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.selector.register(self._wakeup_r, selectors.EVENT_READ, _WAKEUP)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, client, buffers: list) -> None:
+        """
+        sends the buffers of a frame to the client, the caller has to hold `client._send_lock`
+
+        Args:
+            client: the Server_Client
+            buffers: the buffers of the frame
+        """
+        outbox = client._outbox
+        if not outbox:
+            buffers = deque(buffers)
+            send_buffers(client.socket, buffers, MSG_DONTWAIT, client.metrics)
+            if not buffers:
+                return
+            outbox.extend(buffers)
+            self._calls.append(client)
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                pass
+        else:
+            outbox.extend(buffers)
+
+    def _run(self):
+        try:
+            while not self._closed:
+                for key, mask in self.selector.select(0.5):
+                    if key.data is _WAKEUP:
+                        try:
+                            while self._wakeup_r.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                    else:
+                        self._flush(key)
+                while self._calls:
+                    self._watch(self._calls.popleft())
+        finally:
+            self.selector.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _watch(self, client):
+        fd = client.socket.fileno()
+        if fd == -1:  # the socket got closed
+            with client._send_lock:
+                client._outbox.clear()
+            return
+        try:
+            key = self.selector.get_key(fd)
+        except KeyError:
+            key = None
+        if key is not None:
+            if key.data is client:
+                return
+            self.selector.unregister(fd)  # a closed socket which had the same file descriptor
+        try:
+            self.selector.register(fd, selectors.EVENT_WRITE, client)
+        except OSError:  # the socket got closed in the meantime
+            with client._send_lock:
+                client._outbox.clear()
+
+    def _flush(self, key):
+        client = key.data
+        with client._send_lock:
+            try:
+                done = client._outbox.send(client.socket, MSG_DONTWAIT, client.metrics)
+            except OSError:  # the disconnect is noticed by the thread of the client
+                client._outbox.clear()
+                done = True
+            if done:
+                self.selector.unregister(key.fd)
+
+    def close(self) -> None:
+        """
+        stops the writing thread
+        """
+        self._closed = True
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            pass
+        self._thread.join(5)
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class Coalesce:
+    """
+    Settings of the write coalescing of a Client. Messages aren't written right away but collected, till `max_bytes`
+    are buffered or the oldest buffered message waited `max_delay` seconds, then all of them are written with one
+    `socket.sendmsg()` call. It saves syscalls and TCP segments when many small messages are send, at the cost of up to
+    `max_delay` latency. `Client.flush()` writes the buffered messages right away. With reconnect settings, buffered
+    messages which weren't written when the connection was lost are send again after reconnecting.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024, max_delay: float = 0.0002):
+        """
+        Args:
+            max_bytes: size of the buffered frames in bytes at which they are written
+            max_delay: seconds a message waits at most before it's written, e.g. 0.0002 for 200µs
+
+        Raises:
+            ValueError: if a setting is out of range
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if max_delay <= 0:
+            raise ValueError("max_delay must be positive")
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+
+    def writer(self, write: Callable[[deque], bool], lock) -> "Coalescer":
+        """
+        Returns:
+            returns a Coalescer with these settings
+        """
+        return Coalescer(write, lock, self.max_bytes, self.max_delay)
+
+
+class Coalescer:
+    """
+    Collects the frames of a connection and writes them with one call of `write`. Without max_delay the frames are
+    only collected while the Coalescer is corked (`Client.batch()`), otherwise they are written right away.
+
+    It uses the send lock of the connection, so the frames are written in the order they were sealed. The deadline is
+    watched by a thread, which is started with the first buffered frame. The messages of buffered frames, which weren't
+    written, are returned by `clear()`, so they can be send again on a new connection.
+    """
+
+    def __init__(self, write: Callable[[deque], bool], lock, max_bytes: int = 64 * 1024,
+                 max_delay: Optional[float] = None):
+        """
+        Args:
+            write: writes a deque of buffers to the socket, returns False if it failed
+            lock: the send lock of the connection, an RLock
+            max_bytes: size of the buffered frames in bytes at which they are written, also while corked
+            max_delay: seconds a frame waits at most, None collects frames only while corked
+        """
+        self._write = write
+        self._lock = lock
+        self._ready = threading.Condition(lock)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._buffers = deque()
+        self._size = 0
+        self._messages = []  # the messages of the buffered frames, if they were passed to `add()`
+        self._unsent = []  # the messages of frames whose writing failed
+        self._deadline: Optional[float] = None
+        self._corked = 0
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0  # amount of writes
+
+    @property
+    def pending(self) -> int:
+        """size of the buffered frames in bytes"""
+        return self._size
+
+    def add(self, buffers: list, message=None) -> bool:
+        """
+        buffers a frame
+
+        Args:
+            buffers: the buffers of the frame, see `frame_buffers()`
+            message: the message of the frame before it was compressed and sealed, it's returned by `clear()` if the
+                frame isn't written
+
+        Returns:
+            returns False if the frame was written and the writing failed, the caller keeps the message in that case
+        """
+        size = sum(len(buffer) if isinstance(buffer, bytes) else buffer.nbytes for buffer in buffers)
+        with self._lock:
+            if not self._corked and (self.max_delay is None or size >= self.max_bytes):
+                # written right away after the buffered frames, so the buffers don't have to be copied
+                self._buffers.extend(buffers)
+                self._size += size
+                return self._flush()
+            # the caller may reuse memoryviews and bytearrays after `send_data()` returned
+            self._buffers.extend(buffer if isinstance(buffer, bytes) else bytes(buffer) for buffer in buffers)
+            self._size += size
+            if self._size >= self.max_bytes:
+                return self._flush()
+            if message is not None:
+                self._messages.append(bytes(message))
+            if self._deadline is None and not self._corked:
+                self._deadline = time.monotonic() + self.max_delay
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                self._ready.notify()
+            return True
+
+    def flush(self) -> bool:
+        """
+        writes the buffered frames
+
+        Returns:
+            returns False if the writing failed
+        """
+        with self._lock:
+            return self._flush()
+
+    def cork(self) -> None:
+        """
+        collects the frames till `uncork()` is called, only max_bytes still writes them
+        """
+        with self._lock:
+            self._corked += 1
+            self._deadline = None
+
+    def uncork(self) -> bool:
+        """
+        ends a `cork()`, the last one writes the buffered frames
+
+        Returns:
+            returns False if the writing failed
+        """
+        with self._lock:
+            self._corked -= 1
+            if self._corked:
+                return True
+            return self._flush()
+
+    def clear(self) -> list:
+        """
+        drops the buffered frames, e.g. because they belong to a lost connection
+
+        Returns:
+            returns the messages of the frames, which weren't written, in the order they were added
+        """
+        with self._lock:
+            self._buffers.clear()
+            self._size = 0
+            self._deadline = None
+            messages, self._unsent, self._messages = self._unsent + self._messages, [], []
+        return messages
+
+    def close(self) -> bool:
+        """
+        writes the buffered frames and stops the thread, which is started again by the next buffered frame
+
+        Returns:
+            returns False if the writing failed
+        """
+        with self._lock:
+            self._thread = None
+            self._ready.notify()
+            return self._flush()
+
+    def _flush(self) -> bool:
+        # the caller has to hold the lock
+        self._deadline = None
+        if not self._buffers:
+            return True
+        buffers, self._buffers, self._size = self._buffers, deque(), 0
+        messages, self._messages = self._messages, []
+        self.flushes += 1
+        if self._write(buffers):
+            return True
+        self._unsent.extend(messages)
+        return False
+
+    def _run(self):
+        thread = threading.current_thread()
+        with self._lock:
+            while self._thread is thread:
+                if self._deadline is None:
+                    self._ready.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._ready.wait(remaining)
+                else:
+                    self._flush()
@@ -0,0 +1,202 @@
+import dataclasses
+import struct
+import zlib
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from simplesockets._support_files.error import CodecError
+
+_TYPE_ID = struct.Struct("!H")
+
+#: struct formats of the supported field types, str and bytes are prefixed with their length
+_FORMATS = {int: "q", float: "d", bool: "?", str: "I", bytes: "I"}
+_VARIABLE = (str, bytes)
+
+
+def _field_format(cls: type, name: str, annotation) -> Tuple[str, Optional[type]]:
+    if isinstance(annotation, str):  # postponed annotations or a struct format like "H"
+        types = {"int": int, "float": float, "bool": bool, "str": str, "bytes": bytes}
+        if annotation in types:
+            annotation = types[annotation]
+        else:
+            try:
+                single = len(struct.unpack("!" + annotation, bytes(struct.calcsize("!" + annotation)))) == 1
+            except struct.error:
+                single = False
+            if not single:
+                raise CodecError(f"field {name!r} of {cls.__name__} has the unsupported type {annotation!r}")
+            return annotation, None
+    if annotation not in _FORMATS:
+        raise CodecError(f"field {name!r} of {cls.__name__} has the unsupported type {annotation!r}")
+    return _FORMATS[annotation], annotation if annotation in _VARIABLE else None
+
+
+def _fields(cls: type) -> Tuple[list, bool]:
+    if dataclasses.is_dataclass(cls):
+        return [(field.name, field.type) for field in dataclasses.fields(cls) if field.init], True
+    slots = getattr(cls, "__slots__", None)
+    if slots is None:
+        raise CodecError(f"{cls.__name__} has to be a dataclass or define __slots__")
+    if isinstance(slots, str):
+        slots = (slots,)
+    annotations = {}
+    for base in reversed(cls.__mro__):
+        annotations.update(getattr(base, "__annotations__", {}))
+    missing = [name for name in slots if name not in annotations]
+    if missing:
+        raise CodecError(f"the slots {missing} of {cls.__name__} have no type annotation")
+    return [(name, annotations[name]) for name in slots], False
+
+
+class Codec:
+    """
+    Encodes registered message types into a compact binary format. Every type is compiled once into a `struct.Struct`:
+    a 16 bit type id, the fixed size fields and the lengths of the str and bytes fields, followed by the str and bytes
+    fields. Supported field types are int (64 bit), float (64 bit), bool, str, bytes and struct format strings like
+    `"H"` as annotation.
+
+    Both sides have to register the same types with the same type ids. The default type id is derived from the
+    qualified name of the class, so the order of the registration doesn't matter.
+    """
+
+    def __init__(self):
+        self._encoders: Dict[type, Callable[[Any], bytes]] = {}
+        self._decoders: Dict[int, Callable[[memoryview], Any]] = {}
+        self._types: Dict[int, type] = {}
+
+    def register(self, cls: Optional[Type] = None, type_id: Optional[int] = None):
+        """
+        registers a dataclass or a class with `__slots__` and annotated fields, can be used as a decorator
+
+        Args:
+            cls: the class
+            type_id: id of the type from 0 to 65535, defaults to a checksum of the qualified name
+
+        Returns:
+            returns the class
+
+        Raises:
+            CodecError: if a field type isn't supported or the type id is already used
+        """
+        if cls is None:
+            return lambda cls_: self.register(cls_, type_id)
+
+        if type_id is None:
+            type_id = zlib.crc32(f"{cls.__module__}.{cls.__qualname__}".encode()) & 0xFFFF
+        if self._types.get(type_id, cls) is not cls:
+            raise CodecError(f"the type id {type_id} of {cls.__name__} is already used by "
+                             f"{self._types[type_id].__name__}")
+
+        fields, is_dataclass = _fields(cls)
+        formats = [_field_format(cls, name, annotation) for name, annotation in fields]
+        layout = struct.Struct("!H" + "".join(fmt for fmt, variable in formats))
+        variable = tuple((index, kind) for index, (fmt, kind) in enumerate(formats) if kind is not None)
+        names = [name for name, annotation in fields]
+
+        for stale in [id_ for id_, registered in self._types.items() if registered is cls and id_ != type_id]:
+            del self._types[stale], self._decoders[stale]  # registered again under another type id
+        self._types[type_id] = cls
+        self._encoders[cls] = self._compile_encoder(type_id, layout, names, variable)
+        self._decoders[type_id] = self._compile_decoder(cls, is_dataclass, layout, names, variable)
+        return cls
+
+    @staticmethod
+    def _compile_encoder(type_id: int, layout: struct.Struct, names: list, variable: tuple) -> Callable:
+        pack = layout.pack
+        if len(names) == 1:
+            get = attrgetter(names[0])
+            getter = lambda obj: (get(obj),)
+        else:
+            getter = attrgetter(*names)
+
+        if not variable:
+            return lambda obj: pack(type_id, *getter(obj))
+
+        def encode(obj) -> bytes:
+            values = list(getter(obj))
+            tails = []
+            for index, kind in variable:
+                value = values[index]
+                value = value.encode() if kind is str else bytes(value)
+                values[index] = len(value)
+                tails.append(value)
+            return pack(type_id, *values) + b''.join(tails)
+        return encode
+
+    @staticmethod
+    def _compile_decoder(cls: type, is_dataclass: bool, layout: struct.Struct, names: list,
+                         variable: tuple) -> Callable:
+        unpack_from = layout.unpack_from
+        size = layout.size
+
+        if is_dataclass:
+            create = cls
+        else:
+            def create(*values):
+                obj = cls.__new__(cls)
+                for name, value in zip(names, values):
+                    object.__setattr__(obj, name, value)
+                return obj
+
+        if not variable:
+            return lambda data: create(*unpack_from(data)[1:])
+
+        def decode(data):
+            values = list(unpack_from(data))
+            position = size
+            for index, kind in variable:
+                end = position + values[index + 1]
+                if end > len(data):
+                    raise CodecError(f"the data ends after {len(data)} bytes, the field {names[index]!r} needs {end}")
+                value = bytes(data[position:end])
+                values[index + 1] = value.decode() if kind is str else value
+                position = end
+            return create(*values[1:])
+        return decode
+
+    def __contains__(self, cls: type) -> bool:
+        return cls in self._encoders
+
+    def encode(self, obj) -> bytes:
+        """
+        encodes an object of a registered type
+
+        Args:
+            obj: the object
+
+        Returns:
+            returns the encoded object
+
+        Raises:
+            CodecError: if the type isn't registered or a value doesn't fit its field
+        """
+        try:
+            encoder = self._encoders[type(obj)]
+        except KeyError:
+            raise CodecError(f"the type {type(obj).__name__} isn't registered") from None
+        try:
+            return encoder(obj)
+        except (struct.error, AttributeError, TypeError) as e:
+            raise CodecError(f"{type(obj).__name__} couldn't be encoded: {e}") from None
+
+    def decode(self, data) -> Any:
+        """
+        decodes an object
+
+        Args:
+            data: the encoded object, any object supporting the buffer protocol
+
+        Returns:
+            returns the object
+
+        Raises:
+            CodecError: if the type id is unknown or the data is corrupt
+        """
+        data = memoryview(data)
+        try:
+            decoder = self._decoders[_TYPE_ID.unpack_from(data)[0]]
+            return decoder(data)
+        except KeyError:
+            raise CodecError(f"unknown type id {_TYPE_ID.unpack_from(data)[0]}") from None
+        except (struct.error, UnicodeDecodeError, TypeError) as e:
+            raise CodecError(f"the data couldn't be decoded: {e}") from None
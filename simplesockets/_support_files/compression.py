@@ -0,0 +1,143 @@
+import struct
+import threading
+import zlib
+from typing import Optional, Tuple
+
+from simplesockets._support_files.error import ProtocolError
+from simplesockets._support_files.framing import FRAME_DATA, FRAME_COMPRESSED, MAX_FRAME_SIZE
+
+_OFFER = struct.Struct("!4sI")  # codec name and adler32 of the preset dictionary
+_SYNC_MARKER = b'\x00\x00\xff\xff'  # end of every message flushed with Z_SYNC_FLUSH, it isn't transmitted
+
+
+class Compression:
+    """
+    Settings of the per connection compression. The Client offers them when it connects, if the Server uses the same
+    codec and dictionary, every message of at least `threshold` bytes is compressed with zlib. Each connection and
+    direction has its own streaming context, so repeated content of earlier messages is compressed as well.
+
+    Compression happens before encryption. Don't use it if messages mix secrets with data an attacker controls,
+    the size of the compressed messages can reveal the secret.
+    """
+
+    codec = b'zlb1'
+
+    def __init__(self, level: int = 6, threshold: int = 256, dictionary: Optional[bytes] = None):
+        """
+        Args:
+            level: zlib compression level from 1 (fastest) to 9 (best)
+            threshold: messages with less bytes are send uncompressed
+            dictionary: a preset dictionary with content which is typical for the messages, both sides need the same
+        """
+        if not 0 <= level <= 9:
+            raise ValueError("level must be between 0 and 9")
+        self.level = level
+        self.threshold = threshold
+        self.dictionary = dictionary
+
+    def offer(self) -> bytes:
+        """
+        Returns:
+            returns the payload of a FRAME_COMPRESS frame, which offers or accepts these settings
+        """
+        return _OFFER.pack(self.codec, zlib.adler32(self.dictionary or b''))
+
+    def accepts(self, offer) -> bool:
+        """
+        Args:
+            offer: the payload of a FRAME_COMPRESS frame of the other side
+
+        Returns:
+            returns True if both sides use the same codec and dictionary
+        """
+        return len(offer) == _OFFER.size and bytes(offer) == self.offer()
+
+    def context(self, max_size: int = MAX_FRAME_SIZE) -> "CompressionContext":
+        """
+        Args:
+            max_size: the maximal size of a decompressed message in bytes, usually the frame size limit
+
+        Returns:
+            returns a new context for a connection
+        """
+        return CompressionContext(self, max_size)
+
+
+class CompressionContext:
+    """
+    The compression of one connection: the streaming contexts of both directions and the amount of compressed bytes
+    """
+
+    def __init__(self, settings: Compression, max_size: int = MAX_FRAME_SIZE):
+        self.threshold = settings.threshold
+        self.max_size = max_size
+        zdict = {} if settings.dictionary is None else {"zdict": settings.dictionary}
+        self._compressor = zlib.compressobj(settings.level, zlib.DEFLATED, -zlib.MAX_WBITS, **zdict)
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS, **zdict)
+        self._compress_lock = threading.Lock()
+        self._decompress_lock = threading.Lock()
+
+        self.sent_bytes = 0  # size of the send messages
+        self.sent_wire_bytes = 0  # size of the send messages after compression
+        self.received_bytes = 0
+        self.received_wire_bytes = 0
+
+    @property
+    def ratio(self) -> float:
+        """the size of the send messages divided by their compressed size, 1.0 if nothing was send yet"""
+        return self.sent_bytes / self.sent_wire_bytes if self.sent_wire_bytes else 1.0
+
+    @property
+    def received_ratio(self) -> float:
+        """the size of the received messages divided by their compressed size"""
+        return self.received_bytes / self.received_wire_bytes if self.received_wire_bytes else 1.0
+
+    def compress(self, data) -> Tuple[int, bytes]:
+        """
+        compresses a message, if it's big enough. Messages have to be compressed in the order they are send
+
+        Args:
+            data: the message, any object supporting the buffer protocol
+
+        Returns:
+            returns the frame kind and the message
+        """
+        size = memoryview(data).nbytes
+        self.sent_bytes += size
+        if size < self.threshold:
+            self.sent_wire_bytes += size
+            return FRAME_DATA, data
+        with self._compress_lock:
+            compressed = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        compressed = compressed[:-len(_SYNC_MARKER)]
+        self.sent_wire_bytes += len(compressed)
+        return FRAME_COMPRESSED, compressed
+
+    def decompress(self, data) -> bytes:
+        """
+        decompresses a message of a FRAME_COMPRESSED frame
+
+        Args:
+            data: the compressed message
+
+        Returns:
+            returns the message
+
+        Raises:
+            zlib.error: if the message is corrupt
+            ProtocolError: if the message inflates to more than `max_size` bytes, the stream can't be used any further
+        """
+        with self._decompress_lock:
+            message = self._decompressor.decompress(bytes(data) + _SYNC_MARKER, self.max_size)
+            if self._decompressor.unconsumed_tail:
+                raise ProtocolError(f"a decompressed message exceeds the limit of {self.max_size} bytes")
+        self.received_wire_bytes += len(data)
+        self.received_bytes += len(message)
+        return message
+
+    def received(self, size: int) -> None:
+        """
+        counts an uncompressed received message
+        """
+        self.received_wire_bytes += size
+        self.received_bytes += size
@@ -0,0 +1,247 @@
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Hashable, Optional
+
+
+class Dispatcher:
+    """
+    A bounded worker pool which executes the `on_receive` function of a Server, so slow handlers don't stall the
+    reading of a connection.
+
+    Messages of one client are executed in the order they were received if `ordered` is True, one client can then
+    only occupy `max_queue // workers` places of the queue, so the workers aren't blocked by a single client. If the
+    queue is full, the receiving side pauses reading from the socket if `backpressure` is True, otherwise the message
+    is dropped.
+    If `processes` is True, `on_receive` is executed in a process pool: it then has to be a picklable function, is
+    called with the address and the received bytes and its return value is send back to the client if it isn't None.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 1024, ordered: bool = True, backpressure: bool = True,
+                 processes: bool = False):
+        """
+        Args:
+            workers: amount of worker threads (and processes)
+            max_queue: maximal amount of queued messages
+            ordered: if the messages of a client should be handled one after another
+            backpressure: if the receiving should be paused while the queue is full instead of dropping messages
+            processes: if `on_receive` should be executed in a process pool
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ordered = ordered
+        self.backpressure = backpressure
+        self.processes = processes
+        self._key_limit = max(1, max_queue // workers)
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._ready = deque()  # keys with pending messages if ordered else the messages
+        self._pending = {}  # key: client key, value: deque of its messages
+        self._size = 0
+        self._closed = False
+        self._threads = []
+        self._process_pool = None
+        self._space_callbacks = []
+        self._space_wanted = False
+
+        self.on_error: Optional[Callable] = None
+
+        self._submitted = 0
+        self._completed = 0
+        self._dropped = 0
+        self._errors = 0
+        self._max_queued = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._handler_time = 0.0
+        self._max_handler_time = 0.0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        """Is True if the queue is full"""
+        return self._size >= self.max_queue
+
+    def start(self, on_error: Optional[Callable] = None) -> None:
+        """
+        starts the worker threads, is called by the Server
+
+        Args:
+            on_error: function which is called with an exception and its traceback if a handler raised one
+        """
+        if on_error is not None:
+            self.on_error = on_error
+        if self._threads:
+            return
+        if self.processes:
+            self._process_pool = ProcessPoolExecutor(self.workers)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def add_space_callback(self, callback: Callable) -> None:
+        """
+        adds a function, which is called from a worker thread, when the queue has space again after `submit()`
+        returned False
+
+        Args:
+            callback: function without arguments
+        """
+        self._space_callbacks.append(callback)
+
+    def submit(self, key: Hashable, function: Callable, *args, block: bool = True) -> bool:
+        """
+        queues a function call
+
+        Args:
+            key: the key of the client, calls with the same key are executed in order if `ordered` is True
+            function: the function
+            *args: arguments for the function
+            block: if the call should wait for space while the queue is full and backpressure is enabled
+
+        Returns:
+            returns False if the queue is full, backpressure is enabled and block is False. The call wasn't queued
+            in that case
+        """
+        with self._lock:
+            while self._size >= self.max_queue or \
+                    (self.ordered and len(self._pending.get(key, ())) >= self._key_limit):
+                if not self.backpressure:
+                    self._dropped += 1
+                    return True
+                if not block:
+                    self._space_wanted = True
+                    return False
+                self._not_full.wait()
+            item = (time.perf_counter(), function, args)
+            if self.ordered:
+                queue = self._pending.get(key)
+                if queue is None:
+                    self._pending[key] = deque((item,))
+                    self._ready.append(key)
+                else:  # the key is already scheduled
+                    queue.append(item)
+            else:
+                self._ready.append(item)
+            self._size += 1
+            self._submitted += 1
+            if self._size > self._max_queued:
+                self._max_queued = self._size
+            self._not_empty.notify()
+        return True
+
+    def run_in_process(self, function: Callable, *args):
+        """
+        executes the function in the process pool and waits for its result
+
+        Args:
+            function: a picklable function
+            *args: picklable arguments
+
+        Returns:
+            returns the result of the function
+        """
+        return self._process_pool.submit(function, *args).result()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._ready and not self._closed:
+                    self._not_empty.wait()
+                if not self._ready:
+                    return
+                if self.ordered:
+                    key = self._ready.popleft()
+                    queued, function, args = self._pending[key].popleft()
+                else:
+                    key = None
+                    queued, function, args = self._ready.popleft()
+                self._size -= 1
+                self._not_full.notify_all()
+                space_wanted, self._space_wanted = self._space_wanted, False
+
+            if space_wanted:
+                for callback in self._space_callbacks:
+                    callback()
+
+            started = time.perf_counter()
+            error = False
+            try:
+                function(*args)
+            except Exception as e:
+                error = True
+                if callable(self.on_error):
+                    self.on_error(e, traceback.format_exc())
+            finished = time.perf_counter()
+
+            with self._lock:
+                self._completed += 1
+                self._errors += error
+                wait_time = started - queued
+                handler_time = finished - started
+                self._wait_time += wait_time
+                self._handler_time += handler_time
+                if wait_time > self._max_wait_time:
+                    self._max_wait_time = wait_time
+                if handler_time > self._max_handler_time:
+                    self._max_handler_time = handler_time
+
+                if self.ordered:
+                    if self._pending[key]:
+                        self._ready.append(key)
+                        self._not_empty.notify()
+                    else:
+                        del self._pending[key]
+
+    def stats(self) -> dict:
+        """
+        returns statistics of the dispatcher, times are in milliseconds
+
+        Returns:
+            returns a dict containing the queue depth and the waiting and handling times
+        """
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.workers,
+                "queued": self._size,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "dropped": self._dropped,
+                "errors": self._errors,
+                "avg_wait_ms": self._wait_time / completed * 1000,
+                "max_wait_ms": self._max_wait_time * 1000,
+                "avg_handler_ms": self._handler_time / completed * 1000,
+                "max_handler_ms": self._max_handler_time * 1000,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        stops the workers after the queued calls are executed
+
+        Args:
+            wait: if it should wait till the workers finished
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+        if wait:
+            current = threading.current_thread()
+            for thread in self._threads:
+                if thread is not current:
+                    thread.join(5)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Tuple
+
+from Crypto.Hash import SHA256
+from Crypto.Protocol.DH import key_agreement, import_x25519_public_key
+from Crypto.Protocol.KDF import HKDF
+from Crypto.PublicKey import ECC
+
+PUBLIC_KEY_SIZE = 32
+
+
+def generate_key() -> Tuple[ECC.EccKey, bytes]:
+    """
+    generates an ephemeral X25519 key
+
+    Returns:
+        returns the private key and the raw 32 byte public key
+    """
+    key = ECC.generate(curve="X25519")
+    return key, key.public_key().export_key(format="raw")
+
+
+def derive_session(private_key: ECC.EccKey, peer_public_key, client_public_key: bytes,
+                   server_public_key: bytes) -> Tuple[bytes, bytes]:
+    """
+    derives the key and salt of a Session from a X25519 key agreement
+
+    Args:
+        private_key: the own private key
+        peer_public_key: the raw public key of the other side
+        client_public_key: the raw public key of the Client
+        server_public_key: the raw public key of the Server
+
+    Returns:
+        returns the key and the salt of the Session
+
+    Raises:
+        ValueError: if the public key of the other side is invalid
+    """
+    salt = client_public_key + server_public_key
+    return key_agreement(eph_priv=private_key, eph_pub=import_x25519_public_key(bytes(peer_public_key)),
+                         kdf=lambda secret: HKDF(secret, 32, salt, SHA256, context=b'simplesockets x25519')), salt
+
+
+class ServerKey:
+    """
+    The X25519 key of a Server. By default a new key is generated for every handshake, so a leaked key only exposes
+    one session. Generating a key costs about as much as the key agreement, a lifetime above 0 reuses the key for
+    `lifetime` seconds to save that time. The sessions still get their own keys, because every Client uses a new key,
+    but whoever obtains the key of the Server can derive all sessions of its lifetime.
+    """
+
+    def __init__(self, lifetime: float = 0.0):
+        """
+        Args:
+            lifetime: seconds a key is used, 0 generates a key for every handshake
+        """
+        self.lifetime = lifetime
+        self._lock = threading.Lock()
+        self._key = None
+        self._expiry = 0.0
+
+    def get(self) -> Tuple[ECC.EccKey, bytes]:
+        """
+        Returns:
+            returns the private key and the raw public key
+        """
+        if self.lifetime <= 0:
+            return generate_key()
+        with self._lock:
+            now = time.monotonic()
+            if self._key is None or self._expiry <= now:
+                self._key = generate_key()
+                self._expiry = now + self.lifetime
+            return self._key
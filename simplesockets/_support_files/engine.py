@@ -0,0 +1,351 @@
+import selectors
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import replace
+
+from simplesockets._support_files.framing import FrameParser, Outbox, send_buffers
+from simplesockets._support_files.tracing import RECV
+
+_ACCEPT = object()
+_WAKEUP = object()
+
+
+class _Connection:
+    __slots__ = ("client", "socket", "parser", "out", "lock", "writing", "events", "backlog")
+
+    def __init__(self, client):
+        self.client = client
+        self.socket = client.socket
+        self.parser = FrameParser(client.max_frame_size)
+        self.out = Outbox()
+        self.lock = threading.Lock()
+        self.writing = False
+        self.events = selectors.EVENT_READ
+        self.backlog = deque()  # [message, stored] of received messages which couldn't be handed over yet
+
+
+class SelectorEngine:
+    """
+    Runs a TCPServer on a single thread: accepting, reading and writing of every connection are multiplexed with
+    `selectors.DefaultSelector` (epoll on Linux) instead of starting a thread per client.
+    """
+
+    def __init__(self, server, read_buffer: int = 65536):
+        self.server = server
+        self.selector = selectors.DefaultSelector()
+        self._connections = {}  # key: address, value: _Connection
+        self._calls = deque()  # functions which should be executed on the loop thread
+        self._accepting = False
+        self._paused = set()
+
+        if server._dispatcher is not None:
+            server._dispatcher.add_space_callback(lambda: self.call_soon(self._resume))
+        server.inbox.add_space_callback(lambda: self.call_soon(self._resume))
+        if server._handshake_pool is not None:
+            server._handshake_pool.add_space_callback(self.wakeup)
+
+        self._read_view = memoryview(bytearray(read_buffer))
+
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+
+    def __len__(self):
+        return len(self._connections)
+
+    def wakeup(self):
+        """
+        wakes the loop thread up
+        """
+        try:
+            self._wakeup_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def call_soon(self, function, *args):
+        """
+        executes the function on the loop thread
+
+        Args:
+            function: the function
+            *args: arguments for the function
+        """
+        self._calls.append((function, args))
+        self.wakeup()
+
+    def write(self, client, buffers: list) -> None:
+        """
+        sends the buffers of a frame to the client. Data which can't be written right away is queued and written
+        together with later frames when the socket is writeable again
+
+        Args:
+            client: the Server_Client
+            buffers: the buffers of the frame which should be send
+
+        Raises:
+            ConnectionError: if the client isn't connected
+        """
+        conn = self._connections.get(client.address)
+        if conn is None:
+            raise ConnectionError("client isn't connected")
+        with conn.lock:
+            if not conn.out:
+                buffers = deque(buffers)
+                send_buffers(conn.socket, buffers, metrics=client.metrics)
+                if not buffers:
+                    return
+            conn.out.extend(buffers)
+            if conn.writing:
+                return
+            conn.writing = True
+        self.call_soon(self._set_events, conn)
+
+    def pending(self, client) -> int:
+        """
+        returns the amount of bytes which are queued for the client
+
+        Args:
+            client: the Server_Client
+
+        Returns:
+            returns the amount of queued bytes
+        """
+        conn = self._connections.get(client.address)
+        return 0 if conn is None else len(conn.out)
+
+    def close_client(self, client) -> None:
+        """
+        closes the connection to the client on the loop thread
+
+        Args:
+            client: the Server_Client
+        """
+        conn = self._connections.get(client.address)
+        if conn is not None:
+            self.call_soon(self._drop, conn)
+
+    def run(self):
+        """
+        the loop, it runs till the Server gets killed
+        """
+        server = self.server
+        server.socket.setblocking(False)
+        self.selector.register(self._wakeup_r, selectors.EVENT_READ, _WAKEUP)
+        try:
+            while server._kill is False:
+                self._update_accepting()
+                for key, mask in self.selector.select(0.1):
+                    if key.data is _ACCEPT:
+                        self._accept()
+                    elif key.data is _WAKEUP:
+                        self._drain_wakeup()
+                    else:
+                        if mask & selectors.EVENT_WRITE:
+                            self._flush(key.data)
+                        if mask & selectors.EVENT_READ:
+                            self._read(key.data)
+                while self._calls:
+                    function, args = self._calls.popleft()
+                    function(*args)
+        finally:
+            for conn in list(self._connections.values()):
+                self._drop(conn)
+            self.selector.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _update_accepting(self):
+        server = self.server
+        pool = server._handshake_pool
+        accepting = server.event.accepting_thread.run and \
+            (server.max_connections is None or len(server.clients) < server.max_connections) and \
+            (pool is None or not pool.full)
+        if accepting is self._accepting:
+            return
+        try:
+            if accepting:
+                self.selector.register(server.socket, selectors.EVENT_READ, _ACCEPT)
+            else:
+                self.selector.unregister(server.socket)
+        except (ValueError, KeyError, OSError):  # the Server socket got closed
+            server.exit_accept()
+            return
+        self._accepting = accepting
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _accept(self):
+        server = self.server
+        pool = server._handshake_pool
+        if pool is not None and not pool.acquire(0):
+            return
+        try:
+            client_socket, address = server.socket.accept()
+        except BlockingIOError:
+            if pool is not None:
+                pool.release()
+            return
+        except OSError as e:
+            if pool is not None:
+                pool.release()
+            if server.socket.fileno() == -1:  # the Server socket got closed
+                server.exit_accept()
+            else:  # e.g. too many open files
+                server._add_exception(e, traceback.format_exc())
+            return
+        if pool is not None:  # the handshake runs on a worker, the client is added on the loop thread afterwards
+            pool.submit(server._new_client(client_socket, address), server._handshake,
+                        lambda server_client: self.call_soon(self._add, server_client), server._add_exception)
+            return
+        try:
+            server_client = server._new_client(client_socket, address)
+            server_client = server._handshake(server_client)
+        except Exception as e:
+            client_socket.close()
+            server._add_exception(e, traceback.format_exc())
+            return
+        self._add(server_client)
+
+    def _add(self, server_client):
+        server = self.server
+        if server._kill:
+            server_client.close()
+            return
+        server_client = replace(server_client, engine=self)
+        server_client.socket.setblocking(False)
+
+        conn = _Connection(server_client)
+        self._connections[server_client.address] = conn
+        self.selector.register(server_client.socket, selectors.EVENT_READ, conn)
+        server.clients[server_client.address] = server_client
+        server._track(server_client)
+
+        if callable(server.on_connect):
+            server.on_connect(server_client)
+
+    def _read(self, conn: _Connection):
+        tracer = conn.client.tracer
+        start = time.perf_counter() if tracer is not None else None
+        try:
+            n = conn.socket.recv_into(self._read_view)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._drop(conn, e)
+            return
+        if n == 0:
+            self._drop(conn)
+            return
+        server = self.server
+        client = conn.client
+        if client.metrics is not None:
+            client.metrics.recv_calls += 1
+            client.metrics.bytes_in += n
+        try:
+            for kind, payload in conn.parser.feed(self._read_view[:n]):
+                if client._control(kind, payload):
+                    continue
+                trace = tracer.sample(RECV, client.address, start) if tracer is not None else None
+                if trace is not None:
+                    trace.lap("recv")
+                start = None  # the following frames of the chunk were received with it
+                recved = client._decode(payload, kind=kind, trace=trace)
+                if len(recved) == 0:
+                    continue
+                entry = [recved, False]
+                if conn.backlog or not self._deliver(client, entry):
+                    conn.backlog.append(entry)
+        except Exception as e:
+            self._drop(conn, e, traceback.format_exc())
+            return
+        if conn.backlog:  # the inbox or the dispatcher is full, stop reading till they have space again
+            self._paused.add(conn)
+            self._set_events(conn)
+
+    def _deliver(self, client, entry: list) -> bool:
+        """
+        stores a received message in the inbox and hands it to the dispatcher
+
+        Returns:
+            returns False if the inbox or the dispatcher is full
+        """
+        server = self.server
+        recved, stored = entry
+        if not stored:
+            if client.address not in server.clients:  # disconnected by the inbox
+                return True
+            stored = server._store(client, recved, block=False)
+            if stored is False:
+                return False
+            entry[1] = True
+            if stored is None:
+                return True
+        return server._dispatch(client, recved, block=False)
+
+    def _resume(self):
+        progress = True
+        while self._paused and progress:  # round robin, so one client can't fill the whole queue
+            progress = False
+            for conn in list(self._paused):
+                if not self._deliver(conn.client, conn.backlog[0]):
+                    continue
+                progress = True
+                conn.backlog.popleft()
+                if not conn.backlog:
+                    self._paused.discard(conn)
+                    self._set_events(conn)
+
+    def _flush(self, conn: _Connection):
+        with conn.lock:
+            out = conn.out
+            try:
+                out.send(conn.socket, metrics=conn.client.metrics)
+            except OSError as e:
+                out.clear()
+                conn.writing = False
+                self._drop(conn, e)
+                return
+            conn.writing = bool(out)
+        self._set_events(conn)
+
+    def _set_events(self, conn: _Connection):
+        if self._connections.get(conn.client.address) is not conn:
+            return
+        events = 0 if conn.backlog else selectors.EVENT_READ
+        if conn.writing:
+            events |= selectors.EVENT_WRITE
+        if events == conn.events:
+            return
+        if conn.events == 0:
+            self.selector.register(conn.socket, events, conn)
+        elif events == 0:
+            self.selector.unregister(conn.socket)
+        else:
+            self.selector.modify(conn.socket, events, conn)
+        conn.events = events
+
+    def _drop(self, conn: _Connection, exception: Exception = None, traceback_: str = None):
+        address = conn.client.address
+        if self._connections.get(address) is not conn:
+            return
+        del self._connections[address]
+        self._paused.discard(conn)
+        if conn.events:
+            self.selector.unregister(conn.socket)
+        try:
+            conn.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.socket.close()
+
+        if exception is not None:
+            self.server._add_exception(exception, traceback_)
+        self.server._perfom_disconnect(address)
@@ -11,6 +11,21 @@ class SocketError(error):
 class SetupError(SocketError): pass
 
 
+class ConnectionClosed(SocketError, ConnectionError): pass
+
+
+class AuthenticationError(SocketError, ValueError): pass
+
+
+class CodecError(SocketError, ValueError): pass
+
+
+class RemoteError(SocketError): pass
+
+
+class ProtocolError(SocketError, ConnectionError): pass
+
+
 class Better_Exception:
     def __init__(self, exception, traceback=None):
         self._exception = exception
@@ -47,18 +62,27 @@ class Exception_Collection:
     def _get_time(self):
         return datetime.datetime.now().strftime("%H:%M:%S|%d.%m.%Y")
 
+    def _get_key(self):
+        key = self._get_time()
+        if key in self._exceptions:  # more than one exception in a second
+            count = 2
+            while f"{key}#{count}" in self._exceptions:
+                count += 1
+            key = f"{key}#{count}"
+        return key
+
     def add(self, *args):
         if len(args) not in (1, 2):
             return
             # raise ValueError("You have to give an Better_Exception or exception (and traceback")
 
         if isinstance(args[0], Better_Exception):
-            self._exceptions[self._get_time()] = args[0]
+            self._exceptions[self._get_key()] = args[0]
         elif issubclass(args[0].__class__, Exception) or isinstance(args[0], Exception):
             if len(args) == 2:
-                self._exceptions[self._get_time()] = Better_Exception(args[0], args[1])
+                self._exceptions[self._get_key()] = Better_Exception(args[0], args[1])
             else:
-                self._exceptions[self._get_time()] = Better_Exception(args[0])
+                self._exceptions[self._get_key()] = Better_Exception(args[0])
         else:
             return
             # raise TypeError("Given Exception is not valid")
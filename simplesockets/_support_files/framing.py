@@ -0,0 +1,334 @@
+import os
+import socket
+import struct
+from collections import deque
+from itertools import islice
+from typing import List, Tuple, Union
+
+from simplesockets._support_files.error import ConnectionClosed, ProtocolError
+from simplesockets._support_files.tracing import RECV
+
+#: frame header: one byte frame kind followed by the payload length as unsigned 32 bit big endian integer
+HEADER = struct.Struct("!BI")
+HEADER_SIZE = HEADER.size
+#: default limit of the payload length of a received frame, the length is sent by the peer and can't be trusted
+MAX_FRAME_SIZE = 32 << 20
+
+FRAME_DATA = 0
+FRAME_TICKET = 1  # the Server issues a session ticket, it's empty if the Server doesn't support resumption
+FRAME_RESUME = 2  # the Client presents a ticket, the Server answers with its random or with an empty frame
+FRAME_HELLO = 3  # the Client proposes a X25519 handshake with its public key, the Server answers with its public key
+FRAME_COMPRESS = 4  # the Client offers compression settings, the Server answers with them or with an empty frame
+FRAME_COMPRESSED = 5  # a compressed message
+FRAME_REQUEST = 6  # a RPC request, the payload starts with the RPC header
+FRAME_REPLY = 7  # the reply to a RPC request
+FRAME_PING = 8  # a health check, the Server answers with a FRAME_PONG containing the same payload
+FRAME_PONG = 9  # the answer to a FRAME_PING
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+def pack_header(length: int, kind: int = FRAME_DATA) -> bytes:
+    """
+    creates the header of a frame
+
+    Args:
+        length: length of the payload
+        kind: kind of the frame
+
+    Returns:
+        returns the packed header
+    """
+    return HEADER.pack(kind, length)
+
+
+def frame(data: bytes, kind: int = FRAME_DATA) -> bytes:
+    """
+    creates a frame out of the given data
+
+    Args:
+        data: the payload
+        kind: kind of the frame
+
+    Returns:
+        returns header and payload as bytes
+    """
+    return HEADER.pack(kind, len(data)) + data
+
+
+def as_buffer(data) -> memoryview:
+    """
+    returns a flat byte view of an object supporting the buffer protocol (bytes, bytearray, memoryview, array, mmap,
+    ...) without copying it
+
+    Args:
+        data: the object
+
+    Returns:
+        returns a memoryview of unsigned bytes
+    """
+    view = memoryview(data)
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+    return view
+
+
+def frame_buffers(data, kind: int = FRAME_DATA) -> List[Union[bytes, memoryview]]:
+    """
+    creates a frame without concatenating header and payload, the buffers can be written with `send_buffers()`
+
+    Args:
+        data: the payload, any object supporting the buffer protocol
+        kind: kind of the frame
+
+    Returns:
+        returns a list of the header and, if it isn't empty, the payload
+    """
+    view = as_buffer(data)
+    if not view.nbytes:
+        return [HEADER.pack(kind, 0)]
+    return [HEADER.pack(kind, view.nbytes), view]
+
+
+def send_buffers(sock: socket.socket, buffers: deque, flags: int = 0, metrics=None) -> int:
+    """
+    writes the queued buffers to the socket. Up to IOV_MAX buffers are written with one `socket.sendmsg()` call,
+    partially written buffers are continued with a memoryview slice, so nothing gets copied. Written buffers are
+    removed from the deque. On a non-blocking socket (or with MSG_DONTWAIT) it returns as soon as the socket buffer
+    is full, the deque then contains the remaining data.
+
+    Args:
+        sock: the socket
+        buffers: deque of bytes or byte memoryviews
+        flags: flags for `socket.sendmsg()`
+        metrics: the ConnectionMetrics which count the syscalls and the written bytes
+
+    Returns:
+        returns the amount of written bytes
+
+    Raises:
+        ConnectionError: if the socket didn't accept any data
+    """
+    written = 0
+    while buffers:
+        try:
+            if _HAS_SENDMSG and len(buffers) > 1:
+                sent = sock.sendmsg(list(islice(buffers, IOV_MAX)), (), flags)
+            else:
+                sent = sock.send(buffers[0], flags)
+        except BlockingIOError:
+            return written
+        if sent == 0:
+            raise ConnectionError("socket connection error")
+        if metrics is not None:
+            metrics.send_calls += 1
+            metrics.bytes_out += sent
+        written += sent
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers.popleft())
+        if sent:
+            first = buffers[0]
+            buffers[0] = (first if isinstance(first, memoryview) else memoryview(first))[sent:]
+    return written
+
+
+class Outbox:
+    """
+    Buffers which are queued for a socket, because it wasn't writeable
+    """
+    __slots__ = ("buffers", "size")
+
+    def __init__(self):
+        self.buffers = deque()
+        self.size = 0  # queued bytes
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return bool(self.buffers)
+
+    def extend(self, buffers) -> None:
+        """
+        queues buffers, mutable buffers are copied, because the caller may reuse them
+
+        Args:
+            buffers: the buffers
+        """
+        for buffer in buffers:
+            if isinstance(buffer, memoryview) and not buffer.readonly:
+                buffer = bytes(buffer)
+            self.buffers.append(buffer)
+            self.size += len(buffer)
+
+    def send(self, sock: socket.socket, flags: int = 0, metrics=None) -> bool:
+        """
+        writes as much of the queued buffers as the socket accepts
+
+        Args:
+            sock: the socket
+            flags: flags for `socket.sendmsg()`
+            metrics: the ConnectionMetrics which count the syscalls and the written bytes
+
+        Returns:
+            returns True if every buffer got written
+        """
+        self.size -= send_buffers(sock, self.buffers, flags, metrics)
+        return not self.buffers
+
+    def clear(self) -> None:
+        """
+        removes every queued buffer
+        """
+        self.buffers.clear()
+        self.size = 0
+
+
+def recv_exact_into(sock: socket.socket, view: memoryview) -> int:
+    """
+    fills the given memoryview with data from the socket
+
+    Args:
+        sock: the socket
+        view: the memoryview which should be filled
+
+    Returns:
+        returns the amount of recv syscalls
+
+    Raises:
+        ConnectionClosed: if the peer closed the connection before the view was filled
+    """
+    length = len(view)
+    received = 0
+    calls = 0
+    while received < length:
+        n = sock.recv_into(view[received:], length - received)
+        calls += 1
+        if n == 0:
+            raise ConnectionClosed("connection closed by peer")
+        received += n
+    return calls
+
+
+def recv_unframed(sock: socket.socket, recv_buffer: int) -> bytes:
+    """
+    the legacy receive path: data is collected until a chunk is smaller than recv_buffer
+
+    Args:
+        sock: the socket
+        recv_buffer: the receive buffer used for `socket.recv()`
+
+    Returns:
+        returns the received data
+    """
+    chunks = []
+    recv_data = True
+    while recv_data:
+        chunk = sock.recv(recv_buffer)
+        chunks.append(chunk)
+        if len(chunk) < recv_buffer:
+            recv_data = False
+    return b''.join(chunks)
+
+
+def _check_length(length: int, max_frame_size: int) -> None:
+    if length > max_frame_size:
+        raise ProtocolError(f"the frame has {length} bytes, the limit is {max_frame_size} bytes")
+
+
+class FrameReader:
+    """
+    Reads length prefixed frames from a blocking socket. Frames which fit into `recv_buffer` bytes are received into
+    a preallocated buffer, bigger frames get a buffer of their exact size, at most `max_frame_size` bytes.
+    """
+
+    def __init__(self, sock: socket.socket, recv_buffer: int = 2048, max_frame_size: int = MAX_FRAME_SIZE):
+        self.socket = sock
+        self.max_frame_size = max_frame_size
+        self._header = bytearray(HEADER_SIZE)
+        self._header_view = memoryview(self._header)
+        self._view = memoryview(bytearray(recv_buffer))
+        self.metrics = None  # the ConnectionMetrics which count the syscalls and the received bytes
+        self.tracer = None  # the Tracer which samples the received frames
+        self.trace = None  # the Trace of the last frame, None if it wasn't sampled
+        self.peer = None  # the address of the other side for the traces
+
+    def read(self) -> Tuple[int, memoryview]:
+        """
+        reads the next frame. The returned memoryview may point into the preallocated buffer and is only valid
+        until the next call of `read()`
+
+        Returns:
+            returns the kind of the frame and its payload
+
+        Raises:
+            ConnectionClosed: if the peer closed the connection
+            ProtocolError: if the frame is bigger than max_frame_size, the connection should be closed
+        """
+        calls = recv_exact_into(self.socket, self._header_view)
+        kind, length = HEADER.unpack(self._header)
+        _check_length(length, self.max_frame_size)  # before the buffer is allocated
+        if self.tracer is not None:  # the trace starts when the header arrived, not while waiting for it
+            self.trace = self.tracer.sample(RECV, self.peer) if kind in (FRAME_DATA, FRAME_COMPRESSED) else None
+        if length <= len(self._view):
+            view = self._view[:length]
+        else:
+            view = memoryview(bytearray(length))
+        calls += recv_exact_into(self.socket, view)
+        if self.metrics is not None:
+            self.metrics.recv_calls += calls
+            self.metrics.bytes_in += HEADER_SIZE + length
+        if self.trace is not None:
+            self.trace.lap("recv")
+        return kind, view
+
+
+class FrameParser:
+    """
+    Incremental frame parser for non-blocking sockets. Received chunks are fed into the parser, which returns every
+    frame completed by them.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self._buffer = bytearray()
+        self.max_frame_size = max_frame_size
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def feed(self, data: Union[bytes, memoryview]) -> List[Tuple[int, bytes]]:
+        """
+        adds received data to the parser
+
+        Args:
+            data: received data
+
+        Returns:
+            returns a list of the completed frames as tuples of kind and payload
+
+        Raises:
+            ProtocolError: if a frame is bigger than max_frame_size, the connection should be closed
+        """
+        buffer = self._buffer
+        buffer += data
+        end = len(buffer)
+        if end < HEADER_SIZE:
+            return []
+
+        frames = []
+        pos = 0
+        with memoryview(buffer) as view:
+            while end - pos >= HEADER_SIZE:
+                kind, length = HEADER.unpack_from(buffer, pos)
+                _check_length(length, self.max_frame_size)  # before the payload is buffered
+                start = pos + HEADER_SIZE
+                if end - start < length:
+                    break
+                frames.append((kind, bytes(view[start:start + length])))
+                pos = start + length
+        del buffer[:pos]
+        return frames
@@ -0,0 +1,215 @@
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+def _percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class HandshakePool:
+    """
+    Runs the handshakes of accepted connections on a bounded pool of worker threads, so the accepting thread only
+    accepts and a slow client doesn't delay the others. Every handshake has to finish within `timeout` seconds, a
+    watchdog thread shuts the socket down when the deadline passed, so a client sending one byte at a time can't keep
+    a worker busy. While `max_pending` handshakes are running or waiting, no further connections are accepted, they
+    wait in the listen backlog of the socket instead.
+    """
+
+    def __init__(self, workers: int = 8, timeout: Optional[float] = 10.0, max_pending: Optional[int] = None):
+        """
+        Args:
+            workers: amount of worker threads
+            timeout: timeout of a handshake in seconds, None disables it
+            max_pending: maximal amount of running and waiting handshakes, defaults to workers
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_pending is None:
+            max_pending = workers
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="handshake")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._space_callbacks = []
+
+        self._started = time.monotonic()
+        self._accepted = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._pending = 0
+        self._latencies = deque(maxlen=4096)  # seconds from accepting to the end of the handshake
+
+        self._deadlines = {}  # key: socket of a running handshake, value: its deadline
+        self._expired = set()  # sockets which were shut down by the watchdog
+        self._deadline_added = threading.Condition(self._lock)
+        self._watchdog: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def full(self) -> bool:
+        """Is True if no further handshake can be started"""
+        return self._pending >= self.max_pending
+
+    def add_space_callback(self, callback: Callable) -> None:
+        """
+        adds a function, which is called after a handshake finished
+
+        Args:
+            callback: function without arguments
+        """
+        self._space_callbacks.append(callback)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        reserves a place for a handshake, it has to be called before the connection is accepted
+
+        Args:
+            timeout: how long it should wait for a place in seconds, 0 doesn't wait
+
+        Returns:
+            returns True if a place was reserved
+        """
+        if not self._slots.acquire(timeout != 0, None if timeout == 0 else timeout):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def release(self) -> None:
+        """
+        frees a place, which was reserved with `acquire()` but not used by `submit()`
+        """
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+        for callback in self._space_callbacks:
+            callback()
+
+    def submit(self, client, handshake: Callable, done: Callable, failed: Callable) -> None:
+        """
+        executes the handshake on a worker, a place has to be reserved with `acquire()`
+
+        Args:
+            client: the Server_Client of the accepted connection
+            handshake: function which takes the client and returns the client which should be used
+            done: function which is called with the returned client
+            failed: function which is called with the exception and its traceback, the socket is closed already
+        """
+        with self._lock:
+            self._accepted += 1
+        self._executor.submit(self._run, client, handshake, done, failed, time.perf_counter())
+
+    def _run(self, client, handshake: Callable, done: Callable, failed: Callable, accepted: float):
+        sock = client.socket
+        try:
+            if self.timeout is not None:
+                self._watch(sock)
+            try:
+                sock.settimeout(self.timeout)
+                client = handshake(client)
+                sock.settimeout(None)
+                if self._unwatch(sock):
+                    raise socket.timeout("the handshake didn't finish in time")
+            except Exception as e:
+                expired = self._unwatch(sock)
+                with self._lock:
+                    if expired or isinstance(e, socket.timeout):
+                        self._timeouts += 1
+                    else:
+                        self._failed += 1
+                sock.close()
+                failed(socket.timeout("the handshake didn't finish in time") if expired else e, traceback.format_exc())
+                return
+
+            with self._lock:
+                self._completed += 1
+                self._latencies.append(time.perf_counter() - accepted)
+            done(client)
+        except Exception as e:
+            failed(e, traceback.format_exc())
+        finally:
+            self.release()
+
+    def _watch(self, sock: socket.socket):
+        with self._lock:
+            self._deadlines[sock] = time.monotonic() + self.timeout
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._run_watchdog, daemon=True)
+                self._watchdog.start()
+            self._deadline_added.notify()
+
+    def _unwatch(self, sock: socket.socket) -> bool:
+        """
+        Returns:
+            returns True if the watchdog shut the socket down
+        """
+        with self._lock:
+            self._deadlines.pop(sock, None)
+            if sock in self._expired:
+                self._expired.discard(sock)
+                return True
+            return False
+
+    def _run_watchdog(self):
+        # there are at most max_pending running handshakes, so the deadlines are scanned
+        with self._lock:
+            while not self._closed:
+                now = time.monotonic()
+                for sock, deadline in list(self._deadlines.items()):
+                    if deadline <= now:
+                        del self._deadlines[sock]
+                        self._expired.add(sock)
+                        try:
+                            sock.shutdown(socket.SHUT_RDWR)  # wakes up the blocked recv of the worker
+                        except OSError:
+                            pass
+                self._deadline_added.wait(min(self._deadlines.values()) - now if self._deadlines else None)
+
+    def stats(self) -> dict:
+        """
+        returns statistics of the handshakes, times are in milliseconds
+
+        Returns:
+            returns a dict containing the amount of accepted, completed, failed and timed out handshakes, the accepted
+            connections per second and percentiles of the handshake latency (of the last 4096 handshakes)
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "accepted": self._accepted,
+                "accepted_per_second": self._accepted / max(time.monotonic() - self._started, 1e-9),
+                "completed": self._completed,
+                "failed": self._failed,
+                "timeouts": self._timeouts,
+                "pending": self._pending,
+                "latency_p50_ms": _percentile(latencies, 50) * 1000,
+                "latency_p90_ms": _percentile(latencies, 90) * 1000,
+                "latency_p99_ms": _percentile(latencies, 99) * 1000,
+                "latency_max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        stops the workers
+
+        Args:
+            wait: if it should wait till the running handshakes finished
+        """
+        with self._lock:
+            self._closed = True
+            self._deadline_added.notify()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,182 @@
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+
+class Inbox:
+    """
+    A bounded queue for received messages. The capacity can be limited by the amount of messages and by their size in
+    bytes. If the inbox is full, the policy decides what happens with a new message:
+
+    - "block": the receiving thread waits till the inbox is drained, so the sender is slowed down by TCP
+    - "drop_oldest": the oldest messages are removed
+    - "drop_newest": the new message is dropped
+    - "disconnect": the new message is dropped and the client which send it gets disconnected
+
+    `on_high_water` is called once the inbox is filled to `high_water` of its capacity, it's called again after the
+    inbox got drained below that mark.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    DISCONNECT = "disconnect"
+
+    def __init__(self, max_messages: Optional[int] = None, max_bytes: Optional[int] = None, policy: str = "block",
+                 high_water: float = 0.8):
+        """
+        Args:
+            max_messages: maximal amount of messages, None means no limit
+            max_bytes: maximal size of the messages in bytes, None means no limit
+            policy: "block", "drop_oldest", "drop_newest" or "disconnect"
+            high_water: fraction of the capacity at which `on_high_water` is called
+
+        Raises:
+            ValueError: if the policy is unknown or a limit is lower than 1
+        """
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.DROP_NEWEST, self.DISCONNECT):
+            raise ValueError(f"unknown policy {policy!r}")
+        if (max_messages is not None and max_messages < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("the limits must be at least 1")
+
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.high_water = high_water
+
+        self._items = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._above_high_water = False
+        self._space_callbacks = []
+        self._space_wanted = False
+
+        self.on_high_water: Optional[Callable] = None
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __iter__(self):
+        return iter(self.items())
+
+    @property
+    def nbytes(self) -> int:
+        """the size of the queued messages in bytes"""
+        return self._bytes
+
+    @property
+    def full(self) -> bool:
+        """Is True if the inbox is full"""
+        return self._full(0)
+
+    def _full(self, size: int) -> bool:
+        if self.max_messages is not None and len(self._items) >= self.max_messages:
+            return True
+        # a single message which is bigger than max_bytes is accepted if the inbox is empty
+        return self.max_bytes is not None and bool(self._items) and self._bytes + size > self.max_bytes
+
+    def _reached_high_water(self) -> bool:
+        if self.max_messages is not None and len(self._items) >= self.max_messages * self.high_water:
+            return True
+        return self.max_bytes is not None and self._bytes >= self.max_bytes * self.high_water
+
+    def add_space_callback(self, callback: Callable) -> None:
+        """
+        adds a function, which is called when the inbox got drained after `put(block=False)` returned False
+
+        Args:
+            callback: function without arguments
+        """
+        self._space_callbacks.append(callback)
+
+    def put(self, item, block: bool = True) -> bool:
+        """
+        adds a message, its size is `len(item)`
+
+        Args:
+            item: the message
+            block: if the call should wait while the inbox is full and the policy is "block"
+
+        Returns:
+            returns True if the message was added
+        """
+        size = len(item)
+        with self._lock:
+            while self._full(size):
+                if self.policy == self.DROP_OLDEST:
+                    self._bytes -= len(self._items.popleft())
+                    self.dropped += 1
+                elif self.policy == self.BLOCK and not self._closed:
+                    if not block:
+                        self._space_wanted = True
+                        return False
+                    self._not_full.wait()
+                else:
+                    self.dropped += 1
+                    return False
+            self._items.append(item)
+            self._bytes += size
+            high_water = not self._above_high_water and self._reached_high_water()
+            if high_water:
+                self._above_high_water = True
+
+        if high_water and callable(self.on_high_water):
+            self.on_high_water()
+        return True
+
+    def drain(self, max_items: Optional[int] = None) -> List:
+        """
+        removes and returns the queued messages, the queue is swapped instead of copied
+
+        Args:
+            max_items: maximal amount of returned messages, None returns every message
+
+        Returns:
+            returns a list of the messages
+        """
+        with self._lock:
+            if max_items is None or max_items >= len(self._items):
+                items, self._items = self._items, deque()
+                self._bytes = 0
+            else:
+                popleft = self._items.popleft
+                items = [popleft() for _ in range(max_items)]
+                self._bytes -= sum(map(len, items))
+            if self._above_high_water and not self._reached_high_water():
+                self._above_high_water = False
+            self._not_full.notify_all()
+            space_wanted, self._space_wanted = self._space_wanted, False
+
+        if space_wanted:
+            for callback in self._space_callbacks:
+                callback()
+        return list(items)
+
+    def items(self) -> List:
+        """
+        Returns:
+            returns a list of the queued messages without removing them
+        """
+        with self._lock:
+            return list(self._items)
+
+    def close(self) -> None:
+        """
+        wakes up blocked receivers, afterwards the inbox doesn't block anymore till `reopen()` is called
+        """
+        with self._lock:
+            self._closed = True
+            self._not_full.notify_all()
+
+    def reopen(self) -> None:
+        """
+        lets the "block" policy block again after `close()`, e.g. when a closed Client connects again
+        """
+        with self._lock:
+            self._closed = False
@@ -0,0 +1,70 @@
+import os
+import tempfile
+from typing import Optional, Union
+
+from Crypto.PublicKey import RSA
+
+
+def load_key(key: Union[RSA.RsaKey, bytes, str], passphrase: Optional[str] = None) -> RSA.RsaKey:
+    """
+    imports a private RSA key
+
+    Args:
+        key: a RsaKey or the key in PEM or DER format
+        passphrase: the passphrase of an encrypted key
+
+    Returns:
+        returns the key
+
+    Raises:
+        ValueError: if the key couldn't be imported or isn't a private key
+    """
+    if not isinstance(key, RSA.RsaKey):
+        key = RSA.import_key(key, passphrase)
+    if not key.has_private():
+        raise ValueError("the key isn't a private key")
+    return key
+
+
+def load_or_create_key(path: str, keysize: int = 2048, passphrase: Optional[str] = None) -> RSA.RsaKey:
+    """
+    loads the private RSA key from a PEM or DER file. If the file doesn't exist, a key is generated and saved in PEM
+    format, only readable by the owner. If several processes create the file at the same time, all of them use the
+    key which was saved first
+
+    Args:
+        path: path of the key file
+        keysize: size of a generated key in bits
+        passphrase: passphrase which protects the file
+
+    Returns:
+        returns the key
+    """
+    try:
+        with open(path, "rb") as file:
+            return load_key(file.read(), passphrase)
+    except FileNotFoundError:
+        pass
+
+    key = RSA.generate(keysize)
+    if passphrase is None:
+        data = key.export_key("PEM")
+    else:
+        data = key.export_key("PEM", passphrase, pkcs=8, protection="scryptAndAES128-CBC")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".key-")  # mkstemp creates the file with mode 0600
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        try:
+            os.link(temporary, path)  # fails if another process saved its key first
+        except FileExistsError:
+            with open(path, "rb") as file:
+                return load_key(file.read(), passphrase)
+        except OSError:  # the file system doesn't support hard links
+            os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return key
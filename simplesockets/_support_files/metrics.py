@@ -0,0 +1,293 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, Hashable, Optional
+
+_SUB_BITS = 5  # values below 2 ** _SUB_BITS get their own bucket, above every power of two has 16 buckets
+_HALF = 1 << (_SUB_BITS - 1)
+_BUCKETS = (1 << _SUB_BITS) + 40 * _HALF  # covers values up to 2 ** 44 microseconds
+
+
+def _bucket(value: int) -> int:
+    if value < 1 << _SUB_BITS:
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return min((1 << _SUB_BITS) + (shift - 1) * _HALF + (value >> shift) - _HALF, _BUCKETS - 1)
+
+
+def _lowest(bucket: int) -> int:
+    if bucket < 1 << _SUB_BITS:
+        return bucket
+    shift = (bucket - (1 << _SUB_BITS)) // _HALF + 1
+    return (_HALF + (bucket - (1 << _SUB_BITS)) % _HALF) << shift
+
+
+class Histogram:
+    """
+    A latency histogram in the style of HdrHistogram: durations are counted in microsecond buckets, which are
+    linear below 32µs and split every power of two into 16 buckets above, so percentiles have an error of at most
+    6% and recording only increments a list entry. `record()` doesn't lock, two threads recording at the very same
+    moment can lose a count, which doesn't matter for monitoring.
+    """
+    __slots__ = ("_counts", "count", "total", "max")
+
+    def __init__(self):
+        self._counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0  # sum of the durations in seconds
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        counts a duration
+
+        Args:
+            seconds: the duration in seconds
+        """
+        self._counts[_bucket(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        adds the counts of another histogram
+        """
+        counts = self._counts
+        for index, count in enumerate(other._counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Args:
+            percent: the percentile, between 0 and 100
+
+        Returns:
+            returns the duration in seconds, below which `percent` of the durations are
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(self.count * percent / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min((_lowest(index) + _lowest(index + 1)) / 2e6, self.max)  # the middle of the bucket
+        return self.max
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            returns the count, the average and the 50th, 90th, 99th percentile and the maximum in milliseconds
+        """
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class ConnectionMetrics:
+    """
+    The counters of one connection. They are updated without locking by the threads which use the connection.
+    """
+    __slots__ = ("bytes_in", "bytes_out", "messages_in", "messages_out", "recv_calls", "send_calls", "encrypt",
+                 "decrypt", "handler")
+
+    COUNTERS = ("bytes_in", "bytes_out", "messages_in", "messages_out", "recv_calls", "send_calls")
+    HISTOGRAMS = ("encrypt", "decrypt", "handler")
+
+    def __init__(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.recv_calls = 0  # recv syscalls
+        self.send_calls = 0  # send and sendmsg syscalls
+        self.encrypt = Histogram()
+        self.decrypt = Histogram()
+        self.handler = Histogram()  # duration of on_receive and the request handlers
+
+    def merge(self, other: "ConnectionMetrics") -> None:
+        """
+        adds the counters of another connection
+        """
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in self.HISTOGRAMS:
+            getattr(self, name).merge(getattr(other, name))
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            returns the counters and the snapshots of the histograms
+        """
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        for name in self.HISTOGRAMS:
+            result[name] = getattr(self, name).snapshot()
+        return result
+
+
+class Metrics:
+    """
+    The metrics of a Server: one ConnectionMetrics per connection, the counters of closed connections are added to
+    the totals.
+    """
+
+    def __init__(self):
+        self._connections: Dict[Hashable, ConnectionMetrics] = {}
+        self._closed = ConnectionMetrics()
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, metrics: ConnectionMetrics) -> None:
+        """
+        adds the metrics of a connection
+
+        Args:
+            key: the key of the connection, e.g. the address
+            metrics: the metrics of the connection
+        """
+        with self._lock:
+            self._connections[key] = metrics
+
+    def remove(self, key: Hashable) -> None:
+        """
+        removes a closed connection, its counters stay in the totals
+        """
+        with self._lock:
+            metrics = self._connections.pop(key, None)
+            if metrics is not None:
+                self._closed.merge(metrics)
+
+    def total(self) -> ConnectionMetrics:
+        """
+        Returns:
+            returns the sum of the open and the closed connections
+        """
+        total = ConnectionMetrics()
+        with self._lock:
+            total.merge(self._closed)
+            for metrics in self._connections.values():
+                total.merge(metrics)
+        return total
+
+    def snapshot(self, connections: bool = True) -> dict:
+        """
+        Args:
+            connections: if the metrics of every connection should be included
+
+        Returns:
+            returns the totals and the amount of open connections, optionally the metrics per connection
+        """
+        with self._lock:
+            items = list(self._connections.items())
+        result = {"connections": len(items), "total": self.total().snapshot()}
+        if connections:
+            result["clients"] = {key: metrics.snapshot() for key, metrics in items}
+        return result
+
+
+def prometheus_text(stats: dict, prefix: str = "simplesockets") -> str:
+    """
+    formats the result of `stats()` in the Prometheus text format: counters, gauges for the other numbers and
+    summaries for the histograms, the metrics per connection are left out
+
+    Args:
+        stats: the result of `TCPServer.stats()` or `TCPClient.stats()`
+        prefix: prefix of the metric names
+
+    Returns:
+        returns the text
+    """
+    lines = []
+    total = stats.get("total", {})
+    for name in ConnectionMetrics.COUNTERS:
+        if name in total:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {total[name]}")
+    for name in ConnectionMetrics.HISTOGRAMS:
+        histogram = total.get(name)
+        if histogram is None:
+            continue
+        metric = f"{prefix}_{name}_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for quantile in ("50", "90", "99"):
+            lines.append(f'{metric}{{quantile="0.{quantile}"}} {histogram[f"p{quantile}_ms"] / 1000:.9f}')
+        lines.append(f"{metric}_sum {histogram['avg_ms'] * histogram['count'] / 1000:.9f}")
+        lines.append(f"{metric}_count {histogram['count']}")
+    for name, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """
+    Serves the metrics in the Prometheus text format on `http://ip:port/metrics` from a daemon thread
+    """
+
+    def __init__(self, collect: Callable[[], dict], ip: str = "127.0.0.1", port: int = 9100,
+                 prefix: str = "simplesockets"):
+        """
+        Args:
+            collect: function which returns the stats, e.g. `server.stats`
+            ip: IP the exporter listens on, it should stay local
+            port: port of the exporter, 0 chooses a free one
+            prefix: prefix of the metric names
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text(collect(), prefix).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _ThreadingHTTPServer((ip, port), Handler)
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.5,), daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """
+        stops the exporter
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def timed(histogram: Optional[Histogram], function: Callable, *args):
+    """
+    calls the function and records its duration, if a histogram is given
+
+    Returns:
+        returns the result of the function
+    """
+    if histogram is None:
+        return function(*args)
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        histogram.record(time.perf_counter() - start)
@@ -0,0 +1,380 @@
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from simplesockets._support_files.error import Exception_Collection
+from simplesockets._support_files.handshake import _percentile
+
+
+class _Target:
+    """the connections of one target address"""
+
+    def __init__(self):
+        self.clients = []  # all connections
+        self.idle = []  # connections which aren't checked out, requests are send over them
+        self.last_used = {}  # key: id of the client, value: time.monotonic() of the last use
+        self.checked = {}  # key: id of the client, value: time.monotonic() of the last health check
+        self.connecting = 0  # connections which are being established
+
+    @property
+    def size(self) -> int:
+        return len(self.clients) + self.connecting
+
+
+class ClientPool:
+    """
+    Keeps connected Clients per target address, so they can be reused instead of connecting for every message.
+    A Client is either checked out by one user at a time with `checkout()` or `connection()`, or shared by
+    `request()`, which sends over the idle Client with the least requests in flight. The Clients of a pool receive
+    automatically, received messages are collected in their inbox, which is cleared on checkin. A background thread
+    closes Clients which were idle for `idle_timeout` seconds and pings the others every `health_interval` seconds,
+    Clients which don't answer within `health_timeout` seconds are closed.
+    """
+
+    client_class = None  # set by the subclasses
+
+    def __init__(self, min_size: int = 0, max_size: int = 8, idle_timeout: Optional[float] = 60.0,
+                 health_interval: Optional[float] = 10.0, health_timeout: float = 2.0,
+                 checkout_timeout: Optional[float] = 10.0, pipeline_depth: int = 16, **settings):
+        """
+        Args:
+            min_size: amount of Clients per address, which are kept open even if they are idle
+            max_size: maximal amount of Clients per address
+            idle_timeout: seconds after which an idle Client is closed, None keeps them open
+            health_interval: seconds between the health checks of an idle Client, None disables them
+            health_timeout: seconds a Client has to answer a health check
+            checkout_timeout: default timeout of `checkout()` and `request()` while all Clients are in use
+            pipeline_depth: amount of requests in flight on a Client, before `request()` connects another one
+            **settings: keyword arguments for `setup()` of the Clients
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.checkout_timeout = checkout_timeout
+        self.pipeline_depth = pipeline_depth
+        self.exceptions = Exception_Collection()
+        self._settings = settings
+
+        self._targets: Dict[tuple, _Target] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._started = time.monotonic()
+        self._checkouts = 0
+        self._requests = 0
+        self._hits = 0  # checkouts and requests which got an open Client
+        self._connects = 0
+        self._failed_connects = 0
+        self._evicted = 0
+        self._health_checks = 0
+        self._health_failures = 0
+        self._waits = deque(maxlen=4096)  # seconds `checkout()` and `request()` waited for a Client
+
+    def checkout(self, address: tuple, timeout: Optional[float] = None):
+        """
+        lends a connected Client to the caller, it has to be returned with `checkin()`
+
+        Args:
+            address: the address (ip, port) of the Server
+            timeout: seconds to wait while max_size Clients are in use, defaults to checkout_timeout
+
+        Returns:
+            returns the Client
+
+        Raises:
+            TimeoutError: if no Client got free in time
+            ConnectionError: if connecting failed
+        """
+        return self._acquire(tuple(address), timeout, exclusive=True)
+
+    def checkin(self, client, discard: bool = False) -> None:
+        """
+        returns a Client, which was lent by `checkout()`
+
+        Args:
+            client: the Client
+            discard: if the Client should be closed instead of being reused, e.g. after an error
+        """
+        client.return_recved_data()
+        with self._lock:
+            target = self._targets[client.Address]
+            removed = discard or not client.event.is_connected or self._closed.is_set()
+            if removed:
+                self._remove(target, client)
+            else:
+                target.idle.append(client)
+                target.last_used[id(client)] = time.monotonic()
+            self._changed.notify_all()
+        if removed:
+            _close(client)
+
+    @contextmanager
+    def connection(self, address: tuple, timeout: Optional[float] = None):
+        """
+        checks a Client out for the with block, it's discarded if the block raises a ConnectionError
+
+        Args:
+            address: the address (ip, port) of the Server
+            timeout: seconds to wait while max_size Clients are in use, defaults to checkout_timeout
+        """
+        client = self.checkout(address, timeout)
+        try:
+            yield client
+        except ConnectionError:
+            self.checkin(client, discard=True)
+            raise
+        except BaseException:
+            self.checkin(client)
+            raise
+        self.checkin(client)
+
+    def request(self, address: tuple, data: bytes, timeout: Optional[float] = None, method: str = "") -> Future:
+        """
+        sends a request with `Client.request()` over the idle Client with the least requests in flight. If all of them
+        have pipeline_depth requests in flight, another Client is connected
+
+        Args:
+            address: the address (ip, port) of the Server
+            data: data of the request
+            timeout: time in seconds after which the Future fails with a TimeoutError, None waits forever
+            method: name of the handler at the Server
+
+        Returns:
+            returns a Future of the reply
+
+        Raises:
+            TimeoutError: if all Clients were checked out for longer than checkout_timeout
+            ConnectionError: if connecting failed
+        """
+        client = self._acquire(tuple(address), self.checkout_timeout, exclusive=False)
+        return client.request(data, timeout, method)
+
+    def _acquire(self, address: tuple, timeout: Optional[float], exclusive: bool):
+        if timeout is None:
+            timeout = self.checkout_timeout
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        closing = []
+        try:
+            with self._lock:
+                if self._closed.is_set():
+                    raise ConnectionError("the pool is closed")
+                target = self._targets.get(address)
+                if target is None:
+                    target = self._targets[address] = _Target()
+                    self._start_maintenance()
+                while True:
+                    for client in [client for client in target.idle if not client.event.is_connected]:
+                        closing.append(self._remove(target, client))
+                    client = min(target.idle, key=lambda client_: client_.in_flight, default=None)
+                    if client is not None and (exclusive or client.in_flight < self.pipeline_depth or
+                                               target.size >= self.max_size):
+                        break
+                    if target.size < self.max_size:
+                        client = None
+                        target.connecting += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"all {self.max_size} Clients of {address} are in use")
+                    self._changed.wait(remaining)
+
+                if client is not None:
+                    if exclusive:
+                        target.idle.remove(client)
+                    self._count(exclusive, hit=True)
+                    target.last_used[id(client)] = time.monotonic()
+                    self._waits.append(time.perf_counter() - start)
+                    return client
+        finally:
+            for stale in closing:  # after the lock is released
+                _close(stale)
+
+        client = self._connect(address, target)
+        with self._lock:
+            self._count(exclusive, hit=False)
+            if not exclusive:
+                target.idle.append(client)
+            target.last_used[id(client)] = time.monotonic()
+            self._waits.append(time.perf_counter() - start)
+        return client
+
+    def _count(self, exclusive: bool, hit: bool):
+        # the caller has to hold the lock
+        if exclusive:
+            self._checkouts += 1
+        else:
+            self._requests += 1
+        self._hits += hit
+
+    def _connect(self, address: tuple, target: _Target):
+        # the caller has reserved the place with target.connecting
+        client = None
+        try:
+            client = self.client_class()
+            client.setup(address[0], address[1], **self._settings)
+            connected = client.connect()
+            if connected:
+                client.autorecv()
+        except BaseException:
+            connected = False
+            raise
+        finally:
+            with self._lock:
+                target.connecting -= 1
+                if connected:
+                    self._connects += 1
+                    target.clients.append(client)
+                else:
+                    self._failed_connects += 1
+                self._changed.notify_all()
+        if not connected:
+            exceptions = client.return_exceptions()
+            raise ConnectionError(f"couldn't connect to {address}: "
+                                  f"{list(exceptions.values())[-1] if exceptions else 'unknown error'}")
+        return client
+
+    def _remove(self, target: _Target, client):
+        # the caller has to hold the lock and closes the returned Client with `_close()` after releasing it, closing
+        # joins the threads of the Client and fails its futures, whose callbacks may use the pool
+        if client in target.idle:
+            target.idle.remove(client)
+        if client in target.clients:
+            target.clients.remove(client)
+            self._evicted += 1
+        target.last_used.pop(id(client), None)
+        target.checked.pop(id(client), None)
+        return client
+
+    def _start_maintenance(self):
+        if self._thread is None and (self.idle_timeout is not None or self.health_interval is not None or
+                                     self.min_size > 0):
+            self._thread = threading.Thread(target=self._maintain, daemon=True)
+            self._thread.start()
+
+    def _maintain(self):
+        intervals = [value for value in (self.idle_timeout, self.health_interval) if value is not None]
+        interval = min(intervals) / 2 if intervals else 1.0
+        while not self._closed.wait(interval):
+            try:
+                self._maintain_once()
+            except Exception as e:
+                self.exceptions.add(e, traceback.format_exc())
+
+    def _maintain_once(self):
+        now = time.monotonic()
+        checks = []
+        closing = []
+        with self._lock:
+            targets = list(self._targets.items())
+            for address, target in targets:
+                for client in sorted(target.idle, key=lambda client_: target.last_used.get(id(client_), now)):
+                    idle = now - target.last_used.get(id(client), now)
+                    if not client.event.is_connected:
+                        closing.append(self._remove(target, client))
+                    elif client.in_flight:
+                        continue
+                    elif self.idle_timeout is not None and idle >= self.idle_timeout and \
+                            len(target.clients) > self.min_size:
+                        closing.append(self._remove(target, client))
+                    elif self.health_interval is not None and \
+                            now - target.checked.get(id(client), 0.0) >= self.health_interval and \
+                            idle >= self.health_interval:
+                        target.idle.remove(client)  # it isn't lent while it's checked
+                        checks.append((target, client))
+        for client in closing:
+            _close(client)
+
+        for target, client in checks:
+            try:
+                client.ping(self.health_timeout)
+                healthy = True
+            except Exception:
+                healthy = False
+            with self._lock:
+                self._health_checks += 1
+                if healthy:
+                    target.idle.append(client)
+                    target.checked[id(client)] = time.monotonic()
+                else:
+                    self._health_failures += 1
+                    self._remove(target, client)
+                self._changed.notify_all()
+            if not healthy:
+                _close(client)
+
+        for address, target in targets:
+            while not self._closed.is_set():
+                with self._lock:
+                    if target.size >= self.min_size:
+                        break
+                    target.connecting += 1
+                client = self._connect(address, target)
+                with self._lock:
+                    target.idle.append(client)
+                    target.last_used[id(client)] = time.monotonic()
+                    self._changed.notify_all()
+
+    def stats(self) -> dict:
+        """
+        returns statistics of the pool, times are in milliseconds
+
+        Returns:
+            returns a dict containing the amount of checkouts and requests, the hit rate (the part of them which got
+            an open Client), the connects per second, failed connects, closed Clients, health checks and their
+            failures, the open, idle and checked out Clients, the requests in flight and the wait time of `checkout()`
+            and `request()` (of the last 4096 calls)
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            clients = [client for target in self._targets.values() for client in target.clients]
+            idle = sum(len(target.idle) for target in self._targets.values())
+            return {
+                "checkouts": self._checkouts,
+                "requests": self._requests,
+                "hit_rate": self._hits / max(self._checkouts + self._requests, 1),
+                "connects": self._connects,
+                "connects_per_second": self._connects / max(time.monotonic() - self._started, 1e-9),
+                "failed_connects": self._failed_connects,
+                "evicted": self._evicted,
+                "health_checks": self._health_checks,
+                "health_failures": self._health_failures,
+                "size": len(clients),
+                "idle": idle,
+                "checked_out": len(clients) - idle,
+                "in_flight": sum(client.in_flight for client in clients),
+                "wait_avg_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+                "wait_p99_ms": _percentile(waits, 99) * 1000,
+            }
+
+    def close(self) -> None:
+        """
+        closes all Clients, checked out Clients are closed when they are returned
+        """
+        self._closed.set()
+        with self._lock:
+            closing = [self._remove(target, client) for target in self._targets.values()
+                       for client in list(target.idle)]
+            self._changed.notify_all()
+        for client in closing:
+            _close(client)
+
+
+def _close(client) -> None:
+    try:
+        client.close()
+    except OSError:  # the connection is already closed
+        pass
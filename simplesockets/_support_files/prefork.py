@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Optional
+
+from simplesockets._support_files.error import SocketError, Exception_Collection
+from simplesockets._support_files.sockopts import SocketOptions
+
+
+def _worker(server_class, max_connections, setup_kwargs, listener, exceptions, worker_id):
+    server = server_class(max_connections)
+    if listener is not None:
+        setup_kwargs = {key: value for key, value in setup_kwargs.items() if key not in ("ip", "port", "listen")}
+        server.setup(sock=listener, **setup_kwargs)
+    else:
+        server.setup(reuse_port=True, **setup_kwargs)
+    server.start()
+
+    while True:
+        event, value = server.await_event()
+        if event == server.EVENT_EXCEPTION:
+            for time_, exception in value.items():
+                error = exception.exception
+                try:
+                    pickle.dumps(error)
+                except Exception:
+                    error = SocketError(f"{error.__class__.__name__}: {error}")
+                exceptions.put((worker_id, time_, error, exception.traceback))
+
+
+class ProcessGroup:
+    """
+    Runs a TCPServer (or SecureServer) in several processes which accept connections on the same address. Every
+    worker binds its own socket with SO_REUSEPORT, so the kernel distributes the connections. Where SO_REUSEPORT isn't
+    available, the workers share one listening socket created by the parent process.
+
+    The parent supervises the workers, restarts the ones which died and collects their exceptions in
+    `event.exception`. Received data is only handed to `on_receive` in the workers. With port 0 the port is chosen
+    once by the parent, `port` contains it.
+
+    Attributes:
+        self.event.exception.occurred (bool): Is True if an exception got caught by a worker
+        self.event.exception.exceptions (Exception_Collection): contains the exceptions of all workers
+        self.restarts (int): how often workers got restarted
+        self.port (int): the port the workers listen on
+    """
+
+    def __init__(self, server_class, workers: Optional[int] = None, max_connections: Optional[int] = None,
+                 reuse_port: Optional[bool] = None, restart_delay: float = 1.0, **setup_kwargs):
+        """
+        Args:
+            server_class: TCPServer or a subclass of it
+            workers: amount of worker processes, defaults to the amount of cores
+            max_connections: max_connections of every worker
+            reuse_port: if the workers should bind with SO_REUSEPORT, defaults to True where it's available
+            restart_delay: minimal time in seconds between two starts of the same worker
+            **setup_kwargs: arguments for `server_class.setup()`, functions have to be picklable if the platform
+                doesn't support fork
+        """
+        def get_event():
+            class Exceptions:
+                occurred = False
+                exceptions = Exception_Collection()
+
+            class Events:
+                exception = Exceptions()
+
+            return Events()
+
+        self.server_class = server_class
+        self.workers = workers or os.cpu_count() or 1
+        self.max_connections = max_connections
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT") if reuse_port is None else reuse_port
+        self.restart_delay = restart_delay
+        self.setup_kwargs = setup_kwargs
+        self.port = setup_kwargs.get("port", 25567)
+
+        self.event = get_event()
+        self.restarts = 0
+
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._exceptions = self._context.Queue()
+        self._processes = {}  # key: worker id, value: [process, start time]
+        self._listener: Optional[socket.socket] = None
+        self._reserved: Optional[socket.socket] = None  # keeps the chosen port of the SO_REUSEPORT workers
+        self._supervisor: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def pids(self) -> list:
+        """the process ids of the workers"""
+        return [process.pid for process, started in self._processes.values()]
+
+    def start(self) -> None:
+        """
+        starts the workers and the supervising thread
+        """
+        ip = self.setup_kwargs.get("ip", "127.0.0.1")
+        if not self.reuse_port:
+            self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            options = SocketOptions.resolve(self.setup_kwargs.get("socket_options"))
+            if options is not None:
+                options.apply(self._listener, listener=True)
+            self._listener.bind((ip, self.port))
+            self._listener.listen(self.setup_kwargs.get("listen", 5))
+            self.port = self._listener.getsockname()[1]
+        elif self.port == 0:
+            # every worker would bind another ephemeral port, so it's chosen once. The socket doesn't listen, so it
+            # doesn't get connections, it only keeps the port till the group is closed
+            self._reserved = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._reserved.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self._reserved.bind((ip, 0))
+            self.port = self._reserved.getsockname()[1]
+
+        for worker_id in range(self.workers):
+            self._start_worker(worker_id)
+
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def _start_worker(self, worker_id: int):
+        process = self._context.Process(target=_worker, daemon=True,
+                                        args=(self.server_class, self.max_connections,
+                                              dict(self.setup_kwargs, port=self.port),
+                                              self._listener, self._exceptions, worker_id))
+        process.start()
+        self._processes[worker_id] = [process, time.monotonic()]
+
+    def _supervise(self):
+        while not self._closed:
+            sentinels = [process.sentinel for process, started in self._processes.values() if process.is_alive()]
+            wait(sentinels, timeout=min(self.restart_delay, 0.5))
+            self._collect_exceptions()
+            if self._closed:
+                return
+            for worker_id, (process, started) in list(self._processes.items()):
+                if process.is_alive() or time.monotonic() - started < self.restart_delay:
+                    continue
+                process.join()
+                self.event.exception.occurred = True
+                self.event.exception.exceptions.add(
+                    SocketError(f"worker {worker_id} exited with code {process.exitcode}"), None)
+                self._start_worker(worker_id)
+                self.restarts += 1  # counted after `pids` contains the new worker
+
+    def _collect_exceptions(self):
+        while True:
+            try:
+                worker_id, time_, exception, traceback_ = self._exceptions.get_nowait()
+            except Exception:  # queue.Empty
+                return
+            self.event.exception.occurred = True
+            self.event.exception.exceptions.add(exception, f"worker {worker_id} at {time_}:\n{traceback_}")
+
+    def return_exceptions(self, delete: Optional[bool] = True, reset_exception: Optional[bool] = True) -> dict:
+        """
+        Returns the collected exceptions of all workers as a dict. Key is the time and value the Exception
+
+        Args:
+            delete: If the list which collected the exceptions should be cleared
+            reset_exception: If the exception occurred variable should be reset (set to False)
+
+        Returns:
+            returns a dict of all collected exceptions
+        """
+        self._collect_exceptions()
+        exceptions = self.event.exception.exceptions.exceptions
+        if delete:
+            self.event.exception.exceptions.clear()
+        if reset_exception:
+            self.event.exception.occurred = False
+        return exceptions
+
+    def close(self) -> None:
+        """
+        terminates the workers
+        """
+        self._closed = True
+        for process, started in self._processes.values():
+            process.terminate()
+        for process, started in self._processes.values():
+            process.join(5)
+        if self._supervisor is not None:
+            self._supervisor.join(5)
+        if self._listener is not None:
+            self._listener.close()
+        if self._reserved is not None:
+            self._reserved.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
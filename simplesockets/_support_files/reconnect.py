@@ -0,0 +1,130 @@
+import random
+import threading
+from collections import deque
+from typing import Optional
+
+from simplesockets._support_files.framing import as_buffer
+
+
+class Reconnect:
+    """
+    Settings of the automatic reconnect of a Client. After the connection is lost, the Client tries to reconnect with
+    an exponential backoff: the n-th attempt waits `initial_delay * multiplier ** (n - 1)` seconds, at most
+    `max_delay`, minus a random part of up to `jitter` of it, so many Clients don't reconnect at the same time.
+    Messages which are send while the Client is disconnected are buffered and send after reconnecting.
+    """
+
+    def __init__(self, initial_delay: float = 0.1, max_delay: float = 30.0, multiplier: float = 2.0,
+                 jitter: float = 0.5, max_attempts: Optional[int] = None, max_messages: Optional[int] = 1024,
+                 max_bytes: Optional[int] = 1 << 20):
+        """
+        Args:
+            initial_delay: seconds before the second attempt, the first one is made right away
+            max_delay: maximal seconds between two attempts
+            multiplier: factor by which the delay grows with every attempt
+            jitter: the part of the delay which is random, between 0 and 1
+            max_attempts: attempts after which the Client gives up, None tries forever
+            max_messages: maximal amount of buffered messages, None means no limit
+            max_bytes: maximal size of the buffered messages in bytes, None means no limit
+
+        Raises:
+            ValueError: if a setting is out of range
+        """
+        if initial_delay < 0 or max_delay < initial_delay:
+            raise ValueError("the delays must satisfy 0 <= initial_delay <= max_delay")
+        if multiplier < 1:
+            raise ValueError("multiplier must be at least 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+
+    def delay(self, attempt: int) -> float:
+        """
+        Args:
+            attempt: the number of the failed attempt, starting with 1
+
+        Returns:
+            returns the seconds to wait before the next attempt
+        """
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** min(attempt - 1, 64))
+        return delay * (1 - self.jitter * random.random())
+
+    def buffer(self) -> "ReplayBuffer":
+        """
+        Returns:
+            returns an empty buffer with the limits of the settings
+        """
+        return ReplayBuffer(self.max_messages, self.max_bytes)
+
+
+class ReplayBuffer:
+    """
+    A bounded queue of messages, which are send after the Client reconnected. The messages are stored uncompressed
+    and unencrypted, because the new connection has its own compression and session.
+    """
+
+    def __init__(self, max_messages: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._messages = deque()
+        self._bytes = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._messages)
+
+    @property
+    def size(self) -> int:
+        """size of the buffered messages in bytes"""
+        return self._bytes
+
+    @property
+    def dropped(self) -> int:
+        """amount of messages which didn't fit into the buffer"""
+        return self._dropped
+
+    def put(self, data) -> bool:
+        """
+        buffers a message, it's copied because the caller may reuse its buffer
+
+        Returns:
+            returns False if the buffer is full, the message is dropped in that case
+        """
+        data = bytes(as_buffer(data))
+        with self._lock:
+            if (self.max_messages is not None and len(self._messages) >= self.max_messages) or \
+                    (self.max_bytes is not None and self._bytes + len(data) > self.max_bytes):
+                self._dropped += 1
+                return False
+            self._messages.append(data)
+            self._bytes += len(data)
+        return True
+
+    def requeue(self, messages: list) -> None:
+        """
+        puts messages, which couldn't be send, back to the front of the buffer, even if it's full
+        """
+        with self._lock:
+            self._messages.extendleft(reversed(messages))
+            self._bytes += sum(len(message) for message in messages)
+
+    def drain(self) -> list:
+        """
+        Returns:
+            returns and removes all buffered messages
+        """
+        with self._lock:
+            messages = list(self._messages)
+            self._messages.clear()
+            self._bytes = 0
+        return messages
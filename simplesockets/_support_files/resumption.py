@@ -0,0 +1,125 @@
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+from Crypto.Random import get_random_bytes
+
+TICKET_SIZE = 16
+RANDOM_SIZE = 16
+_LIFETIME = struct.Struct("!I")
+
+
+def resumption_secret(key: bytes, salt: bytes) -> bytes:
+    """
+    derives the secret, which is used to resume a session, from the key and salt of the session
+
+    Args:
+        key: the key of the session
+        salt: the salt of the session
+
+    Returns:
+        returns the 256 bit secret
+    """
+    return HKDF(key, 32, salt, SHA256, context=b'simplesockets resumption')
+
+
+def resumed_session(secret: bytes, client_random: bytes, server_random: bytes) -> Tuple[bytes, bytes]:
+    """
+    derives the key and salt of a resumed session, the randoms of both sides make sure the keys are fresh
+
+    Args:
+        secret: the resumption secret of the previous session
+        client_random: random bytes of the Client
+        server_random: random bytes of the Server
+
+    Returns:
+        returns the key and the salt of the new session
+    """
+    salt = client_random + server_random
+    return HKDF(secret, 32, salt, SHA256, context=b'simplesockets resume'), salt
+
+
+def pack_ticket(ticket: bytes, lifetime: float) -> bytes:
+    """
+    Returns:
+        returns the payload of a FRAME_TICKET frame
+    """
+    return ticket + _LIFETIME.pack(int(lifetime))
+
+
+def unpack_ticket(payload) -> Optional[Tuple[bytes, float]]:
+    """
+    Returns:
+        returns the ticket and its lifetime in seconds or None if the Server didn't issue a ticket
+    """
+    if len(payload) != TICKET_SIZE + _LIFETIME.size:
+        return None
+    return bytes(payload[:TICKET_SIZE]), _LIFETIME.unpack_from(payload, TICKET_SIZE)[0]
+
+
+class TicketCache:
+    """
+    The session tickets of a Server: a bounded LRU cache, which maps the ticket to the resumption secret of a session.
+    Tickets expire after `lifetime` seconds and can only be used once, every connection gets a new one.
+    """
+
+    def __init__(self, lifetime: float = 3600.0, size: int = 10000):
+        """
+        Args:
+            lifetime: seconds a ticket can be used
+            size: maximal amount of stored tickets, the least recently issued ones are removed first
+        """
+        if lifetime <= 0 or size < 1:
+            raise ValueError("lifetime and size must be greater than 0")
+        self.lifetime = lifetime
+        self.size = size
+        self._tickets = OrderedDict()  # key: ticket, value: (secret, expiry)
+        self._lock = threading.Lock()
+        self.resumed = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._tickets)
+
+    @staticmethod
+    def new_ticket() -> bytes:
+        """
+        Returns:
+            returns a random ticket, it's valid after `store()` was called
+        """
+        return get_random_bytes(TICKET_SIZE)
+
+    def store(self, ticket: bytes, secret: bytes) -> None:
+        """
+        makes the ticket usable
+
+        Args:
+            ticket: ticket returned by `new_ticket()`
+            secret: the resumption secret of the session
+        """
+        with self._lock:
+            self._tickets[ticket] = (secret, time.monotonic() + self.lifetime)
+            while len(self._tickets) > self.size:
+                self._tickets.popitem(last=False)
+
+    def take(self, ticket: bytes) -> Optional[bytes]:
+        """
+        removes the ticket
+
+        Args:
+            ticket: the ticket presented by the Client
+
+        Returns:
+            returns the resumption secret or None if the ticket is unknown or expired
+        """
+        with self._lock:
+            secret, expiry = self._tickets.pop(bytes(ticket), (None, 0.0))
+            if secret is None or expiry < time.monotonic():
+                self.rejected += 1
+                return None
+            self.resumed += 1
+            return secret
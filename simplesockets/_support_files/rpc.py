@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Optional, Tuple
+
+#: RPC header: correlation id, flags and length of the method name, followed by the method name and the body
+HEADER = struct.Struct("!IBB")
+
+ERROR = 1  # the body of the reply is the error message of the handler
+COMPRESSED = 2  # the body is compressed
+
+_MAX_ID = 0xFFFFFFFF
+
+
+def pack(request_id: int, flags: int, method: bytes, body) -> bytes:
+    """
+    Returns:
+        returns the payload of a FRAME_REQUEST or FRAME_REPLY frame
+    """
+    return b''.join((HEADER.pack(request_id, flags, len(method)), method, body))
+
+
+def unpack(payload) -> Tuple[int, int, str, memoryview]:
+    """
+    Returns:
+        returns the correlation id, the flags, the method name and the body of a request or reply
+
+    Raises:
+        ValueError: if the payload is too short
+    """
+    payload = memoryview(payload)
+    if len(payload) < HEADER.size:
+        raise ValueError("the RPC header is incomplete")
+    request_id, flags, length = HEADER.unpack_from(payload)
+    start = HEADER.size + length
+    return request_id, flags, bytes(payload[HEADER.size:start]).decode(), payload[start:]
+
+
+class PendingRequests:
+    """
+    The requests of a Client which wait for their reply: maps the correlation ids to futures and fails the futures
+    whose timeout expired. The timeouts are watched by one daemon thread, which is started with the first timeout and
+    stops when no timeout is left or `fail_all()` is called.
+    """
+
+    def __init__(self):
+        self._futures = {}  # key: correlation id, value: Future
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._deadlines = []  # heap of (deadline, correlation id)
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return len(self._futures)
+
+    def add(self, timeout: Optional[float] = None) -> Tuple[int, Future]:
+        """
+        creates a future for a new request
+
+        Args:
+            timeout: seconds till the future fails with TimeoutError, None waits forever
+
+        Returns:
+            returns the correlation id and the future
+        """
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids) & _MAX_ID
+            while request_id in self._futures or request_id == 0:  # the ids wrapped around
+                request_id = next(self._ids) & _MAX_ID
+            self._futures[request_id] = future
+            if timeout is not None:
+                deadline = time.monotonic() + timeout
+                heapq.heappush(self._deadlines, (deadline, request_id))
+                if len(self._deadlines) > 2 * len(self._futures) + 1024:  # removes the deadlines of resolved requests
+                    self._deadlines = [entry for entry in self._deadlines if entry[1] in self._futures]
+                    heapq.heapify(self._deadlines)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._watch, daemon=True)
+                    self._thread.start()
+                elif self._deadlines[0][1] == request_id:  # the new deadline is the earliest one
+                    self._changed.notify()
+        return request_id, future
+
+    def resolve(self, request_id: int, result=None, exception: Optional[BaseException] = None) -> bool:
+        """
+        completes the future of a request
+
+        Returns:
+            returns False if the request is unknown, e.g. because its timeout expired
+        """
+        with self._lock:
+            future = self._futures.pop(request_id, None)
+        if future is None:
+            return False
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+        return True
+
+    def fail_all(self, exception: BaseException) -> None:
+        """
+        fails every waiting request and stops the thread which watches the timeouts, e.g. after the connection closed
+        """
+        with self._lock:
+            futures, self._futures = self._futures, {}
+            self._deadlines.clear()
+            thread, self._thread = self._thread, None
+            self._changed.notify()
+        for future in futures.values():
+            future.set_exception(exception)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _watch(self):
+        thread = threading.current_thread()
+        with self._lock:
+            while self._thread is thread:
+                while self._deadlines and self._deadlines[0][1] not in self._futures:  # already resolved
+                    heapq.heappop(self._deadlines)
+                if not self._deadlines:
+                    self._thread = None  # the next timeout starts a new thread
+                    return
+                deadline, request_id = self._deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._changed.wait(remaining)
+                    continue
+                heapq.heappop(self._deadlines)
+                future = self._futures.pop(request_id, None)
+                if future is not None:
+                    self._lock.release()
+                    try:
+                        future.set_exception(TimeoutError(f"the request {request_id} timed out"))
+                    finally:
+                        self._lock.acquire()
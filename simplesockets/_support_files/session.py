@@ -0,0 +1,107 @@
+import struct
+
+from Crypto.Cipher import AES, ChaCha20_Poly1305
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+
+from simplesockets._support_files.error import AuthenticationError
+
+TAG_SIZE = 16
+_NONCE = struct.Struct("!4xQ")  # 12 byte nonce: 4 zero bytes and a 64 bit counter
+_MAX_COUNTER = 2 ** 64 - 1
+
+
+class _Direction:
+    __slots__ = ("key", "counter")
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self.counter = 0
+
+    def next_nonce(self) -> bytes:
+        if self.counter > _MAX_COUNTER:
+            raise OverflowError("the nonces of the session are used up, reconnect to get a new session")
+        nonce = _NONCE.pack(self.counter)
+        self.counter += 1
+        return nonce
+
+
+class Session:
+    """
+    Encrypts the messages of a connection with ChaCha20-Poly1305. Both directions get their own key, derived with
+    HKDF from the exchanged key and salt, and count their nonces up from zero, so a nonce is never used twice with
+    the same key. The nonces aren't transmitted, because TCP keeps the order of the messages. Every encrypted message
+    carries its 16 byte tag, a message whose tag doesn't match raises AuthenticationError.
+    """
+
+    def __init__(self, key: bytes, salt: bytes, initiator: bool):
+        """
+        Args:
+            key: the exchanged 256 bit key
+            salt: the exchanged salt
+            initiator: True for the Client, False for the Server
+        """
+        client_key, server_key = HKDF(key, 32, salt, SHA256, num_keys=2, context=b'simplesockets session')
+        self.key = key
+        self._send = _Direction(client_key if initiator else server_key)
+        self._recv = _Direction(server_key if initiator else client_key)
+
+    def encrypt(self, data) -> bytes:
+        """
+        encrypts a message
+
+        Args:
+            data: the message, any object supporting the buffer protocol
+
+        Returns:
+            returns the encrypted message followed by its tag
+        """
+        cipher = ChaCha20_Poly1305.new(key=self._send.key, nonce=self._send.next_nonce())
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return ciphertext + tag
+
+    def decrypt(self, data) -> bytes:
+        """
+        decrypts a message and verifies its tag
+
+        Args:
+            data: the encrypted message followed by its tag
+
+        Returns:
+            returns the decrypted message
+
+        Raises:
+            AuthenticationError: if the tag doesn't match
+        """
+        data = memoryview(data)
+        if len(data) < TAG_SIZE:
+            raise AuthenticationError("the message is too short")
+        cipher = ChaCha20_Poly1305.new(key=self._recv.key, nonce=self._recv.next_nonce())
+        try:
+            return cipher.decrypt_and_verify(data[:-TAG_SIZE], data[-TAG_SIZE:])
+        except ValueError:
+            raise AuthenticationError("the message couldn't be authenticated") from None
+
+
+class LegacySession:
+    """
+    The scheme of simplesockets 0.4.0, which is used with `framed=False`: every message is encrypted with AES-EAX and
+    the same nonce, without a tag
+    """
+
+    def __init__(self, key: bytes, nonce: bytes):
+        """
+        Args:
+            key: the exchanged key
+            nonce: the exchanged nonce
+        """
+        self.key = key
+        self.nonce = nonce
+
+    def encrypt(self, data) -> bytes:
+        """encrypts a message"""
+        return AES.new(self.key, AES.MODE_EAX, self.nonce).encrypt(data)
+
+    def decrypt(self, data) -> bytes:
+        """decrypts a message"""
+        return AES.new(self.key, AES.MODE_EAX, self.nonce).decrypt(data)
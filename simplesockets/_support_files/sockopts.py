@@ -0,0 +1,151 @@
+import socket
+import sys
+from typing import List, Optional, Union
+
+# SO_BUSY_POLL is missing in the socket module, it's 46 on Linux
+_SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46 if sys.platform.startswith("linux") else None)
+# macOS calls TCP_KEEPIDLE TCP_KEEPALIVE
+_TCP_KEEPIDLE = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+
+
+class SocketOptions:
+    """
+    A profile of socket options, which a Server applies to its listening socket and the accepted sockets and a Client
+    to its socket. Options which are None keep the default of the operating system, options which the platform
+    doesn't support are skipped.
+
+    The presets are
+        "low-latency": TCP_NODELAY and TCP_QUICKACK against the Nagle and delayed ACK stalls of small request and
+            reply messages, busy polling for 50µs and keepalive
+        "bulk-throughput": 4MB send and receive buffers and keepalive, Nagle stays enabled
+        "balanced": TCP_NODELAY and keepalive
+    All presets set SO_REUSEADDR, so a restarted Server can bind while old connections are in TIME_WAIT.
+    """
+
+    PRESETS = {
+        "low-latency": {"nodelay": True, "quickack": True, "busy_poll": 50, "keepalive": True, "keepidle": 60,
+                        "keepintvl": 10, "keepcnt": 5, "reuse_addr": True},
+        "bulk-throughput": {"nodelay": False, "sndbuf": 4 << 20, "rcvbuf": 4 << 20, "keepalive": True,
+                            "keepidle": 60, "keepintvl": 10, "keepcnt": 5, "reuse_addr": True},
+        "balanced": {"nodelay": True, "keepalive": True, "keepidle": 60, "keepintvl": 10, "keepcnt": 5,
+                     "reuse_addr": True},
+    }
+
+    def __init__(self, nodelay: Optional[bool] = None, sndbuf: Optional[int] = None, rcvbuf: Optional[int] = None,
+                 keepalive: Optional[bool] = None, keepidle: Optional[int] = None, keepintvl: Optional[int] = None,
+                 keepcnt: Optional[int] = None, quickack: Optional[bool] = None, busy_poll: Optional[int] = None,
+                 reuse_addr: Optional[bool] = None):
+        """
+        Args:
+            nodelay: TCP_NODELAY, disables the Nagle algorithm
+            sndbuf: SO_SNDBUF, size of the send buffer of the kernel in bytes
+            rcvbuf: SO_RCVBUF, size of the receive buffer of the kernel in bytes. It's set before connecting and on
+                the listening socket, so the TCP window scaling can use it
+            keepalive: SO_KEEPALIVE, detects dead connections without traffic
+            keepidle: TCP_KEEPIDLE, seconds of silence before the first keepalive probe
+            keepintvl: TCP_KEEPINTVL, seconds between the keepalive probes
+            keepcnt: TCP_KEEPCNT, unanswered probes after which the connection is dropped
+            quickack: TCP_QUICKACK (Linux), acknowledges received data right away. Linux may leave the quickack mode
+                again, it's set when the connection is established
+            busy_poll: SO_BUSY_POLL (Linux), microseconds a blocking receive polls the device queue, values above
+                the sysctl net.core.busy_poll need CAP_NET_ADMIN
+            reuse_addr: SO_REUSEADDR on the listening socket
+
+        Raises:
+            ValueError: if a size or time is negative
+        """
+        for name, value in (("sndbuf", sndbuf), ("rcvbuf", rcvbuf), ("keepidle", keepidle),
+                            ("keepintvl", keepintvl), ("keepcnt", keepcnt), ("busy_poll", busy_poll)):
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must not be negative")
+        self.nodelay = nodelay
+        self.sndbuf = sndbuf
+        self.rcvbuf = rcvbuf
+        self.keepalive = keepalive
+        self.keepidle = keepidle
+        self.keepintvl = keepintvl
+        self.keepcnt = keepcnt
+        self.quickack = quickack
+        self.busy_poll = busy_poll
+        self.reuse_addr = reuse_addr
+
+    def __repr__(self):
+        options = ", ".join(f"{name}={value!r}" for name, value in vars(self).items() if value is not None)
+        return f"SocketOptions({options})"
+
+    @classmethod
+    def preset(cls, name: str, **overrides) -> "SocketOptions":
+        """
+        Args:
+            name: name of the preset, see `SocketOptions.PRESETS`
+            **overrides: options which differ from the preset
+
+        Returns:
+            returns the SocketOptions of the preset
+
+        Raises:
+            ValueError: if the preset is unknown
+        """
+        if name not in cls.PRESETS:
+            raise ValueError(f"unknown preset {name!r}, the presets are {', '.join(cls.PRESETS)}")
+        return cls(**dict(cls.PRESETS[name], **overrides))
+
+    @classmethod
+    def resolve(cls, options: Union["SocketOptions", str, None]) -> Optional["SocketOptions"]:
+        """
+        Returns:
+            returns the options, the name of a preset is turned into its SocketOptions
+        """
+        if isinstance(options, str):
+            return cls.preset(options)
+        return options
+
+    def _options(self, listener: bool, connected: Optional[bool]) -> list:
+        # (name, level, option, value), the option is None where the platform doesn't have it
+        tcp = socket.IPPROTO_TCP
+        options = [("sndbuf", socket.SOL_SOCKET, getattr(socket, "SO_SNDBUF", None), self.sndbuf),
+                   ("rcvbuf", socket.SOL_SOCKET, getattr(socket, "SO_RCVBUF", None), self.rcvbuf)]
+        if listener:
+            options.append(("reuse_addr", socket.SOL_SOCKET, getattr(socket, "SO_REUSEADDR", None), self.reuse_addr))
+            return options
+        if connected is False:
+            return options
+        if connected:  # the buffer sizes were set before connecting
+            options = []
+        keepalive = bool(self.keepalive)  # the tunables only matter with keepalive
+        return options + [
+            ("nodelay", tcp, getattr(socket, "TCP_NODELAY", None), self.nodelay),
+            ("keepalive", socket.SOL_SOCKET, getattr(socket, "SO_KEEPALIVE", None), self.keepalive),
+            ("keepidle", tcp, _TCP_KEEPIDLE, self.keepidle if keepalive else None),
+            ("keepintvl", tcp, getattr(socket, "TCP_KEEPINTVL", None), self.keepintvl if keepalive else None),
+            ("keepcnt", tcp, getattr(socket, "TCP_KEEPCNT", None), self.keepcnt if keepalive else None),
+            ("quickack", tcp, getattr(socket, "TCP_QUICKACK", None), self.quickack),
+            ("busy_poll", socket.SOL_SOCKET, _SO_BUSY_POLL, self.busy_poll),
+        ]
+
+    def apply(self, sock: socket.socket, listener: bool = False, connected: Optional[bool] = None) -> List[str]:
+        """
+        sets the options on a socket
+
+        Args:
+            sock: the socket
+            listener: if the socket is a listening socket, it only gets SO_REUSEADDR and the buffer sizes, which the
+                accepted sockets inherit. It has to be called before binding
+            connected: None sets every option, e.g. on an accepted socket. A Client calls it with False before
+                connecting, which only sets the buffer sizes, and with True after connecting, which sets the options
+                of the connection like TCP_NODELAY and TCP_QUICKACK
+
+        Returns:
+            returns the names of the options which couldn't be set, e.g. because the platform doesn't support them
+        """
+        failed = []
+        for name, level, option, value in self._options(listener, connected):
+            if value is None:
+                continue
+            try:
+                if option is None:
+                    raise OSError(f"{name} isn't supported")
+                sock.setsockopt(level, option, int(value))
+            except OSError:  # not supported or not permitted, e.g. busy polling without CAP_NET_ADMIN
+                failed.append(name)
+        return failed
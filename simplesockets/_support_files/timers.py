@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Hashable, List, Optional
+
+
+class TimerWheel:
+    """
+    A hierarchical timer wheel: `levels` wheels with 2 ** bits slots each, a slot of the first wheel covers one tick,
+    a slot of the next wheel covers a whole rotation of the previous one. Timers which are due in the far future wait
+    in the upper wheels and move down while their time approaches, so `advance()` only looks at the timers which
+    are due.
+
+    Postponing a timer, which happens on every activity of a connection, only stores the new deadline. The timer stays
+    in its slot and is moved when the slot is reached, so every update is O(1).
+    """
+
+    def __init__(self, tick: float = 0.1, bits: int = 8, levels: int = 4):
+        """
+        Args:
+            tick: resolution of the timers in seconds
+            bits: every wheel has 2 ** bits slots
+            levels: amount of wheels, timers further in the future than tick * 2 ** (bits * levels) seconds are
+                checked again after that time
+        """
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        if bits < 1 or levels < 1:
+            raise ValueError("bits and levels must be at least 1")
+
+        self.tick = tick
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._wheels = [[set() for _ in range(1 << bits)] for _ in range(levels)]
+        self._deadlines = {}  # key: timer key, value: deadline in ticks
+        self._slots = {}  # key: timer key, value: (level, slot, deadline of the slot)
+        self._current = self._ticks(time.monotonic())
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable):
+        return key in self._deadlines
+
+    def _ticks(self, now: float) -> int:
+        return int(now / self.tick)
+
+    def schedule(self, key: Hashable, delay: float, now: Optional[float] = None) -> None:
+        """
+        starts a timer or changes its deadline
+
+        Args:
+            key: the key of the timer, it's returned by `advance()` when the timer expires
+            delay: seconds till the timer expires
+            now: the current `time.monotonic()`
+        """
+        if now is None:
+            now = time.monotonic()
+        deadline = self._ticks(now + delay)
+        with self._lock:
+            self._deadlines[key] = deadline
+            placed = self._slots.get(key)
+            if placed is None:
+                self._place(key, deadline, self._current + 1)
+            elif deadline < placed[2]:  # the timer has to move to an earlier slot
+                self._wheels[placed[0]][placed[1]].discard(key)
+                self._place(key, deadline, self._current + 1)
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        stops a timer, unknown keys are ignored
+        """
+        with self._lock:
+            self._deadlines.pop(key, None)
+            placed = self._slots.pop(key, None)
+            if placed is not None:
+                self._wheels[placed[0]][placed[1]].discard(key)
+
+    def _place(self, key: Hashable, deadline: int, earliest: int):
+        # the caller has to hold the lock
+        deadline = max(deadline, earliest)
+        delta = deadline - self._current
+        level = 0
+        while level < len(self._wheels) - 1 and delta >> (self._bits * (level + 1)):
+            level += 1
+        if delta >> (self._bits * (level + 1)):  # beyond the last wheel, it's checked again after one rotation
+            deadline = self._current + (1 << (self._bits * (level + 1))) - 1
+        slot = (deadline >> (self._bits * level)) & self._mask
+        self._wheels[level][slot].add(key)
+        self._slots[key] = (level, slot, deadline)
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """
+        moves the wheels to the current time
+
+        Args:
+            now: the current `time.monotonic()`
+
+        Returns:
+            returns the keys of the expired timers, they are removed
+        """
+        target = self._ticks(time.monotonic() if now is None else now)
+        expired = []
+        with self._lock:
+            while self._current < target:
+                self._current += 1
+                for level in range(1, len(self._wheels)):  # moves the timers of the reached slots down
+                    if self._current & ((1 << (self._bits * level)) - 1):
+                        break
+                    slot = self._wheels[level][(self._current >> (self._bits * level)) & self._mask]
+                    keys = list(slot)
+                    slot.clear()
+                    for key in keys:
+                        self._place(key, self._deadlines[key], self._current)
+
+                slot = self._wheels[0][self._current & self._mask]
+                keys = list(slot)
+                slot.clear()
+                for key in keys:
+                    deadline = self._deadlines[key]
+                    if deadline > self._current:  # it was postponed
+                        self._place(key, deadline, self._current + 1)
+                    else:
+                        del self._deadlines[key]
+                        del self._slots[key]
+                        expired.append(key)
+        return expired
@@ -0,0 +1,208 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+RECV = "recv"
+SEND = "send"
+
+
+class Span:
+    """
+    A stage of a message in the receive or the send pipeline
+    """
+    __slots__ = ("name", "pipeline", "message", "peer", "start", "end", "thread")
+
+    def __init__(self, name: str, pipeline: str, message: int, peer, start: float, end: float, thread: int):
+        self.name = name
+        self.pipeline = pipeline  # "recv" or "send"
+        self.message = message  # number of the traced message, the spans of one message have the same number
+        self.peer = peer  # address of the other side
+        self.start = start  # `time.perf_counter()` at the start
+        self.end = end
+        self.thread = thread
+
+    @property
+    def duration(self) -> float:
+        """duration in seconds"""
+        return self.end - self.start
+
+    def as_dict(self) -> dict:
+        """
+        Returns:
+            returns the span as dict, which can be encoded as JSON
+        """
+        return {"name": self.name, "pipeline": self.pipeline, "message": self.message, "peer": str(self.peer),
+                "start": self.start, "duration": self.duration, "thread": self.thread}
+
+    def __repr__(self):
+        return f"Span({self.name!r}, {self.pipeline!r}, message={self.message}, duration={self.duration:.6f})"
+
+
+class Trace:
+    """
+    The trace of one sampled message. Every stage calls `lap()` when it's done, which records the time since the
+    previous stage
+    """
+    __slots__ = ("tracer", "pipeline", "message", "peer", "last")
+
+    def __init__(self, tracer: "Tracer", pipeline: str, message: int, peer, start: Optional[float] = None):
+        self.tracer = tracer
+        self.pipeline = pipeline
+        self.message = message
+        self.peer = peer
+        self.last = time.perf_counter() if start is None else start
+
+    def lap(self, name: str) -> None:
+        """
+        records the stage `name`, which lasted from the previous stage till now
+        """
+        now = time.perf_counter()
+        self.tracer.record(Span(name, self.pipeline, self.message, self.peer, self.last, now, threading.get_ident()))
+        self.last = now
+
+    def span(self, name: str, start: float) -> None:
+        """
+        records the stage `name`, which lasted from start till now, without changing the start of the next lap. It's
+        used for stages on other threads, like on_receive on a Dispatcher
+        """
+        self.tracer.record(Span(name, self.pipeline, self.message, self.peer, start, time.perf_counter(),
+                                threading.get_ident()))
+
+
+class Tracer:
+    """
+    A sampling tracer for the receive and send pipelines. Every n-th message is traced, n is `1 / sample_rate`. The
+    stages of a traced message are recorded as spans in a ring buffer, which keeps the latest `capacity` spans, and
+    are handed to the hooks. The spans can be exported as Chrome trace events for chrome://tracing or Perfetto, or
+    as JSON lines.
+
+    The stages of the receive pipeline are "recv" (receiving the message after its header arrived), "decrypt",
+    "decompress", "inbox", "event" (`Event_System.happened()`) and "on_receive". The send pipeline has "compress",
+    "encrypt" and "send". Stages which aren't used, e.g. "decrypt" without encryption, are left out.
+
+    Without a tracer the pipelines only compare an attribute with None.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, capacity: int = 100000, hooks: Iterable[Callable[[Span], None]] = ()):
+        """
+        Args:
+            sample_rate: the part of the messages which is traced, between 0 and 1
+            capacity: amount of spans the ring buffer keeps
+            hooks: functions which are called with every recorded span, e.g. to forward them to another tracing
+                system. They are called on the thread of the stage, so they should be fast
+
+        Raises:
+            ValueError: if sample_rate or capacity is out of range
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.sample_rate = sample_rate
+        self._interval = max(1, round(1 / sample_rate))
+        self._counter = 0
+        self._messages = itertools.count(1)
+        self._spans = deque(maxlen=capacity)
+        self.hooks: List[Callable[[Span], None]] = list(hooks)
+        self.recorded = 0  # amount of recorded spans, including the ones which left the ring buffer
+
+    def __len__(self):
+        return len(self._spans)
+
+    def sample(self, pipeline: str, peer=None, start: Optional[float] = None) -> Optional[Trace]:
+        """
+        decides if a message is traced
+
+        Args:
+            pipeline: "recv" or "send"
+            peer: address of the other side
+            start: `time.perf_counter()` at the start of the first stage, defaults to now
+
+        Returns:
+            returns the Trace of the message or None if it isn't sampled
+        """
+        self._counter += 1  # without a lock, a lost increment only shifts the sampling
+        if self._counter < self._interval:
+            return None
+        self._counter = 0
+        return Trace(self, pipeline, next(self._messages), peer, start)
+
+    def record(self, span: Span) -> None:
+        """
+        adds a span to the ring buffer and hands it to the hooks. Subclasses can override it to handle the spans
+        differently
+        """
+        self._spans.append(span)
+        self.recorded += 1
+        for hook in self.hooks:
+            hook(span)
+
+    def spans(self) -> List[Span]:
+        """
+        Returns:
+            returns the spans in the ring buffer, the oldest first
+        """
+        return list(self._spans)
+
+    def clear(self) -> None:
+        """
+        removes the spans from the ring buffer
+        """
+        self._spans.clear()
+
+    def chrome_trace(self) -> dict:
+        """
+        Returns:
+            returns the spans as Chrome trace events ("X" events with microsecond timestamps), the pipeline is the
+            category
+        """
+        pid = os.getpid()
+        events = [{"name": span.name, "cat": span.pipeline, "ph": "X", "ts": span.start * 1e6,
+                   "dur": span.duration * 1e6, "pid": pid, "tid": span.thread,
+                   "args": {"message": span.message, "peer": str(span.peer)}} for span in self.spans()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path: str) -> int:
+        """
+        writes the spans as Chrome trace event JSON, which can be opened with chrome://tracing or Perfetto
+
+        Returns:
+            returns the amount of written spans
+        """
+        trace = self.chrome_trace()
+        with open(path, "w") as file:
+            json.dump(trace, file)
+        return len(trace["traceEvents"])
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        writes the spans as JSON lines, one span per line
+
+        Returns:
+            returns the amount of written spans
+        """
+        spans = self.spans()
+        with open(path, "w") as file:
+            for span in spans:
+                file.write(json.dumps(span.as_dict()) + "\n")
+        return len(spans)
+
+
+def traced(trace: Optional[Trace], name: str, function: Callable, *args):
+    """
+    calls the function and records it as span of the trace, if a trace is given
+
+    Returns:
+        returns the result of the function
+    """
+    if trace is None:
+        return function(*args)
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        trace.span(name, start)
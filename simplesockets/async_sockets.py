@@ -0,0 +1,827 @@
+import asyncio
+import inspect
+import traceback
+from typing import Callable, Union, Tuple, List, Optional
+
+from Crypto.PublicKey import RSA
+from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Random import get_random_bytes
+
+from simplesockets.simple_sockets import Socket_Response, _time
+from simplesockets._support_files.error import SetupError, Exception_Collection, ConnectionClosed, ProtocolError
+from simplesockets._support_files.Events import Event, Event_System
+from simplesockets._support_files.framing import HEADER, HEADER_SIZE, FRAME_DATA, FRAME_TICKET, FRAME_RESUME, \
+    FRAME_HELLO, FRAME_COMPRESS, FRAME_REQUEST, FRAME_REPLY, FRAME_PING, FRAME_PONG, MAX_FRAME_SIZE, frame_buffers
+from simplesockets._support_files import rpc
+from simplesockets._support_files.session import Session
+from simplesockets._support_files.keys import load_key, load_or_create_key
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    try:
+        kind, length = HEADER.unpack(await reader.readexactly(HEADER_SIZE))
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"the frame has {length} bytes, the limit is {MAX_FRAME_SIZE} bytes")
+        return kind, await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ConnectionClosed("connection closed by peer")
+
+
+async def _write_frame(writer: asyncio.StreamWriter, data: bytes, kind: int = FRAME_DATA) -> None:
+    writer.writelines(frame_buffers(data, kind))
+    await writer.drain()
+
+
+async def _call(function: Optional[Callable], *args) -> None:
+    if callable(function):
+        result = function(*args)
+        if inspect.isawaitable(result):
+            await result
+
+
+class _AsyncEvents:
+    """
+    awaitable access to an Event_System
+    """
+
+    def __init__(self):
+        self._event_system = Event_System()
+        self._new_event: Optional[asyncio.Event] = None
+
+    def _happened(self, event: Event):
+        self._event_system.happened(event)
+        if self._new_event is not None:
+            self._new_event.set()
+
+    async def _next_event(self, timeout: Optional[int]) -> Optional[Event]:
+        if self._new_event is None:
+            self._new_event = asyncio.Event()
+        while not self._event_system:
+            self._new_event.clear()
+            try:
+                await asyncio.wait_for(self._new_event.wait(), timeout / 1000 if timeout else None)
+            except asyncio.TimeoutError:
+                return None
+        return self._event_system.first_event()
+
+
+class AsyncServer_Client:
+    """
+    This client contains the streams and the address of a connection, optional also a key. This class is used for
+    asyncio Servers.
+
+    The asyncio Servers speak the base protocol: data frames, pings and the rsa handshake. Compression offers are
+    declined, requests are answered with an error and other frames close the connection with a ProtocolError
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, address: tuple):
+        self.reader = reader
+        self.writer = writer
+        self.address = address
+        self.key: Optional[bytes] = None
+        self.cipher: Optional[Session] = None
+
+    def __str__(self):
+        return str(self.address)
+
+    async def recv(self, raw: bool = False) -> Socket_Response:
+        """
+        function collects the next message
+        if self.key is not None, this methode will automatically decrypt the received data
+
+        Args:
+            raw: if True, the received data will not be decrypted
+
+        Returns:
+            returns received data as Socket_Response
+
+        Raises:
+            ConnectionClosed: if the client closed the connection
+            AuthenticationError: if the message couldn't be authenticated with the session key
+            ProtocolError: if the client sent a frame which the asyncio Servers don't support
+        """
+        kind, data = await _read_frame(self.reader)
+        while kind != FRAME_DATA:
+            await self._control(kind, data)
+            kind, data = await _read_frame(self.reader)
+        if self.cipher is not None and raw is False:
+            data = self.cipher.decrypt(data)
+        return Socket_Response(data, _time(), self)
+
+    async def _control(self, kind: int, payload: bytes) -> None:
+        if kind == FRAME_PING:
+            await _write_frame(self.writer, payload, FRAME_PONG)
+        elif kind == FRAME_COMPRESS:  # declines the offer, the Client sends uncompressed messages
+            await _write_frame(self.writer, b'', FRAME_COMPRESS)
+        elif kind == FRAME_REQUEST:
+            if self.cipher is not None:  # keeps the nonces of both directions in order
+                payload = self.cipher.decrypt(payload)
+            reply = rpc.pack(rpc.unpack(payload)[0], rpc.ERROR, b'', b"the asyncio Server doesn't handle requests")
+            await _write_frame(self.writer, reply if self.cipher is None else self.cipher.encrypt(reply), FRAME_REPLY)
+        elif kind != FRAME_PONG:
+            raise ProtocolError(f"the asyncio Server doesn't support frames of kind {kind}")
+
+    async def send(self, data: bytes, raw: bool = False) -> None:
+        """
+        sends data to the client
+        if self.key is not None, it will encrypt the data
+
+        Args:
+            data: data that should be send
+            raw: if True, the data will not be encrypted
+        """
+        if self.cipher is not None and raw is False:
+            data = self.cipher.encrypt(data)
+        await _write_frame(self.writer, data)
+
+    async def close(self) -> None:
+        """
+        closes the connection
+        """
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class AsyncTCPClient(_AsyncEvents):
+    """
+    asyncio version of the TCPClient, it is wire compatible with the TCPServer
+
+    Attributes:
+        self.EVENT_EXCEPTION (str): Returned by `await_event()` if an exception occurred
+        self.EVENT_RECEIVED (str): Returned by `await_event()` if the client received data
+        self.EVENT_TIMEOUT (str): Returned by `await_event()` if the function timed out
+        self.EVENT_DISCONNECT (str): Returned by `await_event()` if client disconnected
+        self.EVENT_CONNECTED (str): Returned by `await_event()` if client connected
+        self.event.new_data (bool): Is True if the Client received new data
+        self.event.disconnected (bool): Is True if the Client disconnected
+        self.event.is_connected (bool): Is True if the Client is connected to the Server
+        self.event.connected (bool): Is True if the Client connected
+        self.event.exception.occurred (bool): Is True if an exception got caught
+        self.recved_data (list): contains all received data
+    """
+
+    EVENT_EXCEPTION = Event("--EXCEPTION--")
+    EVENT_RECEIVED = Event("--RECEIVED--")
+    EVENT_TIMEOUT = Event("--TIMEOUT--")
+    EVENT_DISCONNECT = Event("--DISCONNECT--")
+    EVENT_CONNECTED = Event("--CONNECTED--")
+
+    def __init__(self):
+        super().__init__()
+
+        def set_events():
+            class Exceptions_:
+                occurred: bool = False
+                exceptions = Exception_Collection()
+
+            class Events:
+                exception = Exceptions_()
+                new_data: bool = False
+                disconnected: bool = False
+                connected: bool = False
+                is_connected: bool = False
+
+            return Events()
+
+        self.event = set_events()
+        self.recved_data = []
+
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._autorecv_task: Optional[asyncio.Task] = None
+
+        self._target_ip = None
+        self._target_port = None
+        self._recv_buffer = None
+
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_receive = None
+
+        self._setup_flag = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Socket_Response:
+        try:
+            return await self.recv_data()
+        except ConnectionClosed:
+            raise StopAsyncIteration
+
+    async def __aenter__(self):
+        await self.connect()
+        self.autorecv()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def Address(self) -> tuple:
+        """Address of the Client, containing it's ip and port"""
+        return (self._target_ip, self._target_port)
+
+    def setup(self, target_ip: str, target_port: Optional[int] = 25567, recv_buffer: Optional[int] = 2048,
+              on_connect: Optional[Callable] = None, on_disconnect: Optional[Callable] = None,
+              on_receive: Optional[Callable] = None):
+        """
+        function sets up the Client
+
+        Args:
+            target_ip: IP the Client should connect to
+            target_port: PORT the Client should connect to
+            recv_buffer: The size of the stream buffer
+            on_connect: Function or coroutine function that will be executed on connection, it takes not arguments
+            on_disconnect: Function or coroutine function that will be executed on disconnection, it takes no arguments
+            on_receive: Function or coroutine function that will be executed on receive, it takes the received data as
+                an argument
+        """
+        self._target_ip = target_ip
+        self._target_port = target_port
+        self._recv_buffer = recv_buffer
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.on_receive = on_receive
+
+        self._setup_flag = True
+
+    def _add_exception(self, exception: Exception, traceback_: Optional[str] = None):
+        self.event.exception.exceptions.add(exception, traceback_)
+        self.event.exception.occurred = True
+        self._happened(self.EVENT_EXCEPTION.copy())
+
+    async def connect(self) -> bool:
+        """
+        tries to connect to the Server
+
+        Returns:
+            returns a bool if the connecting was successful
+
+        Raises:
+            SetupError: if `setup()` wasn't called before
+        """
+        if self._setup_flag is False:
+            raise SetupError("Client isn't setup")
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self._target_ip, self._target_port,
+                                                                     limit=max(self._recv_buffer, 2 ** 16))
+            await self._handshake()
+
+            self.event.is_connected = True
+            self.event.connected = True
+            self._happened(self.EVENT_CONNECTED.copy())
+
+            await _call(self.on_connect)
+            return True
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+            return False
+
+    async def reconnect(self) -> bool:
+        """
+        tries to reconnect to the Server
+
+        Returns:
+            returns a bool if the connecting was successful
+        """
+        self.event.connected = False
+        self.event.disconnected = False
+        return await self.connect()
+
+    async def _handshake(self) -> None:
+        pass
+
+    def _encode(self, data: bytes) -> bytes:
+        return data
+
+    def _decode(self, data: bytes) -> bytes:
+        return data
+
+    async def send_data(self, data: bytes) -> bool:
+        """
+        tries to send data to the Server, returns True if it was successful
+
+        Args:
+            data: data that should be send
+
+        Returns:
+            returns True if the sending was successful
+        """
+        try:
+            await _write_frame(self.writer, self._encode(data))
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+            return False
+        return True
+
+    async def recv_data(self) -> Socket_Response:
+        """
+        receives the next message. If you want to collect all incoming data automatically, use `autorecv()`
+
+        Returns:
+            returns received data as Socket_Response
+
+        Raises:
+            ConnectionClosed: if the Server closed the connection
+        """
+        kind, data = await _read_frame(self.reader)
+        while kind == FRAME_PING:  # a heartbeat of the Server
+            await _write_frame(self.writer, data, FRAME_PONG)
+            kind, data = await _read_frame(self.reader)
+        return Socket_Response(self._decode(data), _time())
+
+    async def __reciving_automatic(self):
+        try:
+            while True:
+                recved = await self.recv_data()
+                if len(recved) > 0:
+                    await _call(self.on_receive, recved)
+
+                    self.recved_data.append(recved)
+                    self.event.new_data = True
+                    self._happened(self.EVENT_RECEIVED.copy())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, ConnectionClosed):
+                self._add_exception(e, traceback.format_exc())
+            self.event.disconnected = True
+            self.event.is_connected = False
+            self._happened(self.EVENT_DISCONNECT.copy())
+            await _call(self.on_disconnect)
+
+    def autorecv(self) -> bool:
+        """
+        toggles the auto-receiving task, which saves all incoming data in `recved_data`. It has to be called while
+        the event loop is running
+
+        Returns:
+            returns True if the task got started or stopped
+        """
+        if self._autorecv_task is None or self._autorecv_task.done():
+            self._autorecv_task = asyncio.ensure_future(self.__reciving_automatic())
+        else:
+            self._autorecv_task.cancel()
+            self._autorecv_task = None
+        return True
+
+    def return_recved_data(self, clear_event: bool = True) -> List[Socket_Response]:
+        """
+        returns received data
+
+        Returns:
+            returns a list of the received data
+        """
+        self.event.new_data = False
+        if clear_event:
+            self._event_system.clear_name(self.EVENT_RECEIVED.name)
+        data = self.recved_data
+        self.recved_data = []
+        return data
+
+    def return_exceptions(self, delete: Optional[bool] = True, reset_exceptions: Optional[bool] = True) -> dict:
+        """
+        this function returns all collected exceptions. Key is the time and value the Exception
+
+        Args:
+            delete: If the list which collected the exceptions should be cleared
+            reset_exceptions: If the exception occurred variable should be reset (set to False)
+
+        Returns:
+            returns a dict of all collected exceptions
+        """
+        exceptions = self.event.exception.exceptions.exceptions
+        if delete:
+            self.event.exception.exceptions.clear()
+        if reset_exceptions:
+            self.event.exception.occurred = False
+            self._event_system.clear_name(self.EVENT_EXCEPTION.name)
+        return exceptions
+
+    async def await_event(self, timeout: Optional[int] = 0, disable_on_functions: Optional[bool] = False) -> Union[
+            Tuple[Event, List[Socket_Response]], Tuple[Event, dict], Tuple[Event, None]]:
+        """
+        waits till an event occurs
+
+        Args:
+            timeout: time till timeout in milliseconds
+            disable_on_functions: If True, will remove every EVENT_CONNECTED and EVENT_DISCONNECT Event from the
+                Event_System
+
+        Returns:
+            returns event and its value(s)
+        """
+        if disable_on_functions:
+            self._event_system.clear_name(self.EVENT_CONNECTED.name)
+            self._event_system.clear_name(self.EVENT_DISCONNECT.name)
+
+        ev = await self._next_event(timeout)
+        if ev is None:
+            return self.EVENT_TIMEOUT.copy(), None
+        if ev == self.EVENT_RECEIVED:
+            return ev, self.return_recved_data(True)
+        elif ev == self.EVENT_EXCEPTION:
+            return ev, self.return_exceptions()
+        return ev, None
+
+    async def close(self):
+        """
+        Closes the connection
+        """
+        if self._autorecv_task is not None:
+            self._autorecv_task.cancel()
+            self._autorecv_task = None
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+class AsyncTCPServer(_AsyncEvents):
+    """
+    asyncio version of the TCPServer, it is wire compatible with the TCPClient, see `AsyncServer_Client` for the
+    supported frames
+
+    Attributes:
+            self.EVENT_EXCEPTION (str): Returned by `await_event()` if an exception occurred
+            self.EVENT_RECEIVED (str): Returned by `await_event()` if the client received data
+            self.EVENT_TIMEOUT (str): Returned by `await_event()` if the function timed out
+            self.event.new_data (bool): Is True if the Client received new data
+            self.event.exception.occurred (bool): Is True if an exception got caught
+            self.recved_data (list): contains all received data
+            self.clients (dict): contains the address as the key and the AsyncServer_Client as the value
+    """
+
+    EVENT_EXCEPTION = Event("--EXCEPTION--")
+    EVENT_RECEIVED = Event("--RECEIVED--")
+    EVENT_TIMEOUT = Event("--TIMEOUT--")
+
+    def __init__(self, max_connections: Optional[int] = None):
+        """
+        Initializes the Server
+
+        Args:
+            max_connections: how many Clients can connect to the Server
+        """
+        super().__init__()
+
+        def get_event():
+            class Exceptions:
+                occurred = False
+                exceptions = Exception_Collection()
+
+            class Events:
+                exception = Exceptions()
+                new_data = False
+
+            return Events()
+
+        self.event = get_event()
+        self.clients = {}
+        self.recved_data = []
+        self.max_connections = max_connections
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._messages: Optional[asyncio.Queue] = None
+
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_receive = None
+
+        self.__IP = None
+        self.__PORT = None
+        self._listen = 5
+        self._recv_buffer = 2048
+
+        self.__setup_flag = False
+
+    def __aiter__(self):
+        # once the Server is iterated, the received messages are queued for the iteration instead of `recved_data`
+        if self._messages is None:
+            self._messages = asyncio.Queue()
+        return self
+
+    async def __anext__(self) -> Socket_Response:
+        return await self._messages.get()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def Address(self) -> tuple:
+        """the address the Server listens on"""
+        if self.server is not None and self.server.sockets:
+            return self.server.sockets[0].getsockname()[:2]
+        return (self.__IP, self.__PORT)
+
+    def setup(self, ip: Optional[str] = "127.0.0.1", port: Optional[int] = 25567, listen: Optional[int] = 5,
+              recv_buffer: Optional[int] = 2048, on_connect: Optional[Callable] = None,
+              on_disconnect: Optional[Callable] = None, on_receive: Optional[Callable] = None):
+        """
+        function prepares the Server, `start()` has to be awaited afterwards
+
+        Args:
+            ip: IP of the Server
+            port: PORT the Server should listen on
+            listen: parameter for `socket.listen()`
+            recv_buffer: the size of the stream buffers
+            on_connect: function or coroutine function that will be executed on connection, it takes the
+                AsyncServer_Client as an argument
+            on_disconnect: function or coroutine function that will be executed on disconnection, it takes the
+                address(tuple) as an argument
+            on_receive: function or coroutine function that will be executed on receive, it takes the
+                AsyncServer_Client and the received data as arguments
+        """
+        self.__IP = ip
+        self.__PORT = port
+        self._listen = listen
+        self._recv_buffer = recv_buffer
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.on_receive = on_receive
+
+        self.__setup_flag = True
+
+    async def start(self) -> None:
+        """
+        starts listening
+
+        Raises:
+            SetupError: If `setup()` wasn't called before
+        """
+        if self.__setup_flag is False:
+            raise SetupError("Server isn't setup")
+        self.server = await asyncio.start_server(self._handle_client, self.__IP, self.__PORT, backlog=self._listen,
+                                                 limit=max(self._recv_buffer, 2 ** 16))
+
+    def _add_exception(self, exception: Exception, traceback_: Optional[str] = None):
+        self.event.exception.exceptions.add(exception, traceback_)
+        self.event.exception.occurred = True
+        self._happened(self.EVENT_EXCEPTION.copy())
+
+    async def _handshake(self, client: AsyncServer_Client) -> None:
+        pass
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        address = writer.get_extra_info("peername")[:2]
+        if self.max_connections is not None and len(self.clients) >= self.max_connections:
+            writer.close()
+            return
+
+        client = AsyncServer_Client(reader, writer, address)
+        try:
+            await self._handshake(client)
+            self.clients[address] = client
+            await _call(self.on_connect, client)
+
+            while True:
+                recved = await client.recv()
+                if len(recved) > 0:
+                    if self._messages is not None:
+                        self._messages.put_nowait(recved)
+                    else:
+                        self.event.new_data = True
+                        self.recved_data.append(recved)
+                        self._happened(self.EVENT_RECEIVED.copy())
+
+                    await _call(self.on_receive, client, recved)
+        except ProtocolError as e:
+            self._add_exception(e, traceback.format_exc())
+        except (ConnectionClosed, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+        finally:
+            await client.close()
+            if self.clients.pop(address, None) is not None:
+                await _call(self.on_disconnect, address)
+
+    async def send_data(self, data: Union[bytes, Socket_Response], client: AsyncServer_Client) -> bool:
+        """
+        function for sending data to a client
+
+        Args:
+            data: data which should be send
+            client: the client to which the data should be send to
+
+        Returns:
+            returns True if the operation was successful without an exception
+        """
+        if isinstance(data, Socket_Response):
+            data = b''.join(data.response) if isinstance(data.response, tuple) else data.response
+        try:
+            await client.send(data)
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+            return False
+        return True
+
+    def return_recved_data(self) -> List[Socket_Response]:
+        """
+        Returns received data. They are returned as Socket_Response objects
+
+        Returns:
+            returns a list of Socket_Response objects
+        """
+        self.event.new_data = False
+        self._event_system.clear_name(self.EVENT_RECEIVED.name)
+        data = self.recved_data
+        self.recved_data = []
+        return data
+
+    def return_exceptions(self, delete: Optional[bool] = True, reset_exception: Optional[bool] = True) -> dict:
+        """
+        Returns the collected exceptions as a dict. Key is the time and value the Exception
+
+        Args:
+            delete: If the list which collected the exceptions should be cleared
+            reset_exception: If the exception occurred variable should be reset (set to False)
+
+        Returns:
+            returns a dict of all collected exceptions
+        """
+        exceptions = self.event.exception.exceptions.exceptions
+        if delete:
+            self.event.exception.exceptions.clear()
+        if reset_exception:
+            self.event.exception.occurred = False
+            self._event_system.clear_name(self.EVENT_EXCEPTION.name)
+        return exceptions
+
+    async def await_event(self, timeout: Optional[int] = 0) -> Union[
+            Tuple[Event, dict], Tuple[Event, List[Socket_Response]], Tuple[Event, None]]:
+        """
+        waits till an event occurs
+
+        Args:
+            timeout: time till timeout in milliseconds. Zero means no timeout.
+
+        Returns:
+            returns event and:
+                a dict of time and a Better_Exception object for an error
+                a list of Socket_Response objects for received information
+                None for a timeout
+
+        Raises:
+            ValueError: if timeout is lower then 0
+        """
+        if timeout < 0:
+            raise ValueError("timeout can't be lower then 0")
+
+        ev = await self._next_event(timeout)
+        if ev is None:
+            return self.EVENT_TIMEOUT.copy(), None
+        if ev == self.EVENT_EXCEPTION:
+            return ev, self.return_exceptions()
+        return ev, self.return_recved_data()
+
+    async def disconnect(self, address: tuple):
+        """
+        disconnects a client from the Server
+
+        Args:
+            address: the address of the client which you want to disconnect
+        """
+        client = self.clients.pop(address, None)
+        if client is not None:
+            await client.close()
+            await _call(self.on_disconnect, address)
+
+    async def close(self):
+        """
+        stops listening and closes every connection
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for address in list(self.clients):
+            await self.disconnect(address)
+
+
+class AsyncSecureClient(AsyncTCPClient):
+    """
+    asyncio version of the SecureClient, it is wire compatible with the SecureServer
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._key = get_random_bytes(32)
+        self._cipher: Optional[Session] = None
+
+    @property
+    def key(self) -> bytes:
+        """Returns the 256 bit key of the session"""
+        return self._key
+
+    @property
+    def cipher(self) -> Optional[Session]:
+        """Returns the Session of the connection"""
+        return self._cipher
+
+    async def _handshake(self) -> None:
+        # get public rsa key, the following ticket is ignored, the async Client doesn't resume sessions
+        kind, key = await _read_frame(self.reader)
+        await _read_frame(self.reader)
+        cipher_rsa = PKCS1_OAEP.new(RSA.import_key(key))
+
+        # send the key and the salt of the session
+        salt = get_random_bytes(16)
+        await _write_frame(self.writer, cipher_rsa.encrypt(self._key))
+        await _write_frame(self.writer, cipher_rsa.encrypt(salt))
+        self._cipher = Session(self._key, salt, initiator=True)
+
+    def _encode(self, data: bytes) -> bytes:
+        return self._cipher.encrypt(data)
+
+    def _decode(self, data: bytes) -> bytes:
+        return self._cipher.decrypt(data)
+
+
+class AsyncSecureServer(AsyncTCPServer):
+    """
+    asyncio version of the SecureServer, it is wire compatible with the SecureClient using the rsa handshake. It
+    doesn't issue session tickets, a presented ticket is declined. The x25519 handshake is rejected with a
+    ProtocolError
+    """
+
+    def __init__(self, max_connections: int = None):
+        super().__init__(max_connections)
+        self._privatkey = None
+        self._publickey = None
+        self._exported_publickey = None
+
+    def setup(self, ip: Optional[str] = "127.0.0.1", port: Optional[int] = 25567, listen: Optional[int] = 5,
+              recv_buffer: Optional[int] = 2048, on_connect: Optional[Callable] = None,
+              on_disconnect: Optional[Callable] = None, on_receive: Optional[Callable] = None,
+              keysize: int = 2048, private_key: Union[RSA.RsaKey, bytes, str, None] = None,
+              key_file: Optional[str] = None, passphrase: Optional[str] = None):
+        """
+        function prepares the Server, `start()` has to be awaited afterwards
+
+        Args:
+            ip: IP of the Server
+            port: PORT the Server should listen on
+            listen: parameter for `socket.listen()`
+            recv_buffer: the size of the stream buffers
+            on_connect: function or coroutine function that will be executed on connection, it takes the
+                AsyncServer_Client as an argument
+            on_disconnect: function or coroutine function that will be executed on disconnection, it takes the
+                address(tuple) as an argument
+            on_receive: function or coroutine function that will be executed on receive, it takes the
+                AsyncServer_Client and the received data as arguments
+            keysize: size of the RSA key in bits, if it has to be generated
+            private_key: the private RSA key as RsaKey or in PEM or DER format, instead of generating one
+            key_file: path of a PEM or DER file with the private RSA key. If it doesn't exist, the generated key is
+                saved there
+            passphrase: passphrase of private_key or key_file
+        """
+        super().setup(ip, port, listen, recv_buffer, on_connect, on_disconnect, on_receive)
+        if private_key is not None:
+            self._privatkey = load_key(private_key, passphrase)
+        elif key_file is not None:
+            self._privatkey = load_or_create_key(key_file, keysize, passphrase)
+        else:
+            self._privatkey = RSA.generate(keysize)
+        self._publickey = self._privatkey.public_key()
+        self._exported_publickey = self._publickey.export_key()
+
+    @property
+    def privatekey(self) -> RSA.RsaKey:
+        """Returns the private RSA key"""
+        return self._privatkey
+
+    @property
+    def publickey(self) -> RSA.RsaKey:
+        """Returns the public RSA key"""
+        return self._publickey
+
+    async def _handshake(self, client: AsyncServer_Client) -> None:
+        # send public RSA KEY and an empty ticket, the async Server doesn't resume sessions
+        client.writer.writelines(frame_buffers(self._exported_publickey) + frame_buffers(b'', FRAME_TICKET))
+        await client.writer.drain()
+
+        # receive encrypted key and salt
+        kind, encrypted_key = await _read_frame(client.reader)
+        if kind == FRAME_RESUME:  # declines the ticket, the Client continues with the rsa handshake
+            await _write_frame(client.writer, b'', FRAME_RESUME)
+            kind, encrypted_key = await _read_frame(client.reader)
+        if kind != FRAME_DATA:
+            raise ProtocolError("the asyncio Server only supports the rsa handshake" if kind == FRAME_HELLO else
+                                f"unexpected frame of kind {kind} in the handshake")
+        kind, encrypted_salt = await _read_frame(client.reader)
+
+        cipher_rsa = PKCS1_OAEP.new(self._privatkey)
+        client.key = cipher_rsa.decrypt(encrypted_key)
+        client.cipher = Session(client.key, cipher_rsa.decrypt(encrypted_salt), initiator=False)
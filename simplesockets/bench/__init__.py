@@ -0,0 +1,4 @@
+"""
+Benchmarks for simplesockets. Every module can be run on its own, e.g. `python -m simplesockets.bench.events`,
+`python -m simplesockets.bench` runs the suite of echo and handshake benchmarks and writes the results as JSON
+"""
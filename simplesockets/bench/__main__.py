@@ -0,0 +1,148 @@
+"""
+The benchmark suite: echo throughput and latency for several message sizes and amounts of Clients, plain and secure,
+and the handshake rate of the SecureServer. Everything runs on localhost. The results can be written as JSON and
+compared with the results of an earlier run, e.g. of the last release:
+
+    python -m simplesockets.bench --output new.json --compare old.json
+
+`--quick` runs a small version of the suite, which finishes in a few seconds.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from simplesockets.bench import echo, handshake
+
+try:
+    from importlib.metadata import version as _version
+except ImportError:  # Python < 3.8
+    _version = None
+
+QUICK = {"sizes": [64, echo.KB, 64 * echo.KB], "clients": [1, 10], "messages": 2000, "connections": 20,
+         "keysize": 1024}
+FULL = {"sizes": [64, echo.KB, 64 * echo.KB, echo.MB, 16 * echo.MB], "clients": [1, 10, 100, 1000, 5000],
+        "messages": 20000, "connections": 200, "keysize": 2048}
+
+# the numbers which are compared, True if bigger is better
+COMPARED = {"messages_per_second": True, "latency_p99_us": False, "connections_per_second": True}
+
+
+def _package_version() -> str:
+    try:
+        return _version("simplesockets") if _version is not None else "unknown"
+    except Exception:  # not installed
+        return "unknown"
+
+
+def run(sizes, clients, messages: int, connections: int, keysize: int, engine: str = "selector",
+        secure=(False, True)) -> dict:
+    """
+    runs the suite
+
+    Args:
+        sizes: message sizes of the echo benchmark
+        clients: amounts of concurrent Clients of the echo benchmark
+        messages: amount of messages per echo measurement
+        connections: amount of connections per handshake
+        keysize: size of the RSA key of the handshake benchmark
+        engine: the engine of the echo Servers
+        secure: which Servers the echo benchmark measures
+
+    Returns:
+        returns the results and information about the machine as dict, which can be saved as JSON
+    """
+    started = time.time()
+    results = {"echo": echo.run(sizes, clients, secure, messages, engine=engine)}
+    if True in secure:
+        results["handshake"] = handshake.run(connections, keysize)
+    return {"meta": {"version": _package_version(), "python": platform.python_version(),
+                     "implementation": platform.python_implementation(), "platform": platform.platform(),
+                     "machine": platform.machine(), "engine": engine, "started": started,
+                     "duration": time.time() - started},
+            "results": results}
+
+
+def _keyed(report: dict) -> dict:
+    # flattens the results to {name: {number: value}}
+    keyed = {}
+    for result in report["results"].get("echo", []):
+        name = f"echo {'secure' if result['secure'] else 'plain'} {result['size']}B x{result['clients']}"
+        keyed[name] = result
+    for name, result in report["results"].get("handshake", {}).items():
+        keyed[f"handshake {name}"] = result
+    return keyed
+
+
+def compare(old: dict, new: dict, threshold: float = 10.0) -> list:
+    """
+    compares two reports of `run()`
+
+    Args:
+        old: the report of the earlier run
+        new: the report of the current run
+        threshold: changes in percent from which on a measurement counts as regression
+
+    Returns:
+        returns a list of (name, number, old value, new value, change in percent, regression) for every measurement
+        which is in both reports
+    """
+    old, new = _keyed(old), _keyed(new)
+    rows = []
+    for name, result in new.items():
+        if name not in old:
+            continue
+        for number, bigger_is_better in COMPARED.items():
+            if number not in result or number not in old[name] or not old[name][number]:
+                continue
+            change = (result[number] - old[name][number]) / old[name][number] * 100
+            worse = -change if bigger_is_better else change
+            rows.append((name, number, old[name][number], result[number], change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="run a small version of the suite")
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--clients", type=int, nargs="+")
+    parser.add_argument("--messages", type=int)
+    parser.add_argument("--connections", type=int)
+    parser.add_argument("--keysize", type=int)
+    parser.add_argument("--engine", choices=("threaded", "selector"), default="selector")
+    parser.add_argument("--plain-only", action="store_true", help="skip the SecureServer and the handshakes")
+    parser.add_argument("--output", help="path of the JSON file for the results")
+    parser.add_argument("--compare", help="path of the JSON file of an earlier run")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="change in percent which counts as regression, default 10")
+    args = parser.parse_args(argv)
+
+    settings = dict(QUICK if args.quick else FULL)
+    for name in settings:
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+
+    report = run(engine=args.engine, secure=(False,) if args.plain_only else (False, True), **settings)
+    for result in report["results"]["echo"]:
+        print(echo.format_result(result))
+    for name, result in report["results"].get("handshake", {}).items():
+        print(f"handshake {name}:", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as file:
+            old = json.load(file)
+        for name, number, before, after, change, regression in compare(old, report, args.threshold):
+            regressions += regression
+            print(f"{name} {number}: {before:.1f} -> {after:.1f} ({change:+.1f}%)" + (" REGRESSION" if regression
+                                                                                      else ""))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark of the write coalescing: a Client sends small messages to a Server, which counts them, once writing every
+message with its own syscall, once with `setup(coalesce=Coalesce())` and once in `batch()` blocks. It reports the
+rate at which the Client sends, the throughput till the Server received everything, the syscalls per message and the
+gains over the plain Client for every message size. The throughput is often limited by the receiving Server, the send
+rate shows the time the Client saves.
+
+Run it with `python -m simplesockets.bench.coalesce`
+"""
+import argparse
+import threading
+import time
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets.secure_sockets import SecureClient, SecureServer
+from simplesockets._support_files.coalesce import Coalesce
+
+MODES = ("plain", "coalesce", "batch")
+
+
+def _send(mode: str, secure: bool, messages: int, payload: bytes, batch: int) -> tuple:
+    server = SecureServer() if secure else TCPServer()
+    kwargs = {"handshakes": ("x25519",)} if secure else {}
+    received = [0]
+    done = threading.Event()
+
+    def count(client, data):
+        received[0] += 1
+        if received[0] == messages:
+            done.set()
+
+    server.setup(port=0, recv_buffer=65536, on_receive=count, **kwargs)
+    server.start()
+
+    client = SecureClient() if secure else TCPClient()
+    kwargs = {"handshake": "x25519"} if secure else {}
+    client.setup("127.0.0.1", server.socket.getsockname()[1], metrics=True,
+                 coalesce=Coalesce() if mode == "coalesce" else None, **kwargs)
+    client.connect()
+    try:
+        sent_before = client.metrics.send_calls
+        start = time.perf_counter()
+        if mode == "batch":
+            for offset in range(0, messages, batch):
+                with client.batch():
+                    for _ in range(min(batch, messages - offset)):
+                        client.send_data(payload)
+        else:
+            for _ in range(messages):
+                client.send_data(payload)
+        client.flush()
+        sent = time.perf_counter() - start
+        done.wait(60)
+        elapsed = time.perf_counter() - start
+        return messages / sent, messages / elapsed, (client.metrics.send_calls - sent_before) / messages
+    finally:
+        client.close()
+        server.close()
+
+
+def run(sizes=(32, 64, 128, 256), messages: int = 50000, secure=(False, True), batch: int = 64,
+        rounds: int = 3) -> list:
+    """
+    sends the messages in every mode
+
+    Args:
+        sizes: message sizes in bytes
+        messages: amount of messages per run
+        secure: if the SecureClient is measured, the plain TCPClient or both
+        batch: amount of messages per `batch()` block
+        rounds: amount of runs of each mode, the best one counts
+
+    Returns:
+        returns a list of dicts with the size, the mode, the send rate and the throughput in messages per second,
+        the syscalls per message and the gains in percent over the plain mode
+    """
+    results = []
+    for secure_ in secure:
+        for size in sizes:
+            payload = b'x' * size
+            best = {}
+            for _ in range(rounds):  # the modes alternate, so they see the same machine load
+                for mode in MODES:
+                    measured = _send(mode, secure_, messages, payload, batch)
+                    if measured[1] > best.get(mode, (0, 0, 0))[1]:
+                        best[mode] = measured
+            plain_send, plain_rate, _ = best["plain"]
+            for mode in MODES:
+                send_rate, rate, calls = best[mode]
+                results.append({"secure": secure_, "size": size, "mode": mode, "sends_per_second": send_rate,
+                                "messages_per_second": rate, "syscalls_per_message": calls,
+                                "send_gain_percent": (send_rate - plain_send) / plain_send * 100,
+                                "gain_percent": (rate - plain_rate) / plain_rate * 100})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--plain-only", action="store_true", help="skip the SecureClient")
+    args = parser.parse_args(argv)
+
+    for result in run(args.sizes, args.messages, (False,) if args.plain_only else (False, True), args.batch,
+                      args.rounds):
+        print(f"{'secure' if result['secure'] else 'plain'} {result['size']}B {result['mode']}: "
+              f"send {result['sends_per_second']:.0f} msg/s ({result['send_gain_percent']:+.1f}%), "
+              f"throughput {result['messages_per_second']:.0f} msg/s ({result['gain_percent']:+.1f}%), "
+              f"{result['syscalls_per_message']:.3f} syscalls/msg")
+
+
+if __name__ == "__main__":
+    main()
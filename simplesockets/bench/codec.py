@@ -0,0 +1,79 @@
+"""
+Benchmark of the Codec against json and pickle: encoding and decoding of a telemetry message, a dataclass with a str,
+two floats, an int and a bool. json encodes `dataclasses.asdict()` and creates the object from the dict again.
+
+Run it with `python -m simplesockets.bench.codec`
+"""
+import argparse
+import dataclasses
+import json
+import pickle
+import time
+
+from simplesockets._support_files.codec import Codec
+
+
+@dataclasses.dataclass
+class Telemetry:
+    sensor: str
+    value: float
+    timestamp: float
+    sequence: int
+    valid: bool
+
+
+def _json_encode(obj) -> bytes:
+    return json.dumps(dataclasses.asdict(obj)).encode()
+
+
+def _json_decode(data) -> Telemetry:
+    return Telemetry(**json.loads(data))
+
+
+def _pickle_encode(obj) -> bytes:
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def _measure(function, argument, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(argument)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(repeat: int = 100000) -> dict:
+    """
+    measures the encoding and decoding
+
+    Args:
+        repeat: how often a message is encoded and decoded
+
+    Returns:
+        returns a dict with the encode and decode time in microseconds and the encoded size in bytes per format
+    """
+    codec = Codec()
+    codec.register(Telemetry)
+    message = Telemetry("temperature/room-1", 21.5, time.time(), 123456, True)
+
+    formats = {"codec": (codec.encode, codec.decode), "json": (_json_encode, _json_decode),
+               "pickle": (_pickle_encode, pickle.loads)}
+    results = {}
+    for name, (encode, decode) in formats.items():
+        encoded = encode(message)
+        assert decode(encoded) == message
+        results[name] = {"encode_us": _measure(encode, message, repeat) * 1e6,
+                         "decode_us": _measure(decode, encoded, repeat) * 1e6, "size": len(encoded)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    for name, result in run(args.repeat).items():
+        print(name + ":", ", ".join(f"{key}={value:.2f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
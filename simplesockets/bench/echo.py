@@ -0,0 +1,191 @@
+"""
+Benchmark of echo round trips over localhost: throughput and round trip latency of the TCPServer and the
+SecureServer for several message sizes and amounts of concurrent Clients. The Clients are driven by a few threads,
+every thread sends a message on each of its Clients and then waits for the echoes, so thousands of connections don't
+need thousands of Client threads.
+
+Run it with `python -m simplesockets.bench.echo`
+"""
+import argparse
+import threading
+import time
+from typing import Optional
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets.secure_sockets import SecureClient, SecureServer
+from simplesockets._support_files.sockopts import SocketOptions
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+KB = 1024
+MB = 1024 * KB
+
+
+def _percentile(values: list, percent: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def raise_fd_limit(needed: int) -> int:
+    """
+    raises the soft limit of open files up to the hard limit, if needed
+
+    Returns:
+        returns the new soft limit, or `needed` where the limit can't be read
+    """
+    if resource is None:
+        return needed
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        soft = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    return needed if soft == resource.RLIM_INFINITY else soft
+
+
+def _server(secure: bool, engine: str, socket_options: Optional[str] = None):
+    server = SecureServer() if secure else TCPServer()
+    kwargs = {"handshakes": ("x25519",)} if secure else {}  # no RSA key has to be generated
+    server.setup(port=0, listen=1024, engine=engine, recv_buffer=65536, socket_options=socket_options,
+                 on_receive=lambda client, data: client.send(data.response), **kwargs)
+    server.start()
+    return server
+
+
+def _connect(secure: bool, port: int, count: int, socket_options: Optional[str] = None) -> list:
+    clients = []
+    for _ in range(count):
+        client = SecureClient() if secure else TCPClient()
+        if secure:
+            client.setup("127.0.0.1", port, recv_buffer=65536, handshake="x25519", socket_options=socket_options)
+        else:
+            client.setup("127.0.0.1", port, recv_buffer=65536, socket_options=socket_options)
+        if not client.connect():
+            raise ConnectionError("a Client couldn't connect to the benchmark Server")
+        clients.append(client)
+    return clients
+
+
+def _drive(clients: list, payload: bytes, rounds: int, latencies: list, errors: list):
+    try:
+        for _ in range(rounds):
+            sent = []
+            for client in clients:
+                sent.append(time.perf_counter())
+                client.send_data(payload)
+            for client, start in zip(clients, sent):
+                if len(client.recv_data()) != len(payload):
+                    raise ValueError("the echo has the wrong size")
+                latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(e)
+
+
+def measure(server, secure: bool, size: int, clients: int, messages: int, threads: int = 8,
+            socket_options: Optional[str] = None) -> dict:
+    """
+    sends `messages` messages of `size` bytes, spread over `clients` connections, to the Server and waits for the
+    echoes
+
+    Returns:
+        returns a dict with the messages per second, the echoed megabytes per second and the latency percentiles in
+        microseconds
+    """
+    connected = _connect(secure, server.socket.getsockname()[1], clients, socket_options)
+    rounds = max(1, messages // clients)
+    payload = b'x' * size
+    threads = min(threads, clients)
+    latencies, errors = [], []
+    try:
+        _drive(connected[:1], payload, 1, [], errors)  # warm up
+        workers = [threading.Thread(target=_drive, args=(connected[index::threads], payload, rounds, latencies,
+                                                          errors), daemon=True) for index in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        duration = time.perf_counter() - start
+    finally:
+        for client in connected:
+            client.close()
+    if errors:
+        raise errors[0]
+
+    latencies.sort()
+    return {"secure": secure, "size": size, "clients": clients, "messages": len(latencies),
+            "messages_per_second": len(latencies) / duration,
+            "megabytes_per_second": len(latencies) * size / duration / MB,
+            "latency_p50_us": _percentile(latencies, 50) * 1e6, "latency_p99_us": _percentile(latencies, 99) * 1e6,
+            "latency_p999_us": _percentile(latencies, 99.9) * 1e6}
+
+
+def _messages(size: int, messages: int, volume: int) -> int:
+    # big messages are limited by the volume, so 16MB messages don't take minutes
+    return max(4, min(messages, volume // size))
+
+
+def run(sizes=(64, KB, 64 * KB, MB, 16 * MB), clients=(1, 10, 100, 1000, 5000), secure=(False, True),
+        messages: int = 20000, volume: int = 256 * MB, engine: str = "selector", threads: int = 8,
+        socket_options: Optional[str] = None) -> list:
+    """
+    measures every message size with one Client and every amount of Clients with 64 byte messages
+
+    Args:
+        sizes: message sizes in bytes
+        clients: amounts of concurrent Clients
+        secure: which Servers are measured, False is the TCPServer and True the SecureServer
+        messages: amount of messages per measurement
+        volume: maximal amount of bytes per measurement, which limits the messages of big sizes
+        engine: the engine of the Servers
+        threads: amount of threads which drive the Clients, the SecureClients use the x25519 handshake
+        socket_options: name of a SocketOptions preset for the Servers and the Clients
+
+    Returns:
+        returns a list with the result of every measurement
+    """
+    raise_fd_limit(2 * max(clients, default=1) + 256)  # both ends of every connection are in this process
+    results = []
+    for secure_ in secure:
+        server = _server(secure_, engine, socket_options)
+        try:
+            for size in sizes:
+                results.append(measure(server, secure_, size, 1, _messages(size, messages, volume), threads,
+                                       socket_options))
+            for count in clients:
+                if count == 1 and 64 in sizes:  # already measured
+                    continue
+                results.append(measure(server, secure_, 64, count, max(messages, count), threads, socket_options))
+        finally:
+            server.close()
+    return results
+
+
+def format_result(result: dict) -> str:
+    """
+    Returns:
+        returns one line with the name and the numbers of a measurement
+    """
+    name = f"{'secure' if result['secure'] else 'plain'} {result['size']}B x{result['clients']}:"
+    return " ".join([name] + [f"{key}={value:.1f}" for key, value in result.items()
+                              if key.endswith(("_second", "_us"))])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, KB, 64 * KB, MB, 16 * MB])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--engine", choices=("threaded", "selector"), default="selector")
+    parser.add_argument("--plain-only", action="store_true")
+    parser.add_argument("--socket-options", choices=sorted(SocketOptions.PRESETS))
+    args = parser.parse_args(argv)
+
+    for result in run(args.sizes, args.clients, (False,) if args.plain_only else (False, True), args.messages,
+                      engine=args.engine, socket_options=args.socket_options):
+        print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
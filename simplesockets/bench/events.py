@@ -0,0 +1,143 @@
+"""
+Benchmark of the Event_System: throughput of producer threads and one consumer, `clear_name()` with many queued
+events and `in` checks. The list based Event_System of simplesockets 0.4.0 is measured for comparison.
+
+Run it with `python -m simplesockets.bench.events`
+"""
+import argparse
+import threading
+import time
+from threading import Event as Event_
+
+from simplesockets._support_files.Events import Event, Event_System
+
+RECEIVED = Event("--RECEIVED--")
+EXCEPTION = Event("--EXCEPTION--")
+
+
+class ListEvent_System:
+    """the list based Event_System of simplesockets 0.4.0"""
+
+    def __init__(self):
+        self.events = []
+        self._lock = Event_()
+
+    def __bool__(self):
+        return len(self.events) > 0
+
+    def __contains__(self, item):
+        return item in self.events
+
+    def happened(self, event: Event):
+        self.events.append(event)
+        self._lock.set()
+
+    def first_event(self):
+        if self:
+            return self.events.pop(0)
+
+    def next_event(self, timeout=None):
+        while True:
+            r = self._lock.wait(None if timeout is None else timeout / 1000)
+            if self and r:
+                return self.first_event()
+            elif r is not True:
+                return None
+            else:
+                self._lock.clear()
+
+    def clear_name(self, name: str):
+        self.events = [ev for ev in self.events if ev.name != name]
+        if not self.events:
+            self._lock.clear()
+
+
+def bench_throughput(event_system, producers: int, events: int) -> float:
+    """
+    producer threads add events, one consumer pops them
+
+    Returns:
+        returns the consumed events per second
+    """
+    per_producer = events // producers
+    total = per_producer * producers
+
+    def produce():
+        for _ in range(per_producer):
+            event_system.happened(RECEIVED)
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    consumed = 0
+    while consumed < total:
+        if event_system.next_event(1000) is None:
+            break
+        consumed += 1
+    duration = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    return consumed / duration
+
+
+def bench_backlog(event_system, events: int) -> dict:
+    """
+    fills the queue, then measures `in` checks, `clear_name()` and draining the rest
+
+    Returns:
+        returns the durations in milliseconds
+    """
+    for i in range(events):
+        event_system.happened(EXCEPTION if i % 2 else RECEIVED)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        EXCEPTION in event_system
+    contains = time.perf_counter() - start
+
+    start = time.perf_counter()
+    event_system.clear_name(RECEIVED.name)
+    clear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while event_system.first_event() is not None:
+        pass
+    drain = time.perf_counter() - start
+    return {"contains_1000_ms": contains * 1000, "clear_name_ms": clear * 1000, "drain_ms": drain * 1000}
+
+
+def run(events: int = 200000, producers: int = 4, backlog: int = 50000) -> dict:
+    """
+    runs the benchmark for the current and the old Event_System
+
+    Args:
+        events: amount of events for the throughput benchmark
+        producers: amount of producer threads
+        backlog: amount of queued events for the backlog benchmark
+
+    Returns:
+        returns a dict with the results of both implementations
+    """
+    results = {}
+    for name, cls in (("deque", Event_System), ("list", ListEvent_System)):
+        result = {"events_per_second": bench_throughput(cls(), producers, events)}
+        result.update(bench_backlog(cls(), backlog))
+        results[name] = result
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--backlog", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    results = run(args.events, args.producers, args.backlog)
+    for name, result in results.items():
+        print(name + ":", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
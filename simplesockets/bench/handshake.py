@@ -0,0 +1,86 @@
+"""
+Benchmark of the handshakes of the SecureServer: connections per second with the rsa and with the x25519 handshake,
+session resumption is disabled. The server CPU time is the cost of the cryptographic operations of the Server for
+one handshake, which limits the handshakes per second of a core.
+
+Run it with `python -m simplesockets.bench.handshake`
+"""
+import argparse
+import time
+
+from Crypto.Cipher import PKCS1_OAEP
+from Crypto.Random import get_random_bytes
+
+from simplesockets.secure_sockets import SecureClient, SecureServer
+from simplesockets._support_files.ecdh import ServerKey, derive_session, generate_key
+
+
+def _server_cpu(server: SecureServer, handshake: str, repeat: int) -> float:
+    if handshake == "rsa":
+        public = PKCS1_OAEP.new(server.publickey)
+        key, salt = public.encrypt(get_random_bytes(32)), public.encrypt(get_random_bytes(16))
+        private = PKCS1_OAEP.new(server.privatekey)
+
+        def operation():
+            private.decrypt(key)
+            private.decrypt(salt)
+    else:
+        server_key = ServerKey()
+        client_public_key = generate_key()[1]
+
+        def operation():
+            private_key, public_key = server_key.get()
+            derive_session(private_key, client_public_key, client_public_key, public_key)
+
+    start = time.process_time()
+    for _ in range(repeat):
+        operation()
+    return (time.process_time() - start) / repeat
+
+
+def _connections(server: SecureServer, handshake: str, connections: int) -> float:
+    client = SecureClient()
+    client.setup("127.0.0.1", server.socket.getsockname()[1], handshake=handshake)
+    start = time.perf_counter()
+    for _ in range(connections):
+        client.reconnect()
+        client.close()
+    return connections / (time.perf_counter() - start)
+
+
+def run(connections: int = 200, keysize: int = 2048) -> dict:
+    """
+    measures the handshakes
+
+    Args:
+        connections: amount of connections per handshake
+        keysize: size of the RSA key in bits
+
+    Returns:
+        returns a dict with the connections per second, the server CPU time per handshake in microseconds and the
+        resulting handshakes per second of a core per handshake
+    """
+    server = SecureServer()
+    server.setup(port=0, keysize=keysize, ticket_lifetime=None)
+    server.start()
+    results = {}
+    for handshake in ("rsa", "x25519"):
+        cpu = _server_cpu(server, handshake, max(connections // 4, 1))
+        results[handshake] = {"connections_per_second": _connections(server, handshake, connections),
+                              "server_cpu_us": cpu * 1e6, "handshakes_per_core_second": 1 / cpu}
+    server.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--keysize", type=int, default=2048)
+    args = parser.parse_args(argv)
+
+    for handshake, result in run(args.connections, args.keysize).items():
+        print(handshake + ":", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of the startup time of the SecureServer: generating the RSA key in `setup()`, loading it from a key file
+and generating it in the background. For the background generation the time till `setup()` returns and the time till
+the key is ready are measured.
+
+Run it with `python -m simplesockets.bench.keys`
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from simplesockets.secure_sockets import SecureServer
+
+
+def _setup(**kwargs) -> tuple:
+    start = time.perf_counter()
+    server = SecureServer()
+    server.setup(port=0, **kwargs)
+    returned = time.perf_counter() - start
+    server.wait_for_key()
+    ready = time.perf_counter() - start
+    server.close()
+    return returned, ready
+
+
+def run(keysize: int = 2048, repeat: int = 3) -> dict:
+    """
+    measures the startup times
+
+    Args:
+        keysize: size of the RSA key in bits
+        repeat: how often every mode is measured
+
+    Returns:
+        returns a dict with the average time till setup returned and till the key was ready per mode in milliseconds
+    """
+    modes = {"cold_generate": [], "cached_load": [], "background_generate": []}
+    with tempfile.TemporaryDirectory() as directory:
+        key_file = os.path.join(directory, "server.pem")
+        _setup(keysize=keysize, key_file=key_file)  # creates the key file
+        for _ in range(repeat):
+            modes["cold_generate"].append(_setup(keysize=keysize))
+            modes["cached_load"].append(_setup(keysize=keysize, key_file=key_file))
+            modes["background_generate"].append(_setup(keysize=keysize, generate_in_background=True))
+
+    return {mode: {"setup_ms": sum(returned for returned, ready in times) / len(times) * 1000,
+                   "key_ready_ms": sum(ready for returned, ready in times) / len(times) * 1000}
+            for mode, times in modes.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keysize", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for mode, result in run(args.keysize, args.repeat).items():
+        print(mode + ":", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
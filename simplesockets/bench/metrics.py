@@ -0,0 +1,78 @@
+"""
+Benchmark of the overhead of the metrics: a Client sends messages, which the Server echoes from on_receive, once
+without and once with `setup(metrics=True)` on both sides. The runs alternate, so both see the same machine load.
+
+Run it with `python -m simplesockets.bench.metrics`
+"""
+import argparse
+import threading
+import time
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+
+
+def _echo(metrics: bool, messages: int, payload: bytes) -> float:
+    server = TCPServer()
+    server.setup(port=0, on_receive=lambda client, data: client.send(data.response), metrics=metrics)
+    server.start()
+
+    received = [0]
+    done = threading.Event()
+
+    def count(data):
+        received[0] += 1
+        if received[0] == messages:
+            done.set()
+
+    client = TCPClient()
+    client.setup("127.0.0.1", server.socket.getsockname()[1], on_receive=count, metrics=metrics)
+    client.connect()
+    client.autorecv()
+    try:
+        start = time.perf_counter()
+        for _ in range(messages):
+            client.send_data(payload)
+            client.inbox.drain()  # the echoes aren't needed, only counted
+        done.wait(60)
+        return messages / (time.perf_counter() - start)
+    finally:
+        client.close()
+        server.close()
+
+
+def run(messages: int = 20000, size: int = 64, rounds: int = 3) -> dict:
+    """
+    echoes messages with and without metrics
+
+    Args:
+        messages: amount of messages per run
+        size: size of a message in bytes
+        rounds: amount of runs of each variant, the best one counts
+
+    Returns:
+        returns a dict with the messages per second of both variants and the overhead in percent
+    """
+    payload = b'x' * size
+    _echo(False, min(messages, 1000), payload)  # warm up
+    plain, measured = [], []
+    for _ in range(rounds):
+        plain.append(_echo(False, messages, payload))
+        measured.append(_echo(True, messages, payload))
+    without, with_ = max(plain), max(measured)
+    return {"without_metrics_per_second": without, "with_metrics_per_second": with_,
+            "overhead_percent": (without - with_) / without * 100}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    result = run(args.messages, args.size, args.rounds)
+    print(", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark of the scaling of `TCPServer.launch()`: echo throughput of a ProcessGroup with 1, 2, 4, ... workers. The
+Clients are spread over several driver processes, so the Clients don't share one GIL with each other. Every driver
+sends a message on each of its Clients and then waits for the echoes.
+
+Run it with `python -m simplesockets.bench.prefork`
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+from simplesockets.simple_sockets import TCPServer
+from simplesockets.bench.echo import _connect, _drive, raise_fd_limit
+
+
+def _echo(client, data):
+    client.send(data.response)
+
+
+def _driver(port: int, clients: int, rounds: int, payload: bytes, start, results):
+    connected = _connect(False, port, clients)
+    latencies, errors = [], []
+    try:
+        start.wait()
+        began = time.perf_counter()
+        _drive(connected, payload, rounds, latencies, errors)
+        results.put((len(latencies), time.perf_counter() - began, repr(errors[0]) if errors else None))
+    finally:
+        for client in connected:
+            client.close()
+
+
+def measure(workers: int, clients: int, messages: int, size: int, drivers: int, reuse_port=None,
+            engine: str = "selector") -> dict:
+    """
+    echoes `messages` messages of `size` bytes over `clients` connections to a ProcessGroup of `workers` workers
+
+    Returns:
+        returns a dict with the amount of workers and the messages per second
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    group = TCPServer.launch(workers=workers, reuse_port=reuse_port, port=0, listen=1024, engine=engine,
+                             on_receive=_echo)
+    try:
+        time.sleep(0.5)  # the workers bind after they started
+        drivers = max(1, min(drivers, clients))
+        rounds = max(1, messages // clients)
+        start, results = context.Event(), context.Queue()
+        processes = [context.Process(target=_driver, daemon=True,
+                                     args=(group.port, len(range(index, clients, drivers)), rounds, b'x' * size,
+                                           start, results)) for index in range(drivers)]
+        for process in processes:
+            process.start()
+        start.set()
+        echoed, duration = 0, 0.0
+        for _ in processes:
+            count, elapsed, error = results.get(timeout=300)
+            if error is not None:
+                raise RuntimeError(f"a driver failed: {error}")
+            echoed += count
+            duration = max(duration, elapsed)
+        for process in processes:
+            process.join()
+    finally:
+        group.close()
+    return {"workers": workers, "clients": clients, "size": size, "messages": echoed,
+            "messages_per_second": echoed / duration}
+
+
+def run(workers=None, clients: int = 64, messages: int = 40000, size: int = 64, drivers=None,
+        reuse_port=None, engine: str = "selector") -> list:
+    """
+    measures every amount of workers
+
+    Args:
+        workers: amounts of workers, defaults to 1, 2, 4, ... up to the amount of cores
+        clients: amount of concurrent Clients
+        messages: amount of messages per measurement
+        size: size of a message in bytes
+        drivers: amount of processes which drive the Clients, defaults to half of the cores
+        reuse_port: if the workers bind with SO_REUSEPORT, defaults to True where it's available
+        engine: the engine of the workers
+
+    Returns:
+        returns a list with the result of every measurement, including the speedup over the first one
+    """
+    cores = os.cpu_count() or 1
+    if workers is None:
+        workers = [1]
+        while workers[-1] * 2 <= cores:
+            workers.append(workers[-1] * 2)
+    raise_fd_limit(clients + 256)
+    results = []
+    for count in workers:
+        result = measure(count, clients, messages, size, drivers or max(1, cores // 2), reuse_port, engine)
+        result["speedup"] = result["messages_per_second"] / results[0]["messages_per_second"] if results else 1.0
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=40000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--drivers", type=int)
+    parser.add_argument("--shared-listener", action="store_true", help="share one listening socket instead of "
+                                                                       "SO_REUSEPORT")
+    parser.add_argument("--engine", choices=("threaded", "selector"), default="selector")
+    args = parser.parse_args(argv)
+
+    for result in run(args.workers, args.clients, args.messages, args.size, args.drivers,
+                      False if args.shared_listener else None, args.engine):
+        print(f"{result['workers']} workers: {result['messages_per_second']:.0f} msg/s, "
+              f"speedup {result['speedup']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
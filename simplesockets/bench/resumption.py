@@ -0,0 +1,63 @@
+"""
+Benchmark of reconnecting SecureClients: reconnects per second with a full RSA handshake on every connection and with
+session resumption, where a reconnect presents the ticket of the previous connection. Client and Server run in this
+process, so the CPU time contains both sides.
+
+Run it with `python -m simplesockets.bench.resumption`
+"""
+import argparse
+import time
+
+from simplesockets.secure_sockets import SecureClient, SecureServer
+
+
+def _reconnects(reconnects: int, keysize: int, resumption: bool) -> dict:
+    server = SecureServer()
+    server.setup(port=0, keysize=keysize, ticket_lifetime=3600.0 if resumption else None)
+    server.start()
+
+    client = SecureClient()
+    client.setup("127.0.0.1", server.socket.getsockname()[1])
+    client.connect()
+    client.close()
+
+    start, cpu = time.perf_counter(), time.process_time()
+    for _ in range(reconnects):
+        client.reconnect()
+        client.close()
+    duration, cpu = time.perf_counter() - start, time.process_time() - cpu
+
+    stats = server.handshake_stats()
+    server.close()
+    return {"reconnects_per_second": reconnects / duration, "cpu_us_per_reconnect": cpu / reconnects * 1e6,
+            "handshake_p50_ms": stats["latency_p50_ms"], "resumed": stats.get("resumed", 0)}
+
+
+def run(reconnects: int = 200, keysize: int = 2048) -> dict:
+    """
+    measures the reconnects
+
+    Args:
+        reconnects: amount of reconnects per mode
+        keysize: size of the RSA key in bits
+
+    Returns:
+        returns a dict with the reconnects per second, the CPU time per reconnect, the median handshake latency and
+        the amount of resumed sessions per mode
+    """
+    return {"full_handshake": _reconnects(reconnects, keysize, False),
+            "resumption": _reconnects(reconnects, keysize, True)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reconnects", type=int, default=200)
+    parser.add_argument("--keysize", type=int, default=2048)
+    args = parser.parse_args(argv)
+
+    for mode, result in run(args.reconnects, args.keysize).items():
+        print(mode + ":", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of requests with `TCPClient.request()`: throughput and latency of an echo handler at several pipeline
+depths, the amount of requests which wait for their reply at the same time on one connection. The handlers run on a
+Dispatcher, so replies can overtake each other.
+
+Run it with `python -m simplesockets.bench.rpc`
+"""
+import argparse
+import threading
+import time
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.dispatch import Dispatcher
+
+
+def _percentile(values: list, percent: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _pipeline(client: TCPClient, depth: int, requests: int, payload: bytes) -> dict:
+    window = threading.Semaphore(depth)
+    latencies = []
+    done = threading.Event()
+
+    def finished(future, sent):
+        latencies.append(time.perf_counter() - sent)
+        window.release()
+        if len(latencies) == requests:
+            done.set()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        window.acquire()
+        sent = time.perf_counter()
+        client.request(payload, timeout=30).add_done_callback(lambda future, sent=sent: finished(future, sent))
+    done.wait()
+    duration = time.perf_counter() - start
+
+    latencies.sort()
+    return {"requests_per_second": requests / duration, "latency_p50_us": _percentile(latencies, 50) * 1e6,
+            "latency_p99_us": _percentile(latencies, 99) * 1e6}
+
+
+def run(depths=(1, 16, 256), requests: int = 20000, size: int = 64, workers: int = 4) -> dict:
+    """
+    sends echo requests over one connection
+
+    Args:
+        depths: pipeline depths which are measured
+        requests: amount of requests per depth
+        size: size of a request in bytes
+        workers: amount of workers of the Dispatcher
+
+    Returns:
+        returns a dict with the requests per second and the latency percentiles in microseconds per depth
+    """
+    server = TCPServer()
+    server.setup(port=0, dispatcher=Dispatcher(workers, ordered=False))
+    server.register_handler(lambda client, request: request.response)
+    server.start()
+
+    client = TCPClient()
+    client.setup("127.0.0.1", server.socket.getsockname()[1])
+    client.connect()
+
+    payload = b'x' * size
+    try:
+        _pipeline(client, 16, min(requests, 1000), payload)  # warm up
+        return {depth: _pipeline(client, depth, requests, payload) for depth in depths}
+    finally:
+        client.close()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    for depth, result in run(args.depths, args.requests, args.size, args.workers).items():
+        print(f"depth {depth}:", ", ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,114 @@
-from typing import Optional, Callable
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Union, Tuple
 
 from .simple_sockets import TCPClient, TCPServer, Server_Client, Socket_Response, _time
 from ._support_files.error import SetupError
+from ._support_files.dispatch import Dispatcher
+from ._support_files.inbox import Inbox
+from ._support_files.compression import Compression
+from ._support_files.codec import Codec
+from ._support_files.session import Session, LegacySession
+from ._support_files.keys import load_key, load_or_create_key
+from ._support_files.handshake import HandshakePool
+from ._support_files.pool import ClientPool
+from ._support_files.reconnect import Reconnect
+from ._support_files.metrics import timed
+from ._support_files.tracing import Tracer
+from ._support_files.sockopts import SocketOptions
+from ._support_files.coalesce import Coalesce
+from ._support_files.framing import FRAME_TICKET, FRAME_RESUME, FRAME_HELLO, FRAME_COMPRESSED, frame_buffers, \
+    send_buffers, recv_exact_into, MAX_FRAME_SIZE
+from ._support_files.ecdh import ServerKey, generate_key, derive_session
+from ._support_files.resumption import TicketCache, RANDOM_SIZE, resumption_secret, resumed_session, pack_ticket, \
+    unpack_ticket
 
 from Crypto.PublicKey import RSA
-from Crypto.Cipher import AES, PKCS1_OAEP
+from Crypto.Cipher import PKCS1_OAEP
 from Crypto.Random import get_random_bytes
 
-import time
-import threading
 import traceback
 
 class SecureClient(TCPClient):
+    """
+    TCPClient which encrypts its messages. The key is send encrypted with the RSA key of the Server, afterwards every
+    message is encrypted and authenticated with the Session (ChaCha20-Poly1305). With `framed=False` the scheme of
+    0.4.0 (AES-EAX) is used
+
+    With `setup(handshake="x25519")` the key is agreed with ephemeral X25519 keys instead, which costs the Server a
+    fraction of the RSA decryption. The Client proposes it in its first frame, so the Server can serve both kinds of
+    Clients.
+
+    After a connection the Client keeps the session ticket issued by the Server, `reconnect()` presents it and derives
+    the keys of the new Session from the previous one, without any RSA operation
+    """
+
     def __init__(self):
         super().__init__()
         self._key = get_random_bytes(32)
-        self._cipher = AES.new(self._key, AES.MODE_EAX)
+        self._cipher = None
+        self._ticket = None  # (ticket, resumption secret, expiry)
+        self._handshake_mode = "rsa"
+        self.resumed = False
+
+    def setup(self, target_ip: str, target_port: Optional[int] = 25567, recv_buffer: Optional[int] = 2048,
+              on_connect: Optional[Callable] = None, on_disconnect: Optional[Callable] = None,
+              on_receive: Optional[Callable] = None, framed: Optional[bool] = True, inbox: Optional[Inbox] = None,
+              handshake: str = "rsa", compression: Optional[Compression] = None, codec: Optional[Codec] = None,
+              reconnect: Optional[Reconnect] = None, metrics: Optional[bool] = False,
+              tracer: Optional[Tracer] = None, socket_options: Union[SocketOptions, str, None] = None,
+              coalesce: Optional[Coalesce] = None, max_frame_size: int = MAX_FRAME_SIZE):
+        """
+        function sets up the Client
+
+        Args:
+            target_ip: IP the Client should connect to
+            target_port: PORT the Client should connect to
+            recv_buffer: The receive buffer used for `socket.recv()`
+            on_connect: Function that will be executed on connection, it takes not arguments
+            on_disconnect: Function that will be executed on disconnection, it takes no arguments
+            on_receive: Function that will be executed on receive, it takes the received data as an argument
+            framed: If True, every message is prefixed with its length. Set it to False to talk to Servers using the
+                old unframed protocol
+            inbox: the Inbox which collects the received data, the default one is unbounded
+            handshake: "rsa" sends the key encrypted with the RSA key of the Server, "x25519" agrees on the key with
+                ephemeral X25519 keys and requires framed to be True
+            compression: compression settings which are offered to the Server when connecting, requires framed to be
+                True. Messages are compressed before they are encrypted
+            codec: the Codec for `send_object()` and `Socket_Response.obj`
+            reconnect: settings of the automatic reconnect, a restored connection resumes the session with the ticket
+                of the Server if it's still valid
+            metrics: if the Client should count bytes, messages and syscalls and measure the encryption and
+                on_receive times, see `stats()`
+            tracer: a Tracer which records the stages of sampled messages in the receive and send pipelines
+            socket_options: SocketOptions or the name of a preset like "low-latency", the buffer sizes are set before
+                connecting, the other options after it
+            coalesce: settings of the write coalescing, the messages are still encrypted one by one, but written
+                together with one syscall
+            max_frame_size: maximal length of a received frame in bytes, a bigger frame closes the connection
+
+        Raises:
+            ValueError: if the handshake or the preset is unknown, "x25519" is used without framing or
+                max_frame_size isn't positive
+        """
+        if handshake not in ("rsa", "x25519"):
+            raise ValueError(f"unknown handshake {handshake!r}")
+        if handshake == "x25519" and not framed:
+            raise ValueError("the x25519 handshake requires framed=True")
+        self._handshake_mode = handshake
+        super().setup(target_ip, target_port, recv_buffer, on_connect, on_disconnect, on_receive, framed, inbox,
+                      compression, codec, reconnect, metrics, tracer, socket_options, coalesce, max_frame_size)
 
     @property
     def key(self) -> bytes:
-        """Returns the 256 bit AES key value"""
+        """Returns the 256 bit key of the session"""
         return self._key
 
     @property
     def cipher(self):
-        """Returns the AES Cipher object"""
+        """Returns the Session of the connection"""
         return self._cipher
 
     def recv_data(self, raw: bool = False) -> Socket_Response:
@@ -35,43 +119,88 @@ class SecureClient(TCPClient):
             raw: if False, received data will not be decrypted with the key
         Returns:
             returns received data as bytes
+
+        Raises:
+            ConnectionClosed: if the connection is framed and the Server closed it
+            AuthenticationError: if the message couldn't be authenticated with the session key
         """
-        chunks = []
-        recv_data = True
-        while recv_data:
-            chunk = self.socket.recv(self._recv_buffer)
-            chunks.append(chunk)
-            if len(chunk) < self._recv_buffer:
-                recv_data = False
-        result = b''.join(chunks)
+        kind, result = self._recv_frame()
+        if self.metrics is not None:
+            self.metrics.messages_in += 1
+        trace = self._reader.trace if self._reader is not None else None
         if not raw:
-            result = self._cipher.decrypt(result)
-            self._cipher = AES.new(self._key, AES.MODE_EAX, self.cipher.nonce)
-        return Socket_Response(result, _time())
+            result = self._open(result)
+            if trace is not None:
+                trace.lap("decrypt")
+            result = self._decompress(kind, result)
+            if trace is not None and kind == FRAME_COMPRESSED:
+                trace.lap("decompress")
+        else:
+            result = bytes(result)
+        return Socket_Response(result, _time(), codec=self.codec, _trace=trace)
 
-    def send_data(self, data: bytes) -> bool:
-        """
-        tries to send data to the Server, returns True if it was successful
+    _encrypted = True
 
-        Args:
-            data: data that should be send
+    def _seal(self, data):
+        return timed(self.metrics.encrypt if self.metrics is not None else None, self._cipher.encrypt, data)
 
-        Returns:
-            returns True if the sending was successful
-        """
-        data = self._cipher.encrypt(data)
-        self._cipher = AES.new(self._key, AES.MODE_EAX, self.cipher.nonce)
-        data_length = len(data)
-        sended_length = 0
-        while sended_length < data_length:
-            sent = self.socket.send(data[sended_length:])
-            if sent == 0:
-                self.event.exception.exceptions.add(ConnectionError("socket connection error"))
-                self.event.exception.occurred = True
-                self._event_system.happened(self.EVENT_EXCEPTION.copy())
-                return False
-            sended_length += sent
-        return True
+    def _open(self, data):
+        return timed(self.metrics.decrypt if self.metrics is not None else None, self._cipher.decrypt, data)
+
+    def forget_ticket(self) -> None:
+        """
+        removes the session ticket, so the next connection does a full handshake
+        """
+        self._ticket = None
+
+    def _handshake(self):
+        # the ticket or the X25519 key is send right away, before the Server answers
+        resume = self._ticket if self._ticket is not None and self._ticket[2] > time.monotonic() else None
+        self._ticket = None  # tickets can only be used once
+        client_random = get_random_bytes(RANDOM_SIZE)
+        ecdh_key = None
+        if resume is not None:
+            self._send(resume[0] + client_random, FRAME_RESUME)
+        elif self._handshake_mode == "x25519":
+            ecdh_key = self._send_hello()
+
+        # the Server sends its public RSA key and a new ticket
+        public_key = bytes(self._recv_frame()[1])
+        kind, ticket = self._reader.read()
+        ticket = unpack_ticket(ticket) if kind == FRAME_TICKET else None
+
+        key = salt = None
+        self.resumed = False
+        if resume is not None:
+            kind, server_random = self._reader.read()
+            if kind == FRAME_RESUME and len(server_random) == RANDOM_SIZE:
+                key, salt = resumed_session(resume[1], client_random, bytes(server_random))
+                self.resumed = True
+            elif self._handshake_mode == "x25519":  # the ticket got rejected
+                ecdh_key = self._send_hello()
+
+        if ecdh_key is not None:
+            kind, server_public_key = self._reader.read()
+            if kind != FRAME_HELLO:
+                raise SetupError("the Server doesn't support the x25519 handshake")
+            server_public_key = bytes(server_public_key)
+            key, salt = derive_session(ecdh_key[0], server_public_key, ecdh_key[1], server_public_key)
+        elif key is None:
+            # send the key and the salt of the session
+            cipher_rsa = PKCS1_OAEP.new(RSA.import_key(public_key))
+            key, salt = get_random_bytes(32), get_random_bytes(16)
+            self._send(cipher_rsa.encrypt(key))
+            self._send(cipher_rsa.encrypt(salt))
+
+        self._key = key
+        self._cipher = Session(key, salt, initiator=True)
+        if ticket is not None:
+            self._ticket = (ticket[0], resumption_secret(key, salt), time.monotonic() + ticket[1])
+
+    def _send_hello(self) -> tuple:
+        ecdh_key = generate_key()
+        self._send(ecdh_key[1], FRAME_HELLO)
+        return ecdh_key
 
     def connect(self) -> bool:
         """
@@ -84,7 +213,7 @@ class SecureClient(TCPClient):
         if self._setup_flag is False:
             raise SetupError("Server isn't setup")
         try:
-            self.socket.connect((self._target_ip, self._target_port))
+            self._connect_socket()
 
             self.event.is_connected = True
             self.event.connected = True
@@ -94,16 +223,19 @@ class SecureClient(TCPClient):
 
             #  exchange keys
 
-            # get public rsa key
-            key = self.recv_data(True).response #doesn't work, must receice manually
-            key = RSA.import_key(key)
+            if self._framed:
+                self._handshake()
+            else:
+                # get public rsa key
+                cipher_rsa = PKCS1_OAEP.new(RSA.import_key(bytes(self._recv_frame()[1])))
+
+                # send the key and the nonce of the old protocol
+                nonce = get_random_bytes(16)
+                self._send(cipher_rsa.encrypt(self._key))
+                self._send(cipher_rsa.encrypt(nonce))
+                self._cipher = LegacySession(self._key, nonce)
 
-            # send AES key
-            cipher_rsa = PKCS1_OAEP.new(key)
-            encrypt_key = cipher_rsa.encrypt(self._key)
-            encrypted_nonce = cipher_rsa.encrypt(self._cipher.nonce)
-            self.socket.send(encrypt_key)
-            self.socket.send(encrypted_nonce)
+            self._negotiate_compression()
 
             if callable(self.on_connect):
                 self.on_connect()
@@ -126,7 +258,7 @@ class SecureServer(TCPServer):
             self.event.new_data (bool): Is True if the Client received new data
             self.event.exception.occurred (bool): Is True if an exception got caught
             self.event.exception.list (list): contains all caught exceptions
-            self.recved_data (list): contains all received data
+            self.recved_data (list): a read-only copy of the received data, which wasn't returned yet
             self.socket (socket.socket): is the Server Socket
             self.clients (dict): contains the address as the key and the client thread and socket as a list as the values
 
@@ -136,11 +268,26 @@ class SecureServer(TCPServer):
         self._privatkey = None
         self._publickey = None
         self._exported_publickey = None
+        self._key_ready = threading.Event()
+        self._tickets: Optional[TicketCache] = None
+        self._handshakes = ("rsa", "x25519")
+        self._ecdh_key = ServerKey()
 
     def setup(self, ip: Optional[str] = "127.0.0.1", port: Optional[int] = 25567, listen: Optional[int] = 5,
               recv_buffer: Optional[int] = 2048, handle_client: Optional[Callable] = None,
               on_connect: Optional[Callable] = None, on_disconnect: Optional[Callable] = None,
-              on_receive: Optional[Callable] = None, keysize: int = 2048):
+              on_receive: Optional[Callable] = None, keysize: int = 2048, framed: Optional[bool] = True,
+              engine: Optional[str] = "threaded", dispatcher: Optional[Dispatcher] = None,
+              reuse_port: Optional[bool] = False, sock: Optional[socket.socket] = None, inbox: Optional[Inbox] = None,
+              private_key: Union[RSA.RsaKey, bytes, str, None] = None, key_file: Optional[str] = None,
+              passphrase: Optional[str] = None, generate_in_background: bool = False, handshake_workers: int = 8,
+              handshake_timeout: Optional[float] = 10.0, ticket_lifetime: Optional[float] = 3600.0,
+              ticket_cache_size: int = 10000, handshakes: Tuple[str, ...] = ("rsa", "x25519"),
+              x25519_key_lifetime: float = 0.0, compression: Optional[Compression] = None,
+              codec: Optional[Codec] = None, heartbeat: Optional[float] = None,
+              idle_timeout: Optional[float] = None, metrics: Optional[bool] = False,
+              tracer: Optional[Tracer] = None, socket_options: Union[SocketOptions, str, None] = None,
+              max_frame_size: int = MAX_FRAME_SIZE):
         """
         function prepares the Server
 
@@ -154,68 +301,201 @@ class SecureServer(TCPServer):
             on_disconnect: function that will be executed on disconnection, it takes the address(tuple) as an argument
             on_receive: function that will be executed on receive, it takes the clientsocket, address, received data as
                 an argument
+            keysize: size of the RSA key in bits, if it has to be generated
+            framed: if True, every message is prefixed with its length. Set it to False to talk to Clients using the
+                old unframed protocol
+            engine: "threaded" starts a thread for every Client, "selector" handles all Clients on one thread with
+                `selectors.DefaultSelector`
+            dispatcher: a Dispatcher which executes on_receive on its workers instead of the receiving thread
+            reuse_port: if the socket should be bound with SO_REUSEPORT, so several processes can listen on the same
+                address
+            sock: an already bound and listening socket which should be used instead of binding a new one
+            inbox: the Inbox which collects the received data, the default one is unbounded
+            private_key: the private RSA key as RsaKey or in PEM or DER format, instead of generating one
+            key_file: path of a PEM or DER file with the private RSA key. If it doesn't exist, the generated key is
+                saved there, so the next start doesn't have to generate it again
+            passphrase: passphrase of private_key or key_file
+            generate_in_background: if True, the key is loaded or generated in a thread and setup returns immediately.
+                Handshakes wait till the key is ready
+            handshake_workers: amount of threads which execute the handshakes of accepted connections, so a slow
+                Client doesn't block the accepting. 0 executes them on the accepting thread
+            handshake_timeout: time in seconds a Client has for the handshake before it gets disconnected, None
+                disables the timeout
+            ticket_lifetime: seconds a session ticket can be used to resume a session, None disables the resumption
+            ticket_cache_size: maximal amount of stored session tickets
+            handshakes: the accepted handshakes, "rsa" and "x25519". Without "rsa" no RSA key is created, Clients
+                using the rsa handshake fail to connect. The Clients choose their handshake
+            x25519_key_lifetime: seconds the X25519 key of the Server is used for handshakes. 0 generates a new one
+                for every handshake, which gives every session forward secrecy. Reusing the key halves the CPU time
+                of a handshake, but a leaked key then exposes every session of its lifetime
+            compression: compression settings, Clients offering the same settings get their messages compressed
+                before they are encrypted
+            codec: the Codec for `Server_Client.send_object()` and `Socket_Response.obj`
+            heartbeat: seconds of silence after which a Client gets a heartbeat frame, which it answers when it
+                receives. Requires framed to be True
+            idle_timeout: seconds of silence after which a Client is disconnected and `EVENT_IDLE` happens
+            metrics: if the Server should count bytes, messages and syscalls and measure the encryption and handler
+                times of every connection, see `stats()`
+            tracer: a Tracer which records the stages of sampled messages in the receive and send pipelines
+            socket_options: SocketOptions or the name of a preset like "low-latency", they are set on the listening
+                socket and on every accepted socket
+            max_frame_size: maximal length of a received frame in bytes, a Client sending a bigger frame is
+                disconnected, also during the handshake
+
+        Raises:
+            ValueError: if private_key isn't a valid private RSA key, a handshake or the preset is unknown or
+                max_frame_size isn't positive
         """
-        super().setup(ip, port, listen, recv_buffer, handle_client, on_connect, on_disconnect, on_receive)
-        self._privatkey = RSA.generate(keysize)
-        self._publickey = self._privatkey.public_key()
+        if not handshakes or set(handshakes) - {"rsa", "x25519"}:
+            raise ValueError(f"unknown handshakes {handshakes!r}")
+        self._handshakes = tuple(handshakes)
+        self._ecdh_key = ServerKey(x25519_key_lifetime)
+
+        self._key_ready.clear()
+        self._privatkey = self._publickey = self._exported_publickey = None
+        if "rsa" not in handshakes:
+            self._exported_publickey = b''  # Clients using the rsa handshake can't import it
+            self._key_ready.set()
+        elif private_key is not None:
+            self._set_key(load_key(private_key, passphrase))
+        elif generate_in_background:
+            threading.Thread(target=self._create_key_in_background, args=(keysize, key_file, passphrase),
+                             daemon=True).start()
+        else:
+            self._set_key(self._create_key(keysize, key_file, passphrase))
+
+        self._tickets = TicketCache(ticket_lifetime, ticket_cache_size) if ticket_lifetime else None
+
+        if handshake_workers > 0:
+            self._handshake_pool = HandshakePool(handshake_workers, handshake_timeout)
+
+        super().setup(ip, port, listen, recv_buffer, handle_client, on_connect, on_disconnect, on_receive, framed,
+                      engine, dispatcher, reuse_port, sock, inbox, compression, codec, heartbeat, idle_timeout,
+                      metrics, tracer, socket_options, max_frame_size)
+
+    @staticmethod
+    def _create_key(keysize: int, key_file: Optional[str], passphrase: Optional[str]) -> RSA.RsaKey:
+        if key_file is not None:
+            return load_or_create_key(key_file, keysize, passphrase)
+        return RSA.generate(keysize)
+
+    def _create_key_in_background(self, keysize: int, key_file: Optional[str], passphrase: Optional[str]):
+        try:
+            self._set_key(self._create_key(keysize, key_file, passphrase))
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+            self._key_ready.set()  # handshakes fail instead of waiting forever
+
+    def _set_key(self, key: RSA.RsaKey):
+        self._privatkey = key
+        self._publickey = key.public_key()
         self._exported_publickey = self._publickey.export_key()
+        self._key_ready.set()
+
+    def wait_for_key(self, timeout: Optional[float] = None) -> bool:
+        """
+        waits till the RSA key is loaded or generated
+
+        Args:
+            timeout: timeout in seconds, None waits forever
+
+        Returns:
+            returns True if the key is ready
+        """
+        return self._key_ready.wait(timeout)
+
+    def handshake_stats(self) -> dict:
+        """
+        returns statistics of the handshakes, times are in milliseconds
+
+        Returns:
+            returns a dict containing the amount of accepted, completed, failed and timed out handshakes, the accepted
+            connections per second, the 50th, 90th and 99th percentile of the handshake latency and the amount of
+            resumed sessions and rejected tickets. The pool statistics are missing if handshake_workers was 0
+        """
+        stats = {} if self._handshake_pool is None else self._handshake_pool.stats()
+        if self._tickets is not None:
+            stats["resumed"] = self._tickets.resumed
+            stats["tickets_rejected"] = self._tickets.rejected
+        return stats
 
     @property
     def privatekey(self) -> RSA.RsaKey:
-        """Returns the private RSA key"""
+        """Returns the private RSA key, it's None while the key is generated in the background"""
         return self._privatkey
 
     @property
     def publickey(self) -> RSA.RsaKey:
-        """Returns the public RSA key"""
+        """Returns the public RSA key, it's None while the key is generated in the background"""
         return self._publickey
 
-    def _accept_clients(self):
+    def _handshake(self, client: Server_Client) -> Server_Client:
         """
-        This function handle the accepting of connections, the key exchange and the start of the thread,
-        handling the connection
+        sends the public RSA key to the client and receives the key of the session
         """
-        while self._kill is False:
-            time.sleep(0.1)
-            while self.event.accepting_thread.run:
-                try:
-                    client_socket, address = self.socket.accept()
-                except OSError:
-                    self.exit_accept()
-                    return
-
-                server_client = Server_Client(client_socket, address, recv_buffer=self._recv_buffer)
-
-                # send public RSA KEY
-                client_socket.sendall(self._exported_publickey)
-
-                # receive encrypted AES key
-                encrypted_key = server_client.recv()
-                encrypted_nonce = server_client.recv()
-
-                # decrypt key and nonce
-                cipher_rsa = PKCS1_OAEP.new(self._privatkey)
-                key = cipher_rsa.decrypt(encrypted_key.response)
-                nonce = cipher_rsa.decrypt(encrypted_nonce.response)
-
-                # create AES key
-                cipher_aes = AES.new(key, AES.MODE_EAX, nonce)
-
-                # add key to Server_Client object
-                server_client = server_client._add_cipher(key, cipher_aes)
-
-                ct = threading.Thread(target=self._start_target, args=(server_client,), daemon=True)
-                server_client = server_client._add_thread(ct)
-                #self.clients[address] = [ct, client_socket]
-
-                self.clients[address] = server_client
-
-                if callable(self.on_connect):
-                    self.on_connect(server_client)
-
-                ct.start()
-
-                self._allthreads[address] = ct  # add thread to all threads dict
-
-                if self.max_connections is not None and len(self.clients) >= self.max_connections:
-                    self.run = False
\ No newline at end of file
+        self._key_ready.wait()
+
+        if not client.framed:
+            if self._privatkey is None:
+                raise SetupError("the RSA key couldn't be created")
+
+            # send public RSA KEY
+            client.send(self._exported_publickey, raw=True)
+
+            # receive encrypted key and nonce, they can arrive in one segment
+            cipher_rsa = PKCS1_OAEP.new(self._privatkey)
+            encrypted = bytearray(2 * self._privatkey.size_in_bytes())
+            recv_exact_into(client.socket, memoryview(encrypted))
+            key = cipher_rsa.decrypt(encrypted[:len(encrypted) // 2])
+            session = LegacySession(key, cipher_rsa.decrypt(encrypted[len(encrypted) // 2:]))
+            return client._add_cipher(key, session)
+
+        # send public RSA KEY and a new ticket in one write
+        tickets = self._tickets
+        ticket = b'' if tickets is None else tickets.new_ticket()
+        send_buffers(client.socket, deque(frame_buffers(self._exported_publickey) + frame_buffers(
+            pack_ticket(ticket, tickets.lifetime) if ticket else b'', FRAME_TICKET)))
+
+        kind, data = client._reader.read()
+        key = salt = None
+        if kind == FRAME_RESUME:
+            secret = None if tickets is None else tickets.take(data[:-RANDOM_SIZE])
+            if secret is not None:
+                server_random = get_random_bytes(RANDOM_SIZE)
+                send_buffers(client.socket, deque(frame_buffers(server_random, FRAME_RESUME)))
+                key, salt = resumed_session(secret, bytes(data[-RANDOM_SIZE:]), server_random)
+            else:  # the Client continues with a full handshake
+                send_buffers(client.socket, deque(frame_buffers(b'', FRAME_RESUME)))
+                kind, data = client._reader.read()
+
+        if key is None and kind == FRAME_HELLO:
+            if "x25519" not in self._handshakes:
+                raise SetupError("the x25519 handshake isn't accepted")
+            client_public_key = bytes(data)
+            private_key, public_key = self._ecdh_key.get()
+            send_buffers(client.socket, deque(frame_buffers(public_key, FRAME_HELLO)))
+            key, salt = derive_session(private_key, client_public_key, client_public_key, public_key)
+        elif key is None:
+            if self._privatkey is None:
+                raise SetupError("the RSA key couldn't be created" if "rsa" in self._handshakes else
+                                 "the rsa handshake isn't accepted")
+
+            # decrypt key and salt
+            cipher_rsa = PKCS1_OAEP.new(self._privatkey)
+            key = cipher_rsa.decrypt(bytes(data))
+            salt = cipher_rsa.decrypt(bytes(client._reader.read()[1]))  # not counted as a message
+
+        if ticket:
+            tickets.store(ticket, resumption_secret(key, salt))
+        session = Session(key, salt, initiator=False)
+
+        # add key to Server_Client object
+        return client._add_cipher(key, session)
+
+
+class SecureClientPool(ClientPool):
+    """
+    A pool of SecureClients per Server address, see `ClientPool`. The handshake is only done when a Client is
+    connected, reused Clients keep their session
+    """
+    client_class = SecureClient
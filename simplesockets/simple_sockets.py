@@ -1,13 +1,36 @@
 import socket
+import struct
 import threading
 import time
 import traceback
-from typing import Callable, Union, Tuple, List, Optional, Any
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Union, Tuple, List, Optional, Any, Dict, Iterable
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from Crypto.Cipher import AES
 
-from simplesockets._support_files.error import SetupError, Exception_Collection
+from simplesockets._support_files.error import SetupError, Exception_Collection, ConnectionClosed, RemoteError, \
+    ProtocolError
+from simplesockets._support_files.framing import FrameReader, Outbox, as_buffer, frame_buffers, recv_unframed, \
+    send_buffers, MAX_FRAME_SIZE, FRAME_DATA, FRAME_COMPRESS, FRAME_COMPRESSED, FRAME_REQUEST, FRAME_REPLY, \
+    FRAME_PING, FRAME_PONG
+from simplesockets._support_files.engine import SelectorEngine
+from simplesockets._support_files.dispatch import Dispatcher
+from simplesockets._support_files.prefork import ProcessGroup
+from simplesockets._support_files.broadcast import Broadcaster
+from simplesockets._support_files.inbox import Inbox
+from simplesockets._support_files.handshake import HandshakePool
+from simplesockets._support_files.compression import Compression, CompressionContext
+from simplesockets._support_files.codec import Codec
+from simplesockets._support_files.pool import ClientPool
+from simplesockets._support_files.reconnect import Reconnect, ReplayBuffer
+from simplesockets._support_files.timers import TimerWheel
+from simplesockets._support_files.metrics import ConnectionMetrics, Metrics, MetricsExporter, timed
+from simplesockets._support_files.tracing import RECV, SEND, Trace, Tracer, traced
+from simplesockets._support_files.sockopts import SocketOptions
+from simplesockets._support_files.coalesce import Coalesce, Coalescer
+from simplesockets._support_files import rpc
 from simplesockets._support_files.Events import Event, Event_System
 
 
@@ -22,6 +45,35 @@ class Server_Client:
     cipher: Any = None
     thread: threading.Thread = None
     recv_buffer: int = 1024
+    framed: bool = True
+    engine: Any = None
+    codec: Optional[Codec] = None
+    compression: Optional[CompressionContext] = None
+    _compression_settings: Optional[Compression] = field(default=None, repr=False, compare=False)
+    _on_request: Optional[Callable] = field(default=None, repr=False, compare=False)
+    _on_activity: Optional[Callable] = field(default=None, repr=False, compare=False)
+    metrics: Optional[ConnectionMetrics] = field(default=None, repr=False, compare=False)
+    tracer: Optional[Tracer] = field(default=None, repr=False, compare=False)
+    max_frame_size: int = field(default=MAX_FRAME_SIZE, repr=False, compare=False)
+    _reader: FrameReader = field(init=False, default=None, repr=False, compare=False)
+    _send_lock: threading.Lock = field(init=False, default=None, repr=False, compare=False)
+    _outbox: Outbox = field(init=False, default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.framed and self.engine is None:
+            object.__setattr__(self, "_reader", FrameReader(self.socket, self.recv_buffer, self.max_frame_size))
+            self._reader.metrics = self.metrics
+            self._reader.tracer = self.tracer
+            self._reader.peer = self.address
+        object.__setattr__(self, "_send_lock", threading.Lock())
+        object.__setattr__(self, "_outbox", Outbox())
+
+    @property
+    def pending(self) -> int:
+        """the amount of bytes which are queued, because the socket wasn't writeable"""
+        if self.engine is not None:
+            return self.engine.pending(self)
+        return len(self._outbox)
 
     def __str__(self):
         return str(self.socket)
@@ -39,25 +91,73 @@ class Server_Client:
 
         Raises:
             AttributeError: if raw is False and self.key has no decrypt methode
+            ConnectionClosed: if the connection is framed and the client closed it
+            AuthenticationError: if the message couldn't be authenticated with the session key
+        """
+        if not self.framed:
+            result = recv_unframed(self.socket, self.recv_buffer)
+            if self.metrics is not None:
+                self.metrics.recv_calls += len(result) // self.recv_buffer + 1
+                self.metrics.bytes_in += len(result)
+            if self._on_activity is not None:
+                self._on_activity(self.address)
+            return self._decode(result, raw)
+
+        kind, result = self._reader.read()
+        while self._control(kind, result):
+            kind, result = self._reader.read()
+        return self._decode(result, raw, kind, self._reader.trace)
+
+    def _control(self, kind: int, payload) -> bool:
         """
-        chunks = []
-        recv_data = True
-        while recv_data:
-            chunk = self.socket.recv(self.recv_buffer)
-            chunks.append(chunk)
-            if len(chunk) < self.recv_buffer:
-                recv_data = False
+        handles control frames
 
-        result = b''.join(chunks)
-        if self.key is not None and self.cipher is not None and raw is False:
-            try:
-                result = self.cipher.decrypt(result)
-                object.__setattr__(self, "cipher", AES.new(self.key, AES.MODE_EAX, self.cipher.nonce))
-                # self.cipher =
-            except AttributeError:
-                raise AttributeError("The key has no decrypt methode")
+        Returns:
+            returns True if the frame was a control frame
+        """
+        if self._on_activity is not None:  # every received frame passes here
+            self._on_activity(self.address)
+        if kind == FRAME_PONG:  # the answer to a heartbeat
+            return True
+        if kind == FRAME_REQUEST:
+            if self._on_request is None:
+                raise ValueError("received a request, but the Server doesn't handle requests")
+            self._on_request(self, payload)
+            return True
+        if kind == FRAME_PING:
+            with self._send_lock:
+                self._write(frame_buffers(bytes(payload), FRAME_PONG))
+            return True
+        if kind != FRAME_COMPRESS:
+            return False
+        settings = self._compression_settings
+        accepted = settings is not None and settings.accepts(payload)
+        with self._send_lock:  # the answer has to be send before the first compressed message
+            object.__setattr__(self, "compression", settings.context(self.max_frame_size) if accepted else None)
+            self._write(frame_buffers(settings.offer() if accepted else b'', FRAME_COMPRESS))
+        return True
 
-        return Socket_Response(result, _time(), self)
+    def _decode(self, result: Union[bytes, memoryview], raw: bool = False, kind: int = FRAME_DATA,
+                trace: Optional[Trace] = None):
+        if raw is False:
+            result = self._open(result)
+            if trace is not None and self.cipher is not None:
+                trace.lap("decrypt")
+        if not isinstance(result, bytes):
+            result = bytes(result)
+
+        if kind == FRAME_COMPRESSED:
+            if self.compression is None:
+                raise ValueError("received a compressed message without negotiated compression")
+            result = self.compression.decompress(result)
+            if trace is not None:
+                trace.lap("decompress")
+        elif self.compression is not None:
+            self.compression.received(len(result))
+
+        if self.metrics is not None:
+            self.metrics.messages_in += 1
+        return Socket_Response(result, _time(), self, self.codec, trace)
 
     def send(self, data: bytes, raw: bool = False) -> None:
         """
@@ -65,40 +165,109 @@ class Server_Client:
         if self.key is not None, it will encrypt the data
 
         Args:
-            data: data that should be send
-            raw: if True, the received data will not be encrypted
+            data: data that should be send, any object supporting the buffer protocol
+            raw: if True, the received data will not be encrypted or compressed
 
         Raises:
             ConnectionError: if the sending failed
             AttributeError: if raw is False and self.key has no encrypt methode
         """
+        with self._send_lock:
+            trace = self.tracer.sample(SEND, self.address) if self.tracer is not None else None
+            kind, data = self._compress(data, raw)
+            if trace is not None and self.compression is not None:
+                trace.lap("compress")
+            data = self._encode(data, raw)
+            if trace is not None and self.cipher is not None and raw is False:
+                trace.lap("encrypt")
+            self._write(self._frame(data, kind))
+            if trace is not None:
+                trace.lap("send")
+            if self.metrics is not None:
+                self.metrics.messages_out += 1
+
+    def _open(self, data):
+        if self.key is not None and self.cipher is not None:
+            if not hasattr(self.cipher, "decrypt"):
+                raise AttributeError("The key has no decrypt methode")
+            return timed(self.metrics.decrypt if self.metrics is not None else None, self.cipher.decrypt, data)
+        return data
+
+    def _reply(self, request_id: int, data, error: bool = False) -> None:
+        """
+        sends the reply to a request
+        """
+        with self._send_lock:
+            flags = rpc.ERROR if error else 0
+            if not error:
+                kind, data = self._compress(data)
+                if kind == FRAME_COMPRESSED:
+                    flags |= rpc.COMPRESSED
+            self._write(frame_buffers(self._encode(rpc.pack(request_id, flags, b'', data)), FRAME_REPLY))
+            if self.metrics is not None:
+                self.metrics.messages_out += 1
+
+    def send_object(self, obj) -> None:
+        """
+        encodes the object with the Codec of the Server and sends it
+
+        Args:
+            obj: an object of a type which is registered at the Codec
+
+        Raises:
+            SetupError: if the Server has no Codec
+            CodecError: if the object couldn't be encoded
+            ConnectionError: if the sending failed
+        """
+        if self.codec is None:
+            raise SetupError("the Server has no codec")
+        self.send(self.codec.encode(obj))
+
+    def _write(self, buffers: list) -> None:
+        # the caller has to hold the send lock
+        if self.engine is not None:
+            self.engine.write(self, buffers)
+            return
+        if self._outbox:  # a broadcast is still being written, the Broadcaster writes the rest
+            self._outbox.extend(buffers)
+            return
+
+        send_buffers(self.socket, deque(buffers), metrics=self.metrics)
+
+    def _compress(self, data, raw: bool = False) -> tuple:
+        if self.compression is None or raw:
+            return FRAME_DATA, data
+        return self.compression.compress(data)
+
+    def _encode(self, data, raw: bool = False):
         if self.key is not None and self.cipher is not None and raw is False:
-            try:
-                data = self.cipher.encrypt(data)
-                object.__setattr__(self, "cipher", AES.new(self.key, AES.MODE_EAX, self.cipher.nonce))  #: self.cipher = ...
-            except AttributeError:  # if key has not function 'encrypt'
+            if not hasattr(self.cipher, "encrypt"):  # if key has not function 'encrypt'
                 raise AttributeError("The key has no encrypt methode")
+            data = timed(self.metrics.encrypt if self.metrics is not None else None, self.cipher.encrypt, data)
+        return data
 
-        data_length = len(data)
-        sended_length = 0
-        while sended_length < data_length:
-            sent = self.socket.send(data[sended_length:])
-            if sent == 0:
-                raise ConnectionError("socket connection error")
-            sended_length += sent
+    def _frame(self, data, kind: int = FRAME_DATA) -> list:
+        return frame_buffers(data, kind) if self.framed else [as_buffer(data)]
 
     def close(self) -> None:
         """
         closes the socket
         """
-        self.socket.shutdown(socket.SHUT_RDWR)
+        if self.engine is not None:
+            self.engine.close_client(self)
+            return
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:  # the connection is already closed
+            pass
         self.socket.close()
 
     def _add_thread(self, thread: threading.Thread):
-        return Server_Client(self.socket, self.address, self.key, self.cipher, thread, self.recv_buffer)
+        object.__setattr__(self, "thread", thread)  # the thread gets this object, so it can't be replaced
+        return self
 
     def _add_cipher(self, key, cipher):
-        return Server_Client(self.socket, self.address, key, self.thread, cipher, self.recv_buffer)
+        return replace(self, key=key, cipher=cipher)
 
 
 @dataclass(frozen=True)
@@ -106,10 +275,32 @@ class Socket_Response:
     """
     This class contains information's about a response from a socket. It contains the response itself, a datetime
     object and optionally a Server_Client in the from_ variable, if it was received by a Server,default None.
+    If the receiver has a Codec, `obj` decodes the response on the first access.
     """
     response: Union[bytes, Tuple[bytes]]
     time_: datetime
     from_: Server_Client = None
+    codec: Optional[Codec] = field(default=None, repr=False, compare=False)
+    _trace: Optional[Trace] = field(default=None, repr=False, compare=False)  # set if the message is traced
+
+    @property
+    def obj(self) -> Any:
+        """
+        the decoded object, it's decoded on the first access
+
+        Raises:
+            SetupError: if the receiver has no Codec
+            CodecError: if the response couldn't be decoded
+        """
+        try:
+            return self.__dict__["_obj"]
+        except KeyError:
+            pass
+        if self.codec is None:
+            raise SetupError("the receiver has no codec")
+        obj = self.codec.decode(self.response)
+        object.__setattr__(self, "_obj", obj)
+        return obj
 
     def __str__(self):
         return "".join(["Socket_Response(response=", str(self.response), ", time=", str(self.time_)])
@@ -141,9 +332,28 @@ class Socket_Response:
         else:
             raise TypeError("information should be a Socket_Response, bytes or tuple object")
 
+def _response_data(data: Union[bytes, Socket_Response]):
+    if isinstance(data, Socket_Response):
+        if isinstance(data.response, tuple):
+            return b''.join(data.response)
+        elif isinstance(data.response, bytes):
+            return data.response
+        elif isinstance(data.response, str):
+            return data.response.encode()
+        raise TypeError(f"type {type(data.response)} of the data.response isn't supported")
+    return data
+
+
+def _address(client) -> tuple:
+    return client if isinstance(client, tuple) else client.address
+
+
 def _time() -> datetime:
     return datetime.now()
 
+
+_PING = struct.Struct("!I")  # payload of a ping: its correlation id
+
 class TCPClient:
     """
     This class contains functions for connecting and keeping connections alive
@@ -160,7 +370,8 @@ class TCPClient:
         self.event.connected (bool): Is True if the Client connected
         self.event.exception.occurred (bool): Is True if an exception got caught
         self.event.exception.list (list): contains all caught exceptions
-        self.recved_data (list): contains all received data
+        self.recved_data (list): a read-only copy of the received data, which wasn't returned yet
+        self.inbox (Inbox): the bounded queue which collects the received data
 
     """
 
@@ -169,6 +380,7 @@ class TCPClient:
     EVENT_TIMEOUT = Event("--TIMEOUT--")
     EVENT_DISCONNECT = Event("--DISCONNECT--")
     EVENT_CONNECTED = Event("--CONNECTED--")
+    EVENT_HIGH_WATER = Event("--HIGH_WATER--")
 
     def __init__(self):
 
@@ -190,7 +402,27 @@ class TCPClient:
             return Events()
 
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.recved_data = []
+        self.inbox = Inbox()
+        self.inbox.on_high_water = self._high_water
+        self.codec: Optional[Codec] = None
+        self.compression: Optional[CompressionContext] = None
+        self._compression: Optional[Compression] = None
+        self._early_frames = deque()  # frames which were received while the compression was negotiated
+        self._requests = rpc.PendingRequests()
+        self.reconnects = 0
+        self._reconnect: Optional[Reconnect] = None
+        self._replay: Optional[ReplayBuffer] = None
+        self._state = threading.Condition()  # guards the following variables of the automatic reconnect
+        self._lost = False  # is True while the connection is restored
+        self._closed = False
+        self._generation = 0  # is increased by `close()`, which stops restoring the connection
+        self._connections = 0  # is increased by every connect
+        self.metrics: Optional[ConnectionMetrics] = None
+        self._exporter: Optional[MetricsExporter] = None
+        self.tracer: Optional[Tracer] = None
+        self.socket_options: Optional[SocketOptions] = None
+        self._max_frame_size = MAX_FRAME_SIZE
+        self._coalescer: Optional[Coalescer] = None
         self.__autorecv = False
         self.__autorecv_thread = threading.Thread(target=self.__reciving_automatic, daemon=True)
 
@@ -203,6 +435,9 @@ class TCPClient:
         self._target_ip = None
         self._target_port = None
         self._recv_buffer = None
+        self._framed = True
+        self._reader = None
+        self._send_lock = threading.RLock()
 
         self.__start_taregt = None
 
@@ -245,16 +480,13 @@ class TCPClient:
             returns event and its value(s)
         """
         if disable_on_functions:
-            for ev in self._event_system:
-                if ev.name == self.EVENT_CONNECTED.name or ev.name == self.EVENT_DISCONNECT.name:
-                    self._event_system.remove(ev)
+            self._event_system.clear_name(self.EVENT_CONNECTED.name)
+            self._event_system.clear_name(self.EVENT_DISCONNECT.name)
 
-        ev_ = self._event_system.await_event(timeout if timeout != 0 else None)
-        if ev_ is False:
+        ev: Event = self._event_system.next_event(timeout if timeout != 0 else None)
+        if ev is None:
             return self.EVENT_TIMEOUT.copy(), None
 
-        ev: Event = self._event_system.first_event()
-
         if ev == self.EVENT_RECEIVED:
             return ev, self.return_recved_data(True)
         elif ev == self.EVENT_EXCEPTION:
@@ -263,6 +495,8 @@ class TCPClient:
             return ev, None
         elif ev == self.EVENT_DISCONNECT:
             return ev, None
+        elif ev == self.EVENT_HIGH_WATER:
+            return ev, None
 
         """
             if disable_on_functions:
@@ -294,7 +528,11 @@ class TCPClient:
 
     def setup(self, target_ip: str, target_port: Optional[int] = 25567, recv_buffer: Optional[int] = 2048,
               on_connect: Optional[Callable] = None, on_disconnect: Optional[Callable] = None,
-              on_receive: Optional[Callable] = None):
+              on_receive: Optional[Callable] = None, framed: Optional[bool] = True, inbox: Optional[Inbox] = None,
+              compression: Optional[Compression] = None, codec: Optional[Codec] = None,
+              reconnect: Optional[Reconnect] = None, metrics: Optional[bool] = False,
+              tracer: Optional[Tracer] = None, socket_options: Union[SocketOptions, str, None] = None,
+              coalesce: Optional[Coalesce] = None, max_frame_size: int = MAX_FRAME_SIZE):
         """
         function sets up the Client
 
@@ -305,14 +543,53 @@ class TCPClient:
             on_connect: Function that will be executed on connection, it takes not arguments
             on_disconnect: Function that will be executed on disconnection, it takes no arguments
             on_receive: Function that will be executed on receive, it takes the received data as an argument
+            framed: If True, every message is prefixed with its length. Set it to False to talk to Servers using the
+                old unframed protocol
+            inbox: the Inbox which collects the received data, the default one is unbounded
+            compression: compression settings which are offered to the Server when connecting, requires framed to be
+                True. `self.compression` contains the statistics of the connection, it's None if the Server declined
+            codec: the Codec for `send_object()` and `Socket_Response.obj`
+            reconnect: settings of the automatic reconnect. If the connection is lost, the Client reconnects in the
+                background, meanwhile `send_data()` buffers the messages and the auto-receiving thread waits
+            metrics: if the Client should count bytes, messages and syscalls and measure the encryption and
+                on_receive times, see `stats()`
+            tracer: a Tracer which records the stages of sampled messages in the receive and send pipelines
+            socket_options: SocketOptions or the name of a preset like "low-latency" or "bulk-throughput", the buffer
+                sizes are set before connecting, the other options after it. None keeps the defaults of the operating
+                system
+            coalesce: settings of the write coalescing, messages and requests are then collected and written together
+                with one syscall, see `flush()` and `batch()`. It requires framed to be True
+            max_frame_size: maximal length of a received frame in bytes, a bigger frame is a protocol error and
+                closes the connection
+
+        Raises:
+            ValueError: if the preset is unknown or max_frame_size isn't positive
         """
+        if max_frame_size < 1:
+            raise ValueError("max_frame_size must be positive")
 
         self._target_ip = target_ip
         self._target_port = target_port
         self._recv_buffer = recv_buffer
+        self._framed = framed
+        self._compression = compression if framed else None
+        self.codec = codec
+        self._reconnect = reconnect
+        self._replay = reconnect.buffer() if reconnect is not None else None
+        self.metrics = ConnectionMetrics() if metrics else None
+        self.tracer = tracer
+        self.socket_options = SocketOptions.resolve(socket_options)
+        self._max_frame_size = max_frame_size
+        if self._coalescer is not None:
+            self._coalescer.close()
+        self._coalescer = coalesce.writer(self._write_coalesced, self._send_lock) \
+            if coalesce is not None and framed else None
         self.on_connect = on_connect
         self.on_disconnect = on_disconnect
         self.on_receive = on_receive
+        if inbox is not None:
+            self.inbox = inbox
+            inbox.on_high_water = self._high_water
 
         self._setup_flag = True
 
@@ -323,6 +600,10 @@ class TCPClient:
         Returns:
             returns a bool if the connecting was successful
         """
+        if self._coalescer is not None:  # the buffered frames belong to the old connection
+            unsent = self._coalescer.clear()
+            if self._replay is not None:
+                self._replay.requeue(unsent)
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.event.connected = False
         self.event.disconnected = False
@@ -338,7 +619,7 @@ class TCPClient:
         if self._setup_flag is False:
             raise SetupError("Server isn't setup")
         try:
-            self.socket.connect((self._target_ip, self._target_port))
+            self._connect_socket()
 
             self.event.is_connected = True
             self.event.connected = True
@@ -346,6 +627,8 @@ class TCPClient:
 
             self._event_system.happened(self.EVENT_CONNECTED.copy())
 
+            self._negotiate_compression()
+
             if callable(self.on_connect):
                 self.on_connect()
             return True
@@ -358,60 +641,393 @@ class TCPClient:
             self._event_system.happened(self.EVENT_EXCEPTION.copy())
             return False
 
+    @property
+    def buffered(self) -> int:
+        """the amount of messages, which wait for the automatic reconnect"""
+        return len(self._replay) if self._replay is not None else 0
+
+    def _connection_lost(self, connection: Optional[int] = None) -> bool:
+        """
+        starts restoring the connection in the background, if the Client has reconnect settings
+
+        Args:
+            connection: the number of the lost connection, if it's an old one, the connection was restored already
+
+        Returns:
+            returns False if the connection won't be restored
+        """
+        if self._reconnect is None:
+            return False
+        with self._send_lock, self._state:
+            if self._closed:
+                return False
+            if not self._lost and (connection is None or connection == self._connections):
+                self._lost = True
+                if self._coalescer is not None:  # the buffered frames are send again on the new connection
+                    self._replay.requeue(self._coalescer.clear())
+                threading.Thread(target=self._restore, args=(self._generation,), daemon=True).start()
+        return True
+
+    def _restore(self, generation: int):
+        attempt = 0
+        while True:
+            with self._state:
+                if generation != self._generation:
+                    return
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            if self.reconnect():
+                with self._send_lock:  # new messages are buffered till the old ones are send
+                    messages = self._replay.drain()
+                    for index, message in enumerate(messages):
+                        if not self._send_message(message):
+                            self._replay.requeue(messages[index:])
+                            break
+                    else:
+                        with self._state:
+                            stale = generation != self._generation
+                            if not stale:
+                                self.reconnects += 1
+                                self._lost = False
+                                self._state.notify_all()
+                        if stale:  # the Client was closed while connecting
+                            self.close()
+                        return
+            attempt += 1
+            with self._state:
+                if self._reconnect.max_attempts is not None and attempt >= self._reconnect.max_attempts:
+                    if generation == self._generation:  # gives up
+                        self.event.is_connected = False
+                        self._lost = False
+                        self._state.notify_all()
+                    return
+                self._state.wait(self._reconnect.delay(attempt))  # `close()` wakes it up
+
+    def _wait_restored(self) -> bool:
+        """
+        waits till the connection is restored or the Client gave up
+
+        Returns:
+            returns True if the Client is connected again
+        """
+        with self._state:
+            while self._lost:
+                self._state.wait()
+            return not self._closed and self.event.is_connected
+
+    def _connect_socket(self):
+        with self._state:
+            self._closed = False
+            self._connections += 1
+        self.inbox.reopen()
+        if self.socket_options is not None:  # the buffer sizes have to be set before connecting
+            self.socket_options.apply(self.socket, connected=False)
+        self.socket.connect((self._target_ip, self._target_port))
+        if self.socket_options is not None:
+            self.socket_options.apply(self.socket, connected=True)
+        self._reader = FrameReader(self.socket, self._recv_buffer, self._max_frame_size) if self._framed else None
+        if self._reader is not None:
+            self._reader.metrics = self.metrics
+            self._reader.tracer = self.tracer
+            self._reader.peer = (self._target_ip, self._target_port)
+        self._early_frames.clear()
+        self.compression = None
+
+    def _negotiate_compression(self):
+        if self._compression is None:
+            return
+        self._send(self._compression.offer(), FRAME_COMPRESS)
+        kind, payload = self._reader.read()
+        while kind != FRAME_COMPRESS:  # the Server can send messages before it handles the offer
+            self._early_frames.append((kind, bytes(payload)))
+            kind, payload = self._reader.read()
+        if self._compression.accepts(payload):
+            self.compression = self._compression.context(self._max_frame_size)
+
     def send_data(self, data: bytes) -> bool:
         """
         tries to send data to the Server, returns True if it was succesful
 
         Args:
-            data: data that should be send
+            data: data that should be send, any object supporting the buffer protocol
 
         Returns:
-            returns True if the sending was successful
+            returns True if the sending was successful. With reconnect settings it also returns True if the message
+            was buffered, and False if the buffer is full
         """
-        data_length = len(data)
-        sended_length = 0
-        while sended_length < data_length:
-            sent = self.socket.send(data[sended_length:])
-            if sent == 0:
-                self.event.exception.exceptions.add(ConnectionError("socket connection error"))
-                self.event.exception.occurred = True
-                self._event_system.happened(self.EVENT_EXCEPTION.copy())
+        with self._send_lock:  # the messages have to be compressed (and encrypted) in the order they are send
+            if self._lost:
+                return self._replay.put(data)
+            if self._send_message(data):
+                return True
+            if not self._connection_lost():
                 return False
-            sended_length += sent
+            return self._replay.put(data)
+
+    def _send_message(self, data) -> bool:
+        # the caller has to hold the send lock
+        trace = self.tracer.sample(SEND, (self._target_ip, self._target_port)) if self.tracer is not None else None
+        message = data if self._replay is not None else None  # a coalesced message is replayed if it isn't written
+        kind, data = self._compress(data)
+        if trace is not None and self.compression is not None:
+            trace.lap("compress")
+        data = self._seal(data)
+        if trace is not None and self._encrypted:
+            trace.lap("encrypt")
+        if not self._send(data, kind, coalesce=True, message=message):
+            return False
+        if trace is not None:
+            trace.lap("send")
+        if self.metrics is not None:
+            self.metrics.messages_out += 1
         return True
 
-    def return_recved_data(self, clear_event: bool = True) -> List[Socket_Response]:
+    def send_object(self, obj) -> bool:
+        """
+        encodes the object with the Codec and sends it to the Server
+
+        Args:
+            obj: an object of a type which is registered at the Codec
+
+        Returns:
+            returns True if the sending was successful
+
+        Raises:
+            SetupError: if the Client has no Codec
+            CodecError: if the object couldn't be encoded
+        """
+        if self.codec is None:
+            raise SetupError("the Client has no codec")
+        return self.send_data(self.codec.encode(obj))
+
+    def request(self, data: bytes, timeout: Optional[float] = None, method: str = "") -> Future:
+        """
+        sends a request to the Server and returns a Future of the reply. Replies are received by the auto-receiving
+        thread, which is started if it isn't running, so several requests can wait for their replies at once
+
+        Args:
+            data: data of the request, any object supporting the buffer protocol
+            timeout: time in seconds after which the Future fails with a TimeoutError, None waits forever
+            method: name of the handler at the Server
+
+        Returns:
+            returns a Future, its result is a Socket_Response. It fails with a RemoteError if the handler raised an
+            exception, with a TimeoutError if the reply didn't arrive in time or with a ConnectionError if the connection
+            was lost
+
+        Raises:
+            SetupError: if the connection isn't framed
+        """
+        if not self._framed:
+            raise SetupError("requests need a framed connection")
+        if self.__autorecv is False:
+            self.autorecv()
+
+        request_id, future = self._requests.add(timeout)
+        with self._send_lock:
+            sent = False
+            if not self._lost:  # requests aren't buffered, their Future fails instead
+                kind, data = self._compress(data)
+                flags = rpc.COMPRESSED if kind == FRAME_COMPRESSED else 0
+                payload = rpc.pack(request_id, flags, method.encode(), data)
+                sent = self._send(self._seal(payload), FRAME_REQUEST, coalesce=True)
+        if not sent:
+            self._requests.resolve(request_id, exception=ConnectionError("the request couldn't be send"))
+        elif self.metrics is not None:
+            self.metrics.messages_out += 1
+        return future
+
+    @property
+    def in_flight(self) -> int:
+        """the amount of requests and pings which wait for their reply"""
+        return len(self._requests)
+
+    def ping(self, timeout: Optional[float] = None) -> float:
+        """
+        sends a ping to the Server and waits for its answer. Like `request()`, it starts the auto-receiving thread
+
+        Args:
+            timeout: how long it should wait for the answer in seconds, None waits forever
+
+        Returns:
+            returns the round trip time in seconds
+
+        Raises:
+            SetupError: if the connection isn't framed
+            TimeoutError: if the answer didn't arrive in time
+            ConnectionError: if the ping couldn't be send or the connection was lost
+        """
+        if not self._framed:
+            raise SetupError("pings need a framed connection")
+        if self.__autorecv is False:
+            self.autorecv()
+
+        request_id, future = self._requests.add(timeout)
+        start = time.perf_counter()
+        with self._send_lock:
+            sent = not self._lost and self._send(_PING.pack(request_id), FRAME_PING)
+        if not sent:
+            self._requests.resolve(request_id, exception=ConnectionError("the ping couldn't be send"))
+        return future.result() - start
+
+    def _pong(self, payload):
+        self._requests.resolve(_PING.unpack(payload)[0], time.perf_counter())
+
+    def _reply(self, payload):
+        request_id, flags, _, body = rpc.unpack(self._open(payload))
+        if self.metrics is not None:
+            self.metrics.messages_in += 1
+        if flags & rpc.ERROR:
+            self._requests.resolve(request_id, exception=RemoteError(bytes(body).decode(errors="replace")))
+            return
+        if flags & rpc.COMPRESSED:
+            body = self._decompress(FRAME_COMPRESSED, body)
+        self._requests.resolve(request_id, Socket_Response(bytes(body), _time(), codec=self.codec))
+
+    _encrypted = False  # if `_seal()` and `_open()` encrypt and decrypt
+
+    def _seal(self, data):
+        return data
+
+    def _open(self, data):
+        return data
+
+    def _compress(self, data) -> tuple:
+        if self.compression is None:
+            return FRAME_DATA, data
+        return self.compression.compress(data)
+
+    def _send(self, data: bytes, kind: int = FRAME_DATA, coalesce: bool = False, message=None) -> bool:
+        # only the sealed frames are coalesced, the handshake and control frames are written right away
+        buffers = frame_buffers(data, kind) if self._framed else [as_buffer(data)]
+        if coalesce and self._coalescer is not None:
+            return self._coalescer.add(buffers, message)
+        return self._write(deque(buffers))
+
+    def _write(self, buffers: deque) -> bool:
+        try:
+            with self._send_lock:
+                send_buffers(self.socket, buffers, metrics=self.metrics)
+        except ConnectionError as e:
+            self.event.exception.exceptions.add(e)
+            self.event.exception.occurred = True
+            self._event_system.happened(self.EVENT_EXCEPTION.copy())
+            return False
+        return True
+
+    def _write_coalesced(self, buffers: deque) -> bool:
+        # the Coalescer also writes from its own thread, so the connection loss is handled here
+        if self._write(buffers):
+            return True
+        self._connection_lost()
+        return False
+
+    def flush(self) -> bool:
+        """
+        writes the messages, which the write coalescing buffered, right away
+
+        Returns:
+            returns False if the writing failed
+        """
+        if self._coalescer is None:
+            return True
+        return self._coalescer.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        collects the messages and requests, which are send in the with block, and writes them with one syscall at its
+        end, or earlier if they exceed max_bytes of the Coalesce settings (64KB by default). It works without Coalesce
+        settings too. Messages of other threads are collected as well
+
+            with Client.batch():
+                for message in messages:
+                    Client.send_data(message)
+
+        Raises:
+            SetupError: if the connection isn't framed
+        """
+        if not self._framed:
+            raise SetupError("batches need a framed connection")
+        with self._send_lock:
+            if self._coalescer is None:
+                self._coalescer = Coalescer(self._write_coalesced, self._send_lock)
+            self._coalescer.cork()
+        try:
+            yield self
+        finally:
+            self._coalescer.uncork()
+
+    @property
+    def recved_data(self) -> List[Socket_Response]:
+        """a list of the received data, which wasn't returned yet"""
+        return self.inbox.items()
+
+    def return_recved_data(self, clear_event: bool = True, max_items: Optional[int] = None) -> List[Socket_Response]:
         """
         returns received data
 
+        Args:
+            clear_event: if the EVENT_RECEIVED events should be removed
+            max_items: maximal amount of returned data, None returns everything
+
         Returns:
             returns a list of the received data
         """
-        self.event.new_data = False
         if clear_event:
             self._event_system.clear_name(self.EVENT_RECEIVED.name)
-        data = self.recved_data.copy()
-        self.recved_data = []
+        data = self.inbox.drain(max_items)
+        self.event.new_data = bool(self.inbox)
+        if clear_event and self.event.new_data:
+            self._event_system.happened(self.EVENT_RECEIVED.copy())
         return data
 
+    def _high_water(self):
+        self._event_system.happened(self.EVENT_HIGH_WATER.copy())
+
     def __reciving_automatic(self):
         while self.__autorecv:
+            connection = self._connections
             try:
                 recved = self.recv_data()
 
                 if len(recved) > 0:
                     if callable(self.on_receive):
-                        self.on_receive(recved)
-
-                    self.recved_data.append(recved)
-                    self.event.new_data = True
-                    self._event_system.happened(self.EVENT_RECEIVED.copy())
+                        timed(self.metrics.handler if self.metrics is not None else None, self.on_receive, recved)
+                        if recved._trace is not None:
+                            recved._trace.lap("on_receive")
+
+                    if self.inbox.put(recved):
+                        if recved._trace is not None:
+                            recved._trace.lap("inbox")
+                        self.event.new_data = True
+                        self._event_system.happened(self.EVENT_RECEIVED.copy())
+                        if recved._trace is not None:
+                            recved._trace.lap("event")
+                    elif self.inbox.policy == Inbox.DISCONNECT:
+                        self.__autorecv = False
+                        self.event.disconnected = True
+                        self.event.is_connected = False
+                        self.close()
+                        self._event_system.happened(self.EVENT_DISCONNECT.copy())
+                        if callable(self.on_disconnect):
+                            self.on_disconnect()
 
             except KeyboardInterrupt:
                 self.close()
                 raise
 
             except Exception as e:
+                if isinstance(e, OSError) and connection != self._connections:  # the old socket of a reconnect
+                    continue
+                if isinstance(e, ProtocolError):  # the stream can't be read any further
+                    try:
+                        self.socket.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                self._requests.fail_all(ConnectionError("the connection was lost"))
                 self.event.exception.exceptions.add(e, traceback.format_exc())
                 self.event.exception.occurred = True
                 self.event.disconnected = True
@@ -423,6 +1039,14 @@ class TCPClient:
                 if callable(self.on_disconnect):
                     self.on_disconnect()
 
+                if isinstance(e, OSError):  # the connection is lost
+                    if self._connection_lost(connection) and self._wait_restored():
+                        continue
+                    # the thread can be started again after reconnecting
+                    self.__autorecv = False
+                    self.__autorecv_thread = threading.Thread(target=self.__reciving_automatic, daemon=True)
+                    return
+
     def autorecv(self) -> bool:
         """
         function which activates the auto-receiving thread, automatically saving all incoming data
@@ -451,15 +1075,52 @@ class TCPClient:
 
         Returns:
             returns received data as bytes
+
+        Raises:
+            ConnectionClosed: if the connection is framed and the Server closed it
         """
-        chunks = []
-        recv_data = True
-        while recv_data:
-            chunk = self.socket.recv(self._recv_buffer)
-            chunks.append(chunk)
-            if len(chunk) < self._recv_buffer:
-                recv_data = False
-        return Socket_Response(b''.join(chunks), _time())
+        data, trace = self._recv()
+        return Socket_Response(bytes(data), _time(), codec=self.codec, _trace=trace)
+
+    def _recv(self) -> Tuple[Union[bytes, memoryview], Optional[Trace]]:
+        kind, data = self._recv_frame()
+        if self.metrics is not None:
+            self.metrics.messages_in += 1
+        trace = self._reader.trace if self._reader is not None else None
+        data = self._decompress(kind, data)
+        if trace is not None and kind == FRAME_COMPRESSED:
+            trace.lap("decompress")
+        return data, trace
+
+    def _recv_frame(self) -> Tuple[int, Union[bytes, memoryview]]:
+        while True:
+            if self._early_frames:
+                kind, data = self._early_frames.popleft()
+            elif self._framed:
+                kind, data = self._reader.read()
+            else:
+                data = recv_unframed(self.socket, self._recv_buffer)
+                if self.metrics is not None:
+                    self.metrics.recv_calls += len(data) // self._recv_buffer + 1
+                    self.metrics.bytes_in += len(data)
+                return FRAME_DATA, data
+            if kind == FRAME_REPLY:
+                self._reply(data)
+            elif kind == FRAME_PONG:
+                self._pong(data)
+            elif kind == FRAME_PING:  # a heartbeat of the Server
+                self._send(bytes(data), FRAME_PONG)
+            else:
+                return kind, data
+
+    def _decompress(self, kind: int, data) -> Union[bytes, memoryview]:
+        if kind == FRAME_COMPRESSED:
+            if self.compression is None:
+                raise ValueError("received a compressed message without negotiated compression")
+            return self.compression.decompress(data)
+        if self.compression is not None:
+            self.compression.received(len(data))
+        return data
 
     def return_exceptions(self, delete: Optional[bool] = True, reset_exceptions: Optional[bool] = True) -> dict:
         """
@@ -478,16 +1139,67 @@ class TCPClient:
             self.event.exception.exceptions.clear()
         if reset_exceptions:
             self.event.exception.occurred = False
-            for ev in self._event_system:
-                if ev.name == self.EVENT_EXCEPTION.name:
-                    self._event_system.remove(ev)
+            self._event_system.clear_name(self.EVENT_EXCEPTION.name)
         return exceptions
 
+    def stats(self) -> dict:
+        """
+        returns a snapshot of the metrics of the connection, the size of the inbox and the state of the requests and
+        the automatic reconnect. The histograms contain the count, average, 50th, 90th, 99th percentile and maximum in
+        milliseconds
+
+        Returns:
+            returns the snapshot as dict
+
+        Raises:
+            SetupError: if the Client was setup without metrics
+        """
+        if self.metrics is None:
+            raise SetupError("the Client was setup without metrics")
+        return {"total": self.metrics.snapshot(), "inbox_messages": len(self.inbox), "inbox_bytes": self.inbox.nbytes,
+                "in_flight": self.in_flight, "buffered": self.buffered, "reconnects": self.reconnects}
+
+    def serve_metrics(self, ip: str = "127.0.0.1", port: int = 9100) -> MetricsExporter:
+        """
+        serves `stats()` in the Prometheus text format on `http://ip:port/metrics`, until the Client is closed
+
+        Args:
+            ip: IP the exporter listens on
+            port: port of the exporter, 0 chooses a free one
+
+        Returns:
+            returns the MetricsExporter, its address is `MetricsExporter.address`
+
+        Raises:
+            SetupError: if the Client was setup without metrics
+        """
+        if self.metrics is None:
+            raise SetupError("the Client was setup without metrics")
+        if self._exporter is not None:
+            self._exporter.close()
+        self._exporter = MetricsExporter(self.stats, ip, port)
+        return self._exporter
+
     def close(self):
         """
         Closes the socket
         """
-        self.socket.shutdown(socket.SHUT_RDWR)
+        if self._exporter is not None:
+            self._exporter.close()
+            self._exporter = None
+        if self._coalescer is not None:
+            self._coalescer.close()
+        with self._state:
+            self._closed = True
+            self._lost = False
+            self._generation += 1
+            self._state.notify_all()
+        self._requests.fail_all(ConnectionError("the Client was closed"))
+        self.inbox.close()
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:  # the connection is already closed
+            pass
         self.socket.close()
 
 
@@ -499,10 +1211,13 @@ class TCPServer:
             self.EVENT_EXCEPTION (str): Returned by `await_event()` if an exception occurred
             self.EVENT_RECEIVED (str): Returned by `await_event()` if the client received data
             self.EVENT_TIMEOUT (str): Returned by `await_event()` if the function timed out
+            self.EVENT_HIGH_WATER (str): Returned by `await_event()` if the inbox reached its high water mark
+            self.EVENT_IDLE (str): Returned by `await_event()` if an idle client was disconnected
             self.event.new_data (bool): Is True if the Client received new data
             self.event.exception.occurred (bool): Is True if an exception got caught
             self.event.exception.list (list): contains all caught exceptions
-            self.recved_data (list): contains all received data
+            self.recved_data (list): a read-only copy of the received data, which wasn't returned yet
+            self.inbox (Inbox): the bounded queue which collects the received data
             self.socket (socket.socket): is the Server Socket
             self.clients (dict): contains the address as the key and the client thread and socket as a list as the values
 
@@ -511,6 +1226,8 @@ class TCPServer:
     EVENT_EXCEPTION = Event("--EXCEPTION--")
     EVENT_RECEIVED = Event("--RECEIVED--")
     EVENT_TIMEOUT = Event("--TIMEOUT--")
+    EVENT_HIGH_WATER = Event("--HIGH_WATER--")
+    EVENT_IDLE = Event("--IDLE--")
 
     def __init__(self, max_connections: Optional[int] = None):
         """
@@ -542,10 +1259,32 @@ class TCPServer:
         self.socket: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.clients = {}  # key: address, value : [client_thread,client_socket] / key: address, value: Server_Client
         self._recv_buffer = 2048
+        self._framed = True
+        self._engine = None
+        self._dispatcher: Optional[Dispatcher] = None
+        self._handlers: Dict[str, Callable] = {}
+        self._broadcaster: Optional[Broadcaster] = None
+        self._handshake_pool: Optional[HandshakePool] = None
+        self._own_socket = True  # False if the listening socket was passed to `setup()`, it may be shared
+        self._compression: Optional[Compression] = None
+        self.codec: Optional[Codec] = None
+        self._heartbeat: Optional[float] = None
+        self._idle_timeout: Optional[float] = None
+        self._idle_timeouts = {}  # key: address, value: idle timeout of the connection
+        self._timers: Optional[TimerWheel] = None
+        self._timers_stop = threading.Event()
+        self.metrics: Optional[Metrics] = None
+        self._exporter: Optional[MetricsExporter] = None
+        self.tracer: Optional[Tracer] = None
+        self.socket_options: Optional[SocketOptions] = None
+        self._max_frame_size = MAX_FRAME_SIZE
+        self.groups = {}  # key: group name, value: set of addresses
+        self._groups_lock = threading.Lock()
 
         self.__accepting_thread = threading.Thread(target=self._accept_clients, daemon=True)
 
-        self.recved_data = [] #Tuple: (client_socket, address, data)
+        self.inbox = Inbox()
+        self.inbox.on_high_water = self._high_water
 
         self.event = get_event()
         self._event_system = Event_System()
@@ -580,8 +1319,11 @@ class TCPServer:
         self.close()
 
     def _perfom_disconnect(self, address: tuple):
-        self.clients.pop(address)
-        self._allthreads.pop(address)
+        if self.clients.pop(address, None) is None:  # already disconnected by `disconnect()`
+            return
+        self._untrack(address)
+        self._allthreads.pop(address, None)
+        self._leave_groups(address)
 
         if callable(self.on_disconnect):
             self.on_disconnect(address)
@@ -593,7 +1335,13 @@ class TCPServer:
     def setup(self, ip: Optional[str] = "127.0.0.1", port: Optional[int] = 25567, listen: Optional[int] = 5,
               recv_buffer: Optional[int] = 2048, handle_client: Optional[Callable] = None,
               on_connect: Optional[Callable] = None, on_disconnect: Optional[Callable] = None,
-              on_receive: Optional[Callable] = None):
+              on_receive: Optional[Callable] = None, framed: Optional[bool] = True,
+              engine: Optional[str] = "threaded", dispatcher: Optional[Dispatcher] = None,
+              reuse_port: Optional[bool] = False, sock: Optional[socket.socket] = None, inbox: Optional[Inbox] = None,
+              compression: Optional[Compression] = None, codec: Optional[Codec] = None,
+              heartbeat: Optional[float] = None, idle_timeout: Optional[float] = None,
+              metrics: Optional[bool] = False, tracer: Optional[Tracer] = None,
+              socket_options: Union[SocketOptions, str, None] = None, max_frame_size: int = MAX_FRAME_SIZE):
         """
         function prepares the Server
 
@@ -607,14 +1355,75 @@ class TCPServer:
             on_disconnect: function that will be executed on disconnection, it takes the address(tuple) as an argument
             on_receive: function that will be executed on receive, it takes the clientsocket, address, received data as
                 an argument
+            framed: if True, every message is prefixed with its length. Set it to False to talk to Clients using the
+                old unframed protocol
+            engine: "threaded" starts a thread for every Client, "selector" handles all Clients on one thread with
+                `selectors.DefaultSelector`. The selector engine requires framed to be True
+            dispatcher: a Dispatcher which executes on_receive on its workers instead of the receiving thread.
+                Exceptions raised by on_receive are then collected without disconnecting the client
+            reuse_port: if the socket should be bound with SO_REUSEPORT, so several processes can listen on the same
+                address
+            sock: an already bound and listening socket which should be used instead of binding a new one
+            inbox: the Inbox which collects the received data, the default one is unbounded
+            compression: compression settings, Clients offering the same settings get their messages compressed.
+                `Server_Client.compression` contains the statistics of a connection
+            codec: the Codec for `Server_Client.send_object()` and `Socket_Response.obj`
+            heartbeat: seconds of silence after which a Client gets a heartbeat frame, which it answers when it
+                receives. Requires framed to be True
+            idle_timeout: seconds of silence after which a Client is disconnected and `EVENT_IDLE` happens, so dead
+                connections don't pile up. It should be a multiple of heartbeat, `set_idle_timeout()` changes it for
+                one Client
+            metrics: if the Server should count bytes, messages and syscalls and measure the encryption and handler
+                times of every connection, see `stats()`
+            tracer: a Tracer which records the stages of sampled messages in the receive and send pipelines
+            socket_options: SocketOptions or the name of a preset like "low-latency" or "bulk-throughput", they are
+                set on the listening socket and on every accepted socket. None keeps the defaults of the operating
+                system
+            max_frame_size: maximal length of a received frame in bytes. A Client sending a bigger frame is
+                disconnected before the payload is buffered, so a forged length can't exhaust the memory
+
+        Raises:
+            ValueError: if the engine or the preset is unknown, the selector engine is used without framing or
+                max_frame_size isn't positive
         """
+        if engine not in ("threaded", "selector"):
+            raise ValueError(f"unknown engine {engine!r}")
+        if max_frame_size < 1:
+            raise ValueError("max_frame_size must be positive")
+        if engine == "selector" and not framed:
+            raise ValueError("the selector engine requires framed=True")
+        self.socket_options = SocketOptions.resolve(socket_options)
+
         self.__PORT = port
         self.__IP = ip
 
-        self.socket.bind((ip, port))
-        self.socket.listen(listen)
+        if sock is not None:
+            self.socket.close()
+            self.socket = sock
+            self._own_socket = False
+            if self.socket_options is not None:  # the buffer sizes are still inherited by the accepted sockets
+                self.socket_options.apply(sock, listener=True)
+        else:
+            if self.socket_options is not None:
+                self.socket_options.apply(self.socket, listener=True)
+            if reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.socket.bind((ip, port))
+            self.socket.listen(listen)
 
         self._recv_buffer = recv_buffer
+        self._framed = framed
+        self._max_frame_size = max_frame_size
+        self._compression = compression
+        self.codec = codec
+        self._heartbeat = heartbeat if framed else None
+        self._idle_timeout = idle_timeout
+        self._dispatcher = dispatcher
+        self.metrics = Metrics() if metrics else None
+        self.tracer = tracer
+        if inbox is not None:
+            self.inbox = inbox
+            inbox.on_high_water = self._high_water
         self.on_connect = on_connect
         self.on_disconnect = on_disconnect
         self.on_receive = on_receive
@@ -624,10 +1433,103 @@ class TCPServer:
         else:
             self._start_target = self.__handle_client
 
+        if dispatcher is not None:
+            dispatcher.start(self._add_exception)
+
+        if self._heartbeat is not None or idle_timeout is not None:
+            intervals = [value for value in (self._heartbeat, idle_timeout) if value is not None]
+            self._timers = TimerWheel(tick=max(0.01, min(min(intervals) / 10, 1.0)))
+            threading.Thread(target=self._watch_timers, daemon=True).start()
+
+        if engine == "selector":
+            self._engine = SelectorEngine(self, max(recv_buffer, 65536))
+            self.__accepting_thread = threading.Thread(target=self._engine.run, daemon=True)
+
         self.__accepting_thread.start()  # starts the accepting thread while the while loop is still false
 
         self.__setup_flag = True
 
+    @classmethod
+    def launch(cls, workers: Optional[int] = None, max_connections: Optional[int] = None,
+               reuse_port: Optional[bool] = None, **setup_kwargs) -> ProcessGroup:
+        """
+        starts the Server in several processes, which accept connections on the same address
+
+        Args:
+            workers: amount of worker processes, defaults to the amount of cores
+            max_connections: max_connections of every worker
+            reuse_port: if the workers should bind with SO_REUSEPORT, defaults to True where it's available.
+                Otherwise the workers share one listening socket
+            **setup_kwargs: arguments for `setup()`
+
+        Returns:
+            returns the started ProcessGroup, which supervises the workers
+        """
+        group = ProcessGroup(cls, workers, max_connections, reuse_port, **setup_kwargs)
+        group.start()
+        return group
+
+    def register_handler(self, function: Optional[Callable] = None, method: str = ""):
+        """
+        registers the handler of requests, which are send with `Client.request()`. The handler takes the Server_Client
+        and the Socket_Response of the request and returns the reply, which can be bytes, a Socket_Response or an
+        object for the Codec. An exception raised by the handler is send back and raises a RemoteError at the Client.
+        Handlers are executed by the dispatcher if the Server has one, so replies can be send out of order.
+        Without a function it returns a decorator
+
+        Args:
+            function: the handler
+            method: the name of the method, which the handler handles
+
+        Returns:
+            returns the function
+        """
+        if function is None:
+            return lambda function_: self.register_handler(function_, method)
+        self._handlers[method] = function
+        return function
+
+    def _request(self, client: Server_Client, payload):
+        request_id, flags, method, body = rpc.unpack(client._open(payload))  # decrypted in the order of the nonces
+        if flags & rpc.COMPRESSED:
+            body = client._decode(body, True, FRAME_COMPRESSED).response  # counts the message
+        else:
+            body = bytes(body)
+            if client.metrics is not None:
+                client.metrics.messages_in += 1
+        handler = self._handlers.get(method)
+        if handler is None:
+            client._reply(request_id, f"unknown method {method!r}".encode(), error=True)
+            return
+        recved = Socket_Response(body, _time(), client, self.codec)
+        if self._dispatcher is None:
+            self._run_handler(handler, client, request_id, recved)
+        elif not self._dispatcher.submit(client.address, self._run_handler, handler, client, request_id, recved,
+                                         block=client.engine is None):
+            client._reply(request_id, b"the Server is busy", error=True)
+
+    def _run_handler(self, handler: Callable, client: Server_Client, request_id: int, recved: Socket_Response):
+        try:
+            reply = timed(client.metrics.handler if client.metrics is not None else None, handler, client, recved)
+            if reply is None:
+                reply = b''
+            elif isinstance(reply, Socket_Response):
+                reply = _response_data(reply)
+            elif not isinstance(reply, (bytes, bytearray, memoryview)):
+                if self.codec is None:
+                    raise SetupError("the Server has no codec")
+                reply = self.codec.encode(reply)
+        except Exception as e:
+            self._add_exception(e, traceback.format_exc())
+            reply = str(e).encode()
+            error = True
+        else:
+            error = False
+        try:
+            client._reply(request_id, reply, error)
+        except OSError as e:  # the client disconnected
+            self._add_exception(e, traceback.format_exc())
+
     # Sends bytes to a target
     def send_data(self, data: Union[bytes, Socket_Response], client: Server_Client) -> bool:
         """
@@ -644,15 +1546,7 @@ class TCPServer:
             TypeError: if data is a Socket_Response object and the type of data.response isn't bytes or tuple of bytes
                 or a string
         """
-        if isinstance(data, Socket_Response):
-            if isinstance(data.response, tuple):
-                data = b''.join(data.response)
-            elif isinstance(data.response, bytes):
-                data = data.response
-            elif isinstance(data.response, str):
-                data = data.response.encode()
-            else:
-                raise TypeError(f"type {type(data.response)} of the data.response isn't supported")
+        data = _response_data(data)
 
         try:
             client.send(data)
@@ -664,6 +1558,129 @@ class TCPServer:
             return False
         return True
 
+    def broadcast(self, data: Union[bytes, Socket_Response], clients: Union[str, Iterable, None] = None,
+                  slow: str = "skip", max_pending: int = 1048576) -> Dict[tuple, bool]:
+        """
+        sends data to several clients. The data is framed only once (encrypted clients still need their own frame) and
+        written without blocking, data which doesn't fit into the socket buffer of a client is queued and written in
+        the background. So a slow client doesn't stall the others
+
+        Args:
+            data: data which should be send, any object supporting the buffer protocol
+            clients: the name of a group, an iterable of Server_Clients or addresses, or None for every client
+            slow: what happens to clients which have more than max_pending bytes queued: "skip" doesn't send the
+                data to them, "drop" disconnects them
+            max_pending: the amount of queued bytes from which on a client is slow
+
+        Returns:
+            returns a dict with the address of every recipient as key and True as value if the data was send or
+            queued
+
+        Raises:
+            ValueError: if slow isn't "skip" or "drop"
+            TypeError: if data is a Socket_Response object and the type of data.response isn't supported
+            SetupError: if the threaded engine is used on a platform without MSG_DONTWAIT (Windows), use the selector
+                engine there
+        """
+        if slow not in ("skip", "drop"):
+            raise ValueError(f"unknown slow policy {slow!r}")
+        view = as_buffer(_response_data(data))
+        if not view.readonly:  # the payload is shared by the queues of the clients
+            view = as_buffer(bytes(view))
+
+        if clients is None:
+            recipients = list(self.clients.items())
+        elif isinstance(clients, str):
+            recipients = [(client.address, client) for client in self.group(clients)]
+        else:
+            recipients = [(address, self.clients.get(address)) for address in map(_address, clients)]
+
+        if self._engine is not None:
+            writer = self._engine
+        else:
+            if self._broadcaster is None:
+                self._broadcaster = Broadcaster()
+            writer = self._broadcaster
+
+        frames = {}  # key: framed, value: the shared frame
+        results = {}
+        for address, client in recipients:
+            if client is None:
+                results[address] = False
+                continue
+            if client.pending > max_pending:
+                results[address] = False
+                if slow == "drop":
+                    self.disconnect(address)
+                continue
+            try:
+                with client._send_lock:
+                    if client.compression is not None:  # every client has its own compression context
+                        kind, data = client._compress(view)
+                        buffers = client._frame(client._encode(data), kind)
+                    elif client.key is not None and client.cipher is not None:
+                        buffers = client._frame(client._encode(view))
+                    else:
+                        buffers = frames.get(client.framed)
+                        if buffers is None:
+                            buffers = frames[client.framed] = client._frame(view)
+                    writer.write(client, buffers)
+                if client.metrics is not None:
+                    client.metrics.messages_out += 1
+                results[address] = True
+            except Exception as e:
+                self._add_exception(e, traceback.format_exc())
+                results[address] = False
+        return results
+
+    def add_to_group(self, group: str, client: Union[Server_Client, tuple]) -> None:
+        """
+        adds a client to a group, which can be used for `broadcast()`. Clients leave their groups when they disconnect
+
+        Args:
+            group: name of the group
+            client: the client or its address
+        """
+        with self._groups_lock:
+            self.groups.setdefault(group, set()).add(_address(client))
+
+    def remove_from_group(self, group: str, client: Union[Server_Client, tuple]) -> None:
+        """
+        removes a client from a group
+
+        Args:
+            group: name of the group
+            client: the client or its address
+        """
+        with self._groups_lock:
+            members = self.groups.get(group)
+            if members is not None:
+                members.discard(_address(client))
+                if not members:
+                    del self.groups[group]
+
+    def group(self, group: str) -> List[Server_Client]:
+        """
+        returns the clients of a group
+
+        Args:
+            group: name of the group
+
+        Returns:
+            returns a list of the connected clients in the group
+        """
+        with self._groups_lock:
+            addresses = list(self.groups.get(group, ()))
+        clients = (self.clients.get(address) for address in addresses)
+        return [client for client in clients if client is not None]
+
+    def _leave_groups(self, address: tuple):
+        with self._groups_lock:
+            for group in [group for group, members in self.groups.items() if address in members]:
+                self.groups[group].discard(address)
+                if not self.groups[group]:
+                    del self.groups[group]
+
     # recv data from a target
     def recv_data(self, client: Server_Client) -> Socket_Response:
         """
@@ -674,75 +1691,240 @@ class TCPServer:
         """
         return client.recv()
 
+    @property
+    def recved_data(self) -> List[Socket_Response]:
+        """a list of the received data, which wasn't returned yet"""
+        return self.inbox.items()
+
     # returns all received data and clears self.recved_data and sets new_data_recved to False
-    def return_recved_data(self) -> List[Socket_Response]:
+    def return_recved_data(self, max_items: Optional[int] = None) -> List[Socket_Response]:
         """
         Returns received data. They are returned as Socket_Response objects
 
+        Args:
+            max_items: maximal amount of returned data, None returns everything
+
         Returns:
             returns a list of Socket_Response objects
         """
-        self.event.new_data = False
         self._event_system.clear_name(self.EVENT_RECEIVED.name)
-        data = self.recved_data.copy()
-        self.recved_data.clear()
+        data = self.inbox.drain(max_items)
+        self.event.new_data = bool(self.inbox)
+        if self.event.new_data:
+            self._event_system.happened(self.EVENT_RECEIVED.copy())
         return data
 
+    def _high_water(self):
+        self._event_system.happened(self.EVENT_HIGH_WATER.copy())
+
     # handles the connection
     def __handle_client(self, client: Server_Client):
         try:
             while True:
                 try:
                     recved = self.recv_data(client)
+                except ConnectionClosed:
+                    client.socket.close()
+                    self._perfom_disconnect(client.address)
+                    return None
                 except ConnectionResetError or BrokenPipeError:
                     return None
                 #recved = self.recv_data(client_socket)
-                if len(recved) > 0:
-                    self.event.new_data = True
-                    self._event_system.happened(self.EVENT_RECEIVED.copy())
-                    self.recved_data.append(recved)
-
-                    if callable(self.on_receive):
-                        self.on_receive(client, recved)
+                self._received(client, recved)
+                if client.address not in self.clients:  # disconnected by the inbox
+                    return None
 
         except KeyboardInterrupt:
             self.close()
             raise
 
         except Exception as e:
-            self.event.exception.exceptions.add(e, traceback.format_exc())
-            self.event.exception.occurred = True
-
-            self._event_system.happened(self.EVENT_EXCEPTION.copy())
+            self._add_exception(e, traceback.format_exc())
 
+            client.close()
             self._perfom_disconnect(client.address)
 
+    def _received(self, client: Server_Client, recved: Socket_Response):
+        if len(recved) > 0 and self._store(client, recved):
+            self._dispatch(client, recved)
+
+    def _store(self, client: Server_Client, recved: Socket_Response, block: bool = True) -> Optional[bool]:
+        """
+        adds received data to the inbox
+
+        Returns:
+            returns False if the inbox is full and block is False, None if the client got disconnected because the
+            inbox is full, else True
+        """
+        trace = recved._trace
+        if self.inbox.put(recved, block):
+            if trace is not None:
+                trace.lap("inbox")
+            self.event.new_data = True
+            self._event_system.happened(self.EVENT_RECEIVED.copy())
+            if trace is not None:
+                trace.lap("event")
+            return True
+        if self.inbox.policy == Inbox.BLOCK and not block:
+            return False
+        if self.inbox.policy == Inbox.DISCONNECT:
+            self.disconnect(client.address)
+            return None
+        return True
+
+    def _dispatch(self, client: Server_Client, recved: Socket_Response, block: bool = True) -> bool:
+        """
+        executes `on_receive`, either directly or through the dispatcher
+
+        Returns:
+            returns False if the dispatcher is full and block is False
+        """
+        if not callable(self.on_receive):
+            return True
+        function, args = self.on_receive, (client, recved)
+        if self._dispatcher is not None and self._dispatcher.processes:
+            function = self._process_on_receive
+        if recved._trace is not None:
+            function, args = traced, (recved._trace, "on_receive", function) + args
+        if client.metrics is not None:
+            function, args = timed, (client.metrics.handler, function) + args
+        if self._dispatcher is None:
+            function(*args)
+            return True
+        return self._dispatcher.submit(client.address, function, *args, block=block)
+
+    def _process_on_receive(self, client: Server_Client, recved: Socket_Response):
+        data = recved.response
+        reply = self._dispatcher.run_in_process(self.on_receive, client.address,
+                                                b''.join(data) if isinstance(data, tuple) else data)
+        if reply is not None:
+            self.send_data(reply, client)
+
+    def _add_exception(self, exception: Exception, traceback_: Optional[str] = None):
+        self.event.exception.exceptions.add(exception, traceback_)
+        self.event.exception.occurred = True
+
+        self._event_system.happened(self.EVENT_EXCEPTION.copy())
+
+    def _new_client(self, client_socket: socket.socket, address: tuple) -> Server_Client:
+        if self.socket_options is not None:
+            self.socket_options.apply(client_socket)
+        return Server_Client(client_socket, address, recv_buffer=self._recv_buffer, framed=self._framed,
+                             codec=self.codec, _compression_settings=self._compression, _on_request=self._request,
+                             _on_activity=self._active if self._timers is not None else None,
+                             metrics=ConnectionMetrics() if self.metrics is not None else None, tracer=self.tracer,
+                             max_frame_size=self._max_frame_size)
+
+    def set_idle_timeout(self, client: Union[Server_Client, tuple], timeout: Optional[float]) -> None:
+        """
+        changes the idle timeout of one Client
+
+        Args:
+            client: the Server_Client or its address
+            timeout: seconds of silence after which the Client is disconnected, None disables it
+
+        Raises:
+            SetupError: if the Server was setup without heartbeat and idle_timeout
+        """
+        if self._timers is None:
+            raise SetupError("the Server was setup without heartbeat and idle_timeout")
+        address = _address(client)
+        self._idle_timeouts[address] = timeout
+        if timeout is None:
+            self._timers.cancel((address, "idle"))
+        else:
+            self._timers.schedule((address, "idle"), timeout)
+
+    def _track(self, client: Server_Client):
+        # starts the timers and the metrics of a new connection
+        if self.metrics is not None and client.metrics is not None:
+            self.metrics.add(client.address, client.metrics)
+        if self._timers is not None:
+            self._active(client.address)
+
+    def _active(self, address: tuple):
+        now = time.monotonic()
+        if self._heartbeat is not None:
+            self._timers.schedule((address, "heartbeat"), self._heartbeat, now)
+        timeout = self._idle_timeouts.get(address, self._idle_timeout)
+        if timeout is not None:
+            self._timers.schedule((address, "idle"), timeout, now)
+
+    def _untrack(self, address: tuple):
+        if self.metrics is not None:
+            self.metrics.remove(address)
+        if self._timers is not None:
+            self._timers.cancel((address, "heartbeat"))
+            self._timers.cancel((address, "idle"))
+            self._idle_timeouts.pop(address, None)
+
+    def _watch_timers(self):
+        while not self._timers_stop.wait(self._timers.tick):
+            for address, kind in self._timers.advance():
+                client = self.clients.get(address)
+                if client is None:
+                    continue
+                try:
+                    if kind == "heartbeat":
+                        self._timers.schedule((address, "heartbeat"), self._heartbeat)
+                        with client._send_lock:
+                            client._write(frame_buffers(b'', FRAME_PING))
+                    else:
+                        self.disconnect(address)
+                        self._event_system.happened(self.EVENT_IDLE.copy())
+                except Exception as e:
+                    self._add_exception(e, traceback.format_exc())
+
+    def _handshake(self, client: Server_Client) -> Server_Client:
+        """
+        is executed for every accepted connection before it's handed to the Server, Servers which have to exchange
+        information like keys with the Client should override it
+
+        Args:
+            client: the accepted client
+
+        Returns:
+            returns the client which should be used for the connection
+        """
+        return client
+
+    def _add_client(self, server_client: Server_Client):
+        ct = threading.Thread(target=self._start_target, args=(server_client,), daemon=True)
+        server_client = server_client._add_thread(ct)
+        #self.clients[address] = [ct, client_socket]
+
+        self.clients[server_client.address] = server_client
+        self._track(server_client)
+
+        if callable(self.on_connect):
+            self.on_connect(server_client)
+
+        ct.start()
+
+        self._allthreads[server_client.address] = ct  # add thread to all threads dict
+
+        if self.max_connections is not None and len(self.clients) >= self.max_connections:
+            self.run = False
+
     def _accept_clients(self):
+        pool = self._handshake_pool
         while self._kill is False:
             #time.sleep(0.01)
             while self.event.accepting_thread.run:
+                if pool is not None and not pool.acquire(0.5):  # too many running handshakes
+                    continue
                 try:
                     client_socket, address = self.socket.accept()
                 except OSError:
+                    if pool is not None:
+                        pool.release()
                     self.exit_accept()
                     return
-                server_client = Server_Client(client_socket, address, recv_buffer=self._recv_buffer)
-
-                ct = threading.Thread(target=self._start_target, args=(server_client,), daemon=True)
-                server_client = server_client._add_thread(ct)
-                #self.clients[address] = [ct, client_socket]
-
-                self.clients[address] = server_client
-
-                if callable(self.on_connect):
-                    self.on_connect(server_client)
-
-                ct.start()
-
-                self._allthreads[address] = ct  # add thread to all threads dict
-
-                if self.max_connections is not None and len(self.clients) >= self.max_connections:
-                    self.run = False
+                server_client = self._new_client(client_socket, address)
+                if pool is not None:
+                    pool.submit(server_client, self._handshake, self._add_client, self._add_exception)
+                else:
+                    self._add_client(self._handshake(server_client))
 
     def await_event(self, timeout: Optional[int] = 0) -> Union[
         Tuple[Event, dict], Tuple[Event, List[Socket_Response]], Tuple[Event, None]]:
@@ -765,13 +1947,17 @@ class TCPServer:
         if timeout < 0:
             raise ValueError("timeout can't be lower then 0")
 
-        event_: bool = self._event_system.await_event(timeout if timeout != 0 else None)
-        if event_:
-            event: Event = self._event_system.first_event()
+        event: Event = self._event_system.next_event(timeout if timeout != 0 else None)
+        if event is not None:
             if event == self.EVENT_EXCEPTION:
                 return event, self.return_exceptions()
             elif event == self.EVENT_RECEIVED:
                 return event, self.return_recved_data()
+            elif event == self.EVENT_HIGH_WATER:
+                return event, None
+            elif event == self.EVENT_IDLE:
+                return event, None
+            return event, None  # events without a value
         else:
             return self.EVENT_TIMEOUT.copy(), None
 
@@ -802,6 +1988,7 @@ class TCPServer:
         if self.__setup_flag is False:
             raise SetupError("Server isn't setup")
 
+        self.inbox.reopen()
         self.event.accepting_thread.run = True
 
     # stops the server
@@ -832,7 +2019,9 @@ class TCPServer:
         try:
             client: Server_Client = self.clients.get(address)
             self.clients.pop(address)
-            self._allthreads.pop(address)
+            self._untrack(address)
+            self._allthreads.pop(address, None)
+            self._leave_groups(address)
             client.close()
         except Exception as e:
             self.event.exception.occurred = True
@@ -865,6 +2054,49 @@ class TCPServer:
 
         return exceptions
 
+    def stats(self, clients: bool = True) -> dict:
+        """
+        returns a snapshot of the metrics: the totals of all connections, closed ones included, the amount of open
+        connections and the size of the inbox. The histograms contain the count, average, 50th, 90th, 99th percentile
+        and maximum in milliseconds
+
+        Args:
+            clients: if the metrics of every open connection should be included under "clients"
+
+        Returns:
+            returns the snapshot as dict
+
+        Raises:
+            SetupError: if the Server was setup without metrics
+        """
+        if self.metrics is None:
+            raise SetupError("the Server was setup without metrics")
+        result = self.metrics.snapshot(clients)
+        result["inbox_messages"] = len(self.inbox)
+        result["inbox_bytes"] = self.inbox.nbytes
+        return result
+
+    def serve_metrics(self, ip: str = "127.0.0.1", port: int = 9100) -> MetricsExporter:
+        """
+        serves `stats()` in the Prometheus text format on `http://ip:port/metrics`, until the Server is closed
+
+        Args:
+            ip: IP the exporter listens on
+            port: port of the exporter, 0 chooses a free one
+
+        Returns:
+            returns the MetricsExporter, its address is `MetricsExporter.address`
+
+        Raises:
+            SetupError: if the Server was setup without metrics
+        """
+        if self.metrics is None:
+            raise SetupError("the Server was setup without metrics")
+        if self._exporter is not None:
+            self._exporter.close()
+        self._exporter = MetricsExporter(lambda: self.stats(False), ip, port)
+        return self._exporter
+
     def exit_accept(self):
         """
         stops and kills the accepting thread
@@ -876,9 +2108,39 @@ class TCPServer:
         """
         Closes the socket
         """
-        self.socket.close()
-        clients = list(self.clients.values())
-        for client in clients:
-            client.close()
-            client.thread.join(5)
-        self.__accepting_thread.join(5)
+        self.inbox.close()  # wakes up receiving threads which wait for space
+        self._timers_stop.set()
+        if self._engine is not None:
+            self.exit_accept()
+            self._engine.wakeup()
+            self.__accepting_thread.join(5)
+            self.socket.close()
+        else:
+            if self._own_socket:
+                try:
+                    self.socket.shutdown(socket.SHUT_RDWR)  # wakes up the accepting thread
+                except OSError:
+                    pass
+            self.socket.close()
+            clients = list(self.clients.values())
+            for client in clients:
+                client.close()
+                if client.thread.ident is not None:  # a handshake worker may not have started it yet
+                    client.thread.join(5)
+            self.__accepting_thread.join(5)
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+        if self._broadcaster is not None:
+            self._broadcaster.close()
+        if self._handshake_pool is not None:
+            self._handshake_pool.close(wait=False)
+        if self._exporter is not None:
+            self._exporter.close()
+
+
+class TCPClientPool(ClientPool):
+    """
+    A pool of TCPClients per Server address, see `ClientPool`. The keyword arguments of `TCPClient.setup()` can be
+    passed after the pool settings, e.g. `TCPClientPool(max_size=4, codec=codec)`
+    """
+    client_class = TCPClient
@@ -0,0 +1,16 @@
+import time
+
+
+def wait(condition, timeout: float = 5.0) -> bool:
+    """
+    polls `condition` till it returns True
+
+    Returns:
+        returns False if it didn't return True within `timeout` seconds
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
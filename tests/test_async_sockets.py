@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+import simplesockets.async_sockets as a
+import simplesockets.secure_sockets as s
+from simplesockets.simple_sockets import TCPClient
+from simplesockets._support_files.compression import Compression
+from simplesockets._support_files.error import RemoteError
+from tests.conftest import wait
+
+
+def test_async_data_exchange():
+    async def main():
+        Server = a.AsyncTCPServer()
+        Server.setup(port=0, on_receive=lambda client, data: client.send(data.response))
+        await Server.start()
+
+        Client = a.AsyncTCPClient()
+        Client.setup("localhost", Server.Address[1])
+        await Client.connect()
+        Client.autorecv()
+
+        await Client.send_data(b'test')
+        event, value = await Client.await_event(disable_on_functions=True, timeout=3000)
+
+        await Client.close()
+        await Server.close()
+        return event, value
+
+    event, value = asyncio.run(main())
+
+    assert event == a.AsyncTCPClient.EVENT_RECEIVED and value[0].response == b'test'
+
+
+def test_secure_wire_compatibility():
+    Server = s.SecureServer()
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    async def main():
+        Client = a.AsyncSecureClient()
+        Client.setup("localhost", Server.socket.getsockname()[1])
+        await Client.connect()
+
+        messages = [b'first', b'second' * 1000]
+        for message in messages:
+            await Client.send_data(message)
+        received = []
+        async for response in Client:
+            received.append(response.response)
+            if len(received) == len(messages):
+                break
+        await Client.close()
+        return messages, received
+
+    messages, received = asyncio.run(main())
+    Server.close()
+
+    assert received == messages
+
+
+
+def _sync_client(Client, port: int, results: dict):
+    received = []
+    Client.setup("127.0.0.1", port, compression=Compression(), on_receive=received.append)
+    results["connected"] = Client.connect()
+    results["compression"] = Client.compression
+    results["rtt"] = Client.ping(timeout=3)
+    try:
+        Client.request(b'request', timeout=3).result()
+    except RemoteError:
+        results["request"] = "declined"
+    Client.send_data(b'data')
+    wait(lambda: received, 3)  # the auto-receiving thread was started by the ping
+    results["echo"] = received[0].response if received else None
+    Client.close()
+
+
+def _against(server_class, function, **setup_kwargs) -> list:
+    async def main():
+        Server = server_class()
+        Server.setup(port=0, on_receive=lambda client, data: client.send(data.response), **setup_kwargs)
+        await Server.start()
+        await asyncio.get_running_loop().run_in_executor(None, function, Server.Address[1])
+        await Server.close()
+        return Server.return_recved_data()
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("secure", [False, True])
+def test_control_frames(secure):
+    results = {}
+    Client = s.SecureClient() if secure else TCPClient()
+    recved_data = _against(a.AsyncSecureServer if secure else a.AsyncTCPServer,
+                           lambda port: _sync_client(Client, port, results), **({"keysize": 1024} if secure else {}))
+
+    assert results["connected"] and results["compression"] is None and results["rtt"] > 0
+    assert results["request"] == "declined" and results["echo"] == b'data'
+    assert [data.response for data in recved_data] == [b'data']
+
+
+def test_x25519_rejected():
+    def connect(port: int):
+        Client = s.SecureClient()
+        Client.setup("127.0.0.1", port, handshake="x25519")
+        results.append(Client.connect())
+        Client.close()
+
+    results = []
+    _against(a.AsyncSecureServer, connect, keysize=1024)
+    assert results == [False]
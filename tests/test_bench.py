@@ -0,0 +1,27 @@
+import json
+
+from simplesockets.bench import __main__ as suite, prefork
+
+
+def test_suite(tmp_path):
+    output = tmp_path / "results.json"
+    assert suite.main(["--sizes", "64", "4096", "--clients", "1", "3", "--messages", "50", "--plain-only",
+                       "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+
+    echo = report["results"]["echo"]
+    assert [(result["size"], result["clients"]) for result in echo] == [(64, 1), (4096, 1), (64, 3)]
+    assert all(result["messages_per_second"] > 0 and result["latency_p999_us"] >= result["latency_p50_us"]
+               for result in echo)
+
+    slower = json.loads(output.read_text())
+    for result in slower["results"]["echo"]:
+        result["messages_per_second"] /= 2
+    rows = suite.compare(report, slower)
+    assert len(rows) == 6 and sum(row[5] for row in rows) == 3
+
+
+def test_prefork():
+    results = prefork.run(workers=[1, 2], clients=4, messages=40, drivers=2)
+    assert [result["workers"] for result in results] == [1, 2] and results[0]["speedup"] == 1.0
+    assert all(result["messages"] == 40 and result["messages_per_second"] > 0 for result in results)
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+import simplesockets.simple_sockets as s
+from simplesockets._support_files import broadcast
+from simplesockets._support_files.error import SetupError
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_broadcast(engine):
+    Server = s.TCPServer()
+    Server.setup(port=0, engine=engine)
+    Server.start()
+
+    Clients = []
+    for i in range(10):
+        Client = s.TCPClient()
+        Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+        Client.connect()
+        Clients.append(Client)
+    while len(Server.clients) < len(Clients):
+        time.sleep(0.01)
+
+    results = Server.broadcast(b'to everyone')
+    received = [Client.recv_data().response for Client in Clients]
+
+    slow, other = list(Server.clients)[:2]
+    Server.add_to_group("slow", slow)
+    Server.add_to_group("slow", Server.clients[other])
+    big = bytearray(b'x' * 4000000)
+    queued = Server.broadcast(big, "slow", max_pending=1000)  # doesn't fit into the socket buffers
+    skipped = Server.broadcast(b'skipped', "slow", max_pending=1000)
+    Server.send_data(b'after', Server.clients[slow])  # is queued behind the broadcast
+
+    Client = next(Client for Client in Clients if Client.socket.getsockname() == slow)
+    slow_received = [Client.recv_data().response, Client.recv_data().response]
+
+    for Client in Clients:
+        Client.close()
+    Server.close()
+
+    assert all(results.values()) and len(results) == 10
+    assert received == [b'to everyone'] * 10
+    assert all(queued.values()) and not any(skipped.values())
+    assert slow_received == [bytes(big), b'after']
+
+
+def test_broadcast_without_dontwait(monkeypatch):
+    monkeypatch.setattr(broadcast, "MSG_DONTWAIT", 0)  # like on Windows
+    Server = s.TCPServer()
+    Server.setup(port=0)
+    Server.start()
+
+    with pytest.raises(SetupError, match="selector"):
+        Server.broadcast(b'blocks on slow clients')
+
+    Server.close()
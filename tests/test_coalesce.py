@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets.secure_sockets import SecureClient, SecureServer
+from simplesockets._support_files.coalesce import Coalesce, Coalescer
+from simplesockets._support_files.error import SetupError
+from tests.conftest import wait
+
+
+def _server(received: list, secure: bool = False):
+    Server = SecureServer() if secure else TCPServer()
+    kwargs = {"handshakes": ("x25519",)} if secure else {}
+    Server.setup(port=0, on_receive=lambda client, data: received.append(data.response), **kwargs)
+    Server.register_handler(lambda client, data: received.append(data.response) or b'reply')
+    Server.start()
+    return Server
+
+
+def test_coalescer():
+    written = []
+    coalescer = Coalescer(lambda buffers: written.append(b''.join(buffers)) is None, threading.RLock(), max_bytes=8,
+                          max_delay=0.01)
+    view = memoryview(bytearray(b'ab'))
+    assert coalescer.add([b'1', view]) and coalescer.pending == 3
+    view[:] = b'xx'  # the buffered frame was copied
+    assert coalescer.add([b'2345']) and written == []
+    assert coalescer.add([b'6', b'7']) and written == [b'1ab234567']  # max_bytes
+    assert coalescer.add([b'8']) and wait(lambda: written == [b'1ab234567', b'8'])  # max_delay
+    assert coalescer.add([b'large frame']) and written[-1] == b'large frame'
+    assert coalescer.close() and coalescer.flushes == 3
+
+    failing = Coalescer(lambda buffers: False, threading.RLock(), max_bytes=8, max_delay=60)
+    assert failing.add([b'1'], b'first') and failing.add([b'2'], b'second')
+    assert not failing.flush() and failing.add([b'3'], b'third')
+    assert failing.clear() == [b'first', b'second', b'third'] and failing.clear() == []
+
+    with pytest.raises(ValueError):
+        Coalesce(max_delay=0)
+
+
+def test_batch():
+    received = []
+    Server = _server(received)
+
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], metrics=True)
+    assert Client.connect()
+    sent_before = Client.metrics.send_calls
+    with Client.batch():
+        for number in range(100):
+            assert Client.send_data(str(number).encode())
+        assert Client._coalescer.pending > 0
+    assert Client.metrics.send_calls == sent_before + 1
+    assert wait(lambda: len(received) == 100)
+
+    Client.close()
+    Server.close()
+
+    assert received == [str(number).encode() for number in range(100)]
+    unframed = TCPClient()
+    unframed.setup("127.0.0.1", 1, framed=False)
+    with pytest.raises(SetupError):
+        with unframed.batch():
+            pass
+
+
+@pytest.mark.parametrize("secure", [False, True])
+def test_deadline(secure):
+    received = []
+    Server = _server(received, secure)
+
+    Client = SecureClient() if secure else TCPClient()
+    kwargs = {"handshake": "x25519"} if secure else {}
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], metrics=True, coalesce=Coalesce(max_delay=0.05),
+                 **kwargs)
+    assert Client.connect()
+    sent_before = Client.metrics.send_calls
+    for number in range(50):
+        assert Client.send_data(b'message %d' % number)
+    future = Client.request(b'request')  # in order with the messages
+    assert wait(lambda: len(received) == 51)
+    assert Client.metrics.send_calls - sent_before < 5
+
+    Client.send_data(b'flushed')
+    assert Client.flush() and wait(lambda: len(received) == 52)
+
+    Client.close()
+    Server.close()
+
+    assert received == [b'message %d' % number for number in range(50)] + [b'request', b'flushed']
+    assert future.result(5).response == b'reply'
@@ -0,0 +1,77 @@
+import dataclasses
+
+import pytest
+
+import simplesockets.simple_sockets as s
+from simplesockets._support_files.codec import Codec
+from simplesockets._support_files.error import CodecError
+
+
+@dataclasses.dataclass
+class Reading:
+    sensor: str
+    value: float
+    count: int
+    valid: bool
+    raw: bytes
+    channel: "H"
+
+
+class Point:
+    __slots__ = ("x", "y")
+    x: int
+    y: int
+
+
+def test_codec():
+    codec = Codec()
+    codec.register(Reading)
+    codec.register(Point, type_id=7)
+
+    reading = Reading("temperature", 21.5, 3, True, b'\x00\x01', 2)
+    assert codec.decode(codec.encode(reading)) == reading
+
+    point = Point.__new__(Point)
+    point.x, point.y = 1, -2
+    decoded = codec.decode(codec.encode(point))
+    assert (decoded.x, decoded.y) == (1, -2)
+
+    with pytest.raises(CodecError):
+        codec.encode(object())
+    with pytest.raises(CodecError):
+        Codec().decode(codec.encode(point))  # unknown type id
+    with pytest.raises(CodecError):
+        codec.register(Reading, type_id=7)  # the id is used by Point
+
+    encoded = codec.encode(reading)
+    for end in (len(encoded) - 1, len(encoded) - 3):  # the declared lengths exceed the data
+        with pytest.raises(CodecError):
+            codec.decode(encoded[:end])
+
+    codec.register(Point, type_id=8)  # the old type id is released
+    assert codec.decode(codec.encode(point)).x == 1
+    with pytest.raises(CodecError):
+        codec.decode(b'\x00\x07' + bytes(16))
+    codec.register(Reading, type_id=7)
+
+
+def test_send_object():
+    codec = Codec()
+    codec.register(Reading)
+
+    Server = s.TCPServer()
+    Server.setup(port=0, codec=codec, on_receive=lambda client, data: client.send_object(
+        dataclasses.replace(data.obj, count=data.obj.count + 1)))
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], codec=codec)
+    assert Client.connect()
+    assert Client.send_object(Reading("humidity", 0.5, 1, False, b'', 0))
+    response = Client.recv_data()
+
+    Client.close()
+    Server.close()
+
+    assert response.obj == Reading("humidity", 0.5, 2, False, b'', 0)
+    assert response.obj is response.obj  # decoded once
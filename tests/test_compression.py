@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import simplesockets.simple_sockets as s
+import simplesockets.secure_sockets as secure
+from simplesockets._support_files.compression import Compression
+from simplesockets._support_files.error import ProtocolError
+from simplesockets._support_files.framing import FRAME_DATA, FRAME_COMPRESSED
+from tests.conftest import wait
+
+TELEMETRY = json.dumps([{"sensor": "temperature", "unit": "celsius", "value": i} for i in range(20)]).encode()
+
+
+def test_compression_context():
+    dictionary = b'{"sensor": "temperature", "unit": "celsius", "value": '
+    sender = Compression(threshold=64, dictionary=dictionary).context()
+    receiver = Compression(threshold=64, dictionary=dictionary).context()
+
+    assert sender.compress(b'short') == (FRAME_DATA, b'short')
+
+    sizes = []
+    for _ in range(3):
+        kind, compressed = sender.compress(TELEMETRY)
+        assert kind == FRAME_COMPRESSED
+        assert receiver.decompress(compressed) == TELEMETRY
+        sizes.append(len(compressed))
+
+    assert sizes[1] < sizes[0] / 4  # the history carries across messages
+    assert sender.ratio > 5 and receiver.received_ratio > 5
+    assert not Compression(dictionary=dictionary).accepts(Compression().offer())
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_decompression_limit(engine):
+    kind, compressed = Compression().context().compress(bytes(1 << 20))
+    assert kind == FRAME_COMPRESSED and len(compressed) < 2048
+    with pytest.raises(ProtocolError):
+        Compression().context(max_size=1024).decompress(compressed)
+
+    Server = s.TCPServer()
+    Server.setup(port=0, engine=engine, compression=Compression(), max_frame_size=1 << 16)
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], compression=Compression())
+    assert Client.connect()
+    Client.send_data(bytes(1 << 24))  # inflates to 16 MiB from a frame of a few KiB
+    closed = wait(lambda: not Server.clients)
+
+    Client.close()
+    Server.close()
+
+    assert closed
+    assert any(isinstance(exception.exception, ProtocolError)
+               for exception in Server.event.exception.exceptions.exceptions.values())
+
+
+@pytest.mark.parametrize("server_class, client_class, engine", [(s.TCPServer, s.TCPClient, "threaded"),
+                                                                 (s.TCPServer, s.TCPClient, "selector"),
+                                                                 (secure.SecureServer, secure.SecureClient, "threaded")])
+def test_compressed_exchange(server_class, client_class, engine):
+    kwargs = {"keysize": 1024} if server_class is secure.SecureServer else {}
+    Server = server_class()
+    Server.setup(port=0, engine=engine, compression=Compression(),
+                 on_receive=lambda client, data: client.send(data.response), **kwargs)
+    Server.start()
+
+    Client = client_class()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], compression=Compression())
+    assert Client.connect()
+
+    received = []
+    for message in (TELEMETRY, b'small', TELEMETRY):
+        Client.send_data(message)
+        received.append(Client.recv_data().response)
+    server_compression = list(Server.clients.values())[0].compression
+
+    Client.close()
+    Server.close()
+
+    assert received == [TELEMETRY, b'small', TELEMETRY]
+    assert Client.compression.ratio > 3 and server_compression.ratio > 3
+
+
+def test_compression_declined():
+    Server = s.TCPServer()
+    Server.setup(port=0, compression=Compression(dictionary=b'other'),
+                 on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], compression=Compression())
+    assert Client.connect()
+    Client.send_data(TELEMETRY)
+    received = Client.recv_data().response
+
+    Client.close()
+    Server.close()
+
+    assert Client.compression is None and received == TELEMETRY
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import simplesockets.simple_sockets as s
+from simplesockets._support_files.dispatch import Dispatcher
+
+
+def test_ordered_per_key():
+    dispatcher = Dispatcher(workers=4, max_queue=8)
+    dispatcher.start()
+
+    results = {key: [] for key in range(4)}
+    lock = threading.Lock()
+
+    def handle(key, i):
+        time.sleep(0.001)
+        with lock:
+            results[key].append(i)
+
+    for i in range(20):
+        for key in range(4):
+            dispatcher.submit(key, handle, key, i)
+    dispatcher.close()
+
+    assert all(values == list(range(20)) for values in results.values())
+    assert dispatcher.stats()["completed"] == 80
+
+
+def test_drop_without_backpressure():
+    dispatcher = Dispatcher(workers=1, max_queue=1, backpressure=False)
+    release = threading.Event()
+    dispatcher.start()
+
+    dispatcher.submit(0, release.wait)
+    time.sleep(0.1)  # the first call is running, the queue is empty
+    dispatcher.submit(1, lambda: None)
+    dispatcher.submit(2, lambda: None)
+    release.set()
+    dispatcher.close()
+
+    assert dispatcher.stats()["dropped"] == 1
+
+
+def test_server_dispatch():
+    Server = s.TCPServer()
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response), engine="selector",
+                 dispatcher=Dispatcher(workers=2, max_queue=2))
+    Client = s.TCPClient()
+    Client.setup("localhost", Server.socket.getsockname()[1])
+    Client.connect()
+
+    for i in range(50):
+        Client.send_data(b'%d' % i)
+    received = [Client.recv_data().response for _ in range(50)]
+
+    Client.close()
+    Server.close()
+
+    assert received == [b'%d' % i for i in range(50)]
@@ -0,0 +1,34 @@
+import time
+
+import simplesockets.simple_sockets as s
+
+
+def test_selector_echo():
+    disconnected = []
+
+    Server = s.TCPServer()
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response),
+                 on_disconnect=disconnected.append, engine="selector")
+    Server.start()
+
+    Clients = []
+    for i in range(20):
+        Client = s.TCPClient()
+        Client.setup("localhost", Server.socket.getsockname()[1])
+        Client.connect()
+        Clients.append(Client)
+
+    for i, Client in enumerate(Clients):
+        Client.send_data(b'message %d' % i)
+    received = [Client.recv_data().response for Client in Clients]
+
+    Clients[0].close()
+    time.sleep(0.5)
+    clients = len(Server.clients)
+
+    for Client in Clients[1:]:
+        Client.close()
+    Server.close()
+
+    assert received == [b'message %d' % i for i in range(20)]
+    assert clients == 19 and len(disconnected) >= 1
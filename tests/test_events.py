@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from simplesockets._support_files.Events import Event, Event_System
+
+
+def test_event_system():
+    events = Event_System()
+    a, b = Event("a"), Event("b")
+    for i in range(100):
+        events.happened(a if i % 2 else b)
+
+    assert len(events) == 100 and a in events
+    events.clear_name("a")
+    assert len(events) == 50 and a not in events and b in events
+    events.happened(a)  # events added after clear_name() are kept
+    assert events.count("a") == 1
+    assert [ev.name for ev in events].count("b") == 50
+    assert events.events[-1] == a
+
+    assert all(events.first_event() == b for _ in range(50))
+    assert events.first_event() == a
+    assert events.first_event() is None and not events
+    assert events.next_event(10) is None
+
+
+def test_event_system_threads():
+    events = Event_System()
+
+    def produce():
+        for _ in range(5000):
+            events.happened(Event("x"))
+
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    consumed = 0
+    while events.next_event(1000) is not None:
+        consumed += 1
+    for thread in threads:
+        thread.join()
+
+    assert consumed == 20000
+
+
+def test_pop():
+    events = Event_System()
+    for name in "abcabc":
+        events.happened(Event(name))
+    assert events.pop(1).name == "b" and events.pop(-1).name == "c"
+
+    events.clear_name("b")  # the cleared event stays in the deque and is skipped
+    assert [ev.name for ev in events] == ["a", "c", "a"]
+    assert events.pop(1).name == "c" and events.pop(-1).name == "a" and events.pop(0).name == "a"
+    assert not events
+    with pytest.raises(IndexError):
+        events.pop(0)
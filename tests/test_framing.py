@@ -0,0 +1,97 @@
+import array
+import select
+import socket
+import threading
+from collections import deque
+
+import pytest
+
+import simplesockets.simple_sockets as s
+from simplesockets._support_files.error import ProtocolError
+from simplesockets._support_files.framing import HEADER, FrameParser, FrameReader, frame, frame_buffers, send_buffers
+
+
+def test_frame_reader():
+    a, b = socket.socketpair()
+    reader = FrameReader(b, recv_buffer=16)
+
+    big = bytes(range(256)) * 10
+    a.sendall(frame(b'first') + frame(b'') + frame(big))
+
+    assert reader.read()[1] == b'first'
+    assert reader.read()[1] == b''
+    assert reader.read()[1] == big
+
+    a.close()
+    b.close()
+
+
+def test_send_buffers_partial():
+    a, b = socket.socketpair()
+    a.setblocking(False)
+    reader = FrameReader(b)
+
+    payloads = [bytearray(b'x' * 3000000), array.array('i', range(10)), memoryview(b'hello')[1:]]
+    buffers = deque()
+    for payload in payloads:
+        buffers.extend(frame_buffers(payload))
+
+    received = []
+    thread = threading.Thread(target=lambda: received.extend(bytes(reader.read()[1]) for _ in payloads))
+    thread.start()
+    while buffers:
+        send_buffers(a, buffers)
+        if buffers:  # the socket buffer is full
+            select.select([], [a], [])
+    thread.join(5)
+
+    a.close()
+    b.close()
+
+    assert received == [bytes(payload) for payload in payloads]
+
+
+def test_back_to_back_messages():
+    Client = s.TCPClient()
+    Server = s.TCPServer(1)
+
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response))
+    Client.setup("localhost", Server.socket.getsockname()[1], recv_buffer=64)
+    Server.start()
+    Client.connect()
+
+    messages = [b'a', b'b' * 100, b'c' * 70000]
+    for message in messages:
+        Client.send_data(message)
+
+    received = [Client.recv_data().response for _ in messages]
+
+    Client.close()
+    Server.close()
+
+    assert received == messages
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_oversized_frame(engine):
+    parser = FrameParser(max_frame_size=1024)
+    with pytest.raises(ProtocolError):
+        parser.feed(HEADER.pack(0, 1 << 30))
+
+    Server = s.TCPServer()
+    Server.setup(port=0, engine=engine, max_frame_size=1 << 20)
+    Server.start()
+
+    sock = socket.create_connection(("127.0.0.1", Server.socket.getsockname()[1]))
+    sock.settimeout(5)
+    sock.sendall(HEADER.pack(0, 1 << 30))  # announces 1 GiB without sending it
+    try:
+        closed = sock.recv(1) == b''
+    except ConnectionResetError:
+        closed = True
+    sock.close()
+    Server.close()
+
+    assert closed
+    assert any(isinstance(exception.exception, ProtocolError)
+               for exception in Server.event.exception.exceptions.exceptions.values())
@@ -0,0 +1,56 @@
+import socket
+import time
+
+import pytest
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.timers import TimerWheel
+
+
+def test_timer_wheel():
+    wheel = TimerWheel(tick=1, bits=2, levels=2)  # 4 slots per wheel, the second wheel covers 16 ticks
+    start = wheel._current * wheel.tick
+    wheel.schedule("soon", 2, now=start)
+    wheel.schedule("later", 10, now=start)
+    wheel.schedule("far", 40, now=start)  # beyond the wheels
+    wheel.schedule("cancelled", 3, now=start)
+    wheel.cancel("cancelled")
+
+    expired = {}
+    for second in range(1, 60):
+        if second <= 20:  # activity postpones the timer
+            wheel.schedule("postponed", 5, now=start + second)
+        for key in wheel.advance(start + second):
+            expired[key] = second
+
+    assert expired == {"soon": 2, "later": 10, "far": 40, "postponed": 25}
+    assert len(wheel) == 0
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_idle_eviction(engine):
+    Server = TCPServer()
+    Server.setup(port=0, engine=engine, heartbeat=0.1, idle_timeout=0.5)
+    Server.start()
+    port = Server.socket.getsockname()[1]
+
+    Client = TCPClient()  # answers the heartbeats, because it receives
+    Client.setup("127.0.0.1", port)
+    assert Client.connect()
+    Client.autorecv()
+
+    silent = socket.create_connection(("127.0.0.1", port))  # never answers
+    time.sleep(1.5)
+    clients = len(Server.clients)
+    events = []
+    event, value = Server.await_event(100)
+    while event != Server.EVENT_TIMEOUT:
+        events.append((event, value))
+        event, value = Server.await_event(100)
+    idle = (Server.EVENT_IDLE, None) in events
+
+    Client.close()
+    silent.close()
+    Server.close()
+
+    assert clients == 1 and idle
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+import simplesockets.simple_sockets as s
+from simplesockets._support_files.inbox import Inbox
+from tests.conftest import wait
+
+
+def test_inbox_policies():
+    inbox = Inbox(max_messages=3, policy="drop_oldest")
+    for message in (b'1', b'2', b'3', b'4'):
+        assert inbox.put(message)
+    assert inbox.drain() == [b'2', b'3', b'4'] and inbox.dropped == 1
+
+    inbox = Inbox(max_bytes=10, policy="drop_newest")
+    assert inbox.put(b'x' * 8) and not inbox.put(b'x' * 8) and inbox.put(b'xx')
+    assert inbox.drain(1) == [b'x' * 8] and inbox.nbytes == 2
+
+    high_water = []
+    inbox = Inbox(max_messages=10, policy="block", high_water=0.5)
+    inbox.on_high_water = lambda: high_water.append(len(inbox))
+    for i in range(10):
+        inbox.put(b'%d' % i)
+    assert not inbox.put(b'10', block=False)
+    assert high_water == [5]
+
+    with pytest.raises(ValueError):
+        Inbox(policy="unknown")
+
+
+def test_client_inbox_reconnect():
+    Server = s.TCPServer()
+    Server.setup(port=0, on_receive=lambda client, data: [client.send(b'%d' % i) for i in range(3)])
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], inbox=Inbox(max_messages=1, policy="block"))
+    assert Client.connect()
+    Client.close()  # closing wakes up blocked receivers
+
+    Client.reconnect()
+    Client.autorecv()
+    Client.send_data(b'send 3 messages')
+    received = []
+    for _ in range(3):  # the receiving thread waits till the inbox got drained
+        assert wait(lambda: Client.inbox)
+        received.extend(Client.return_recved_data())
+
+    Client.close()
+    Server.close()
+
+    assert [data.response for data in received] == [b'0', b'1', b'2'] and Client.inbox.dropped == 0
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_server_inbox_backpressure(engine):
+    Server = s.TCPServer()
+    Server.setup(port=0, engine=engine, inbox=Inbox(max_messages=5, policy="block"))
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    Client.connect()
+    for i in range(20):
+        Client.send_data(b'%d' % i)
+
+    received = []
+    events = set()
+    deadline = time.monotonic() + 5
+    while len(received) < 20 and time.monotonic() < deadline:
+        event, data = Server.await_event(1000)
+        events.add(event.name)
+        if event == Server.EVENT_RECEIVED:
+            assert len(data) <= 5
+            received.extend(data)
+
+    Client.close()
+    Server.close()
+
+    assert [data.response for data in received] == [b'%d' % i for i in range(20)]
+    assert Server.EVENT_HIGH_WATER.name in events
+
+
+def test_server_inbox_disconnect():
+    Server = s.TCPServer()
+    Server.setup(port=0, inbox=Inbox(max_messages=2, policy="disconnect"))
+    Server.start()
+
+    Client = s.TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    Client.connect()
+    wait(lambda: Server.clients)
+    for i in range(3):
+        Client.send_data(b'%d' % i)
+    wait(lambda: not Server.clients)
+
+    Client.close()
+    Server.close()
+
+    assert not Server.clients and len(Server.return_recved_data()) == 2
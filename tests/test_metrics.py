@@ -0,0 +1,90 @@
+import urllib.request
+
+import pytest
+
+import simplesockets.secure_sockets as s
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.error import SetupError
+from simplesockets._support_files.metrics import Histogram, prometheus_text
+from tests.conftest import wait
+
+
+def test_histogram():
+    histogram = Histogram()
+    for micros in range(1, 1001):
+        histogram.record(micros / 1e6)
+    other = Histogram()
+    other.record(0.5)
+    histogram.merge(other)
+
+    assert histogram.count == 1001 and histogram.max == 0.5
+    assert abs(histogram.percentile(50) - 500e-6) < 500e-6 * 0.07
+    assert abs(histogram.percentile(99) - 990e-6) < 990e-6 * 0.07
+    assert abs(histogram.percentile(100) - 0.5) < 0.5 * 0.07
+
+
+@pytest.mark.parametrize("classes", [(TCPServer, TCPClient, {}), (s.SecureServer, s.SecureClient,
+                                                                    {"keysize": 1024})])
+def test_stats(classes):
+    server_class, client_class, kwargs = classes
+    Server = server_class()
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response), metrics=True, **kwargs)
+    Server.register_handler(lambda client, request: request.response)
+    Server.start()
+
+    Client = client_class()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], metrics=True)
+    assert Client.connect()
+    Client.autorecv()
+    for message in (b'first', b'second', b'third'):
+        Client.send_data(message)
+    assert Client.request(b'request').result(5).response == b'request'
+    assert wait(lambda: len(Client.inbox) == 3)
+    assert wait(lambda: Server.stats()["total"]["messages_out"] == 4)  # counted after the echo was written
+
+    server_stats = Server.stats()
+    client_stats = Client.stats()
+    Client.close()
+    assert wait(lambda: Server.stats()["connections"] == 0)
+    closed = Server.stats()
+    Server.close()
+
+    total = server_stats["total"]
+    assert server_stats["connections"] == 1 and len(server_stats["clients"]) == 1
+    assert total["messages_in"] == 4 and total["messages_out"] == 4
+    assert total["handler"]["count"] == 4 and server_stats["inbox_messages"] == 3
+    assert total["bytes_in"] == client_stats["total"]["bytes_out"]
+    assert total["recv_calls"] > 0 and total["send_calls"] > 0
+    assert client_stats["total"]["messages_out"] == 4 and client_stats["total"]["messages_in"] == 4
+    assert client_stats["inbox_messages"] == 3 and client_stats["in_flight"] == 0
+    if server_class is s.SecureServer:
+        assert total["encrypt"]["count"] == 4 and total["decrypt"]["count"] == 4
+        assert client_stats["total"]["encrypt"]["count"] == 4
+    assert closed["total"]["messages_in"] == 4  # the counters of closed connections are kept
+
+
+def test_exporter():
+    Server = TCPServer()
+    Server.setup(port=0, metrics=True)
+    Server.start()
+    exporter = Server.serve_metrics(port=0)
+
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    assert Client.connect()
+    Client.send_data(b'hello')
+    assert wait(lambda: len(Server.inbox) == 1)
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{exporter.address[1]}/metrics", timeout=5) as response:
+        text = response.read().decode()
+
+    Client.close()
+    Server.close()
+
+    assert "simplesockets_messages_in_total 1" in text
+    assert "simplesockets_connections 1" in text and "simplesockets_inbox_messages 1" in text
+    assert 'simplesockets_handler_seconds{quantile="0.99"}' in text
+    assert prometheus_text({"total": {"bytes_in": 3}}, "app") == "# TYPE app_bytes_in_total counter\n" \
+                                                                 "app_bytes_in_total 3\n"
+    with pytest.raises(SetupError):
+        Client.stats()
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from simplesockets.simple_sockets import TCPClientPool, TCPServer
+from simplesockets.secure_sockets import SecureClientPool, SecureServer
+from simplesockets._support_files.dispatch import Dispatcher
+
+
+def _server(server_class, **kwargs):
+    Server = server_class()
+    Server.setup(port=0, dispatcher=Dispatcher(4, ordered=False), **kwargs)
+
+    @Server.register_handler
+    def echo(client, request):
+        if request.response == b'slow':
+            time.sleep(0.3)
+        return request.response
+
+    Server.start()
+    return Server, ("127.0.0.1", Server.socket.getsockname()[1])
+
+
+@pytest.mark.parametrize("classes", [(TCPServer, TCPClientPool, {}), (SecureServer, SecureClientPool,
+                                                                        {"keysize": 1024})])
+def test_checkout(classes):
+    server_class, pool_class, kwargs = classes
+    Server, address = _server(server_class, **kwargs)
+    pool = pool_class(max_size=2)
+
+    replies = []
+    for message in (b'first', b'second', b'third'):
+        with pool.connection(address) as client:
+            replies.append(client.request(message).result(5).response)
+
+    first = pool.checkout(address)
+    second = pool.checkout(address)
+    with pytest.raises(TimeoutError):
+        pool.checkout(address, timeout=0.2)
+    pool.checkin(first)
+    pool.checkin(second, discard=True)
+    stats = pool.stats()
+
+    pool.close()
+    Server.close()
+
+    assert replies == [b'first', b'second', b'third']
+    assert stats["connects"] == 2 and stats["checkouts"] == 5 and stats["hit_rate"] == 3 / 5
+    assert stats["size"] == 1 and stats["evicted"] == 1
+
+
+def test_least_in_flight():
+    Server, address = _server(TCPServer)
+    pool = TCPClientPool(max_size=2, pipeline_depth=1)
+
+    futures = [pool.request(address, b'slow') for _ in range(4)]  # two requests on each Client
+    in_flight = pool.stats()["in_flight"]
+    replies = [future.result(5).response for future in futures]
+    stats = pool.stats()
+
+    pool.close()
+    Server.close()
+
+    assert replies == [b'slow'] * 4 and in_flight == 4
+    assert stats["connects"] == 2 and stats["requests"] == 4
+
+
+def test_close_with_callbacks():
+    Server, address = _server(TCPServer)
+    pool = TCPClientPool()
+    stats = []
+
+    future = pool.request(address, b'slow')
+    future.add_done_callback(lambda future_: stats.append(pool.stats()))  # runs while the Client is closed
+    closing = threading.Thread(target=pool.close, daemon=True)
+    closing.start()
+    closing.join(5)
+    deadlocked = closing.is_alive()
+
+    Server.close()
+
+    assert not deadlocked and len(stats) == 1 and stats[0]["size"] == 0
+    with pytest.raises(ConnectionError):
+        future.result(0)
+
+
+def test_health_checks():
+    Server, address = _server(TCPServer)
+    pool = TCPClientPool(idle_timeout=0.8, health_interval=0.2)
+    before = threading.active_count()
+
+    client = pool.checkout(address)
+    rtt = client.ping(5)
+    pool.checkin(client)
+    time.sleep(0.6)
+    checked = pool.stats()
+    time.sleep(1)
+    evicted = pool.stats()
+    threads = threading.active_count()
+
+    pool.close()
+    Server.close()
+
+    assert rtt > 0
+    assert checked["health_checks"] >= 1 and checked["health_failures"] == 0 and checked["size"] == 1
+    assert evicted["size"] == 0 and evicted["evicted"] == 1
+    assert threads <= before + 1  # only the maintenance thread is left, the evicted Client stopped its threads
@@ -0,0 +1,67 @@
+import os
+import socket
+import time
+
+import pytest
+
+import simplesockets.simple_sockets as s
+from tests.conftest import wait
+
+
+def echo_pid(client, data):
+    client.send(b'%d' % os.getpid())
+
+
+def test_launch_shared_listener():
+    group = s.TCPServer.launch(workers=2, reuse_port=False, port=0, on_receive=echo_pid)
+    port = group.port
+    try:
+        pids = set()
+        for i in range(10):
+            Client = s.TCPClient()
+            Client.setup("127.0.0.1", port)
+            assert Client.connect()
+            Client.send_data(b'pid')
+            pids.add(int(Client.recv_data().response))
+            Client.close()
+
+        assert pids <= set(group.pids)
+
+        worker = group.pids[0]
+        os.kill(worker, 9)
+        wait(lambda: group.restarts)
+        assert group.restarts == 1 and worker not in group.pids
+        assert len(group.return_exceptions()) == 1
+    finally:
+        group.close()
+
+
+def _pid(port: int) -> int:
+    deadline = time.monotonic() + 10
+    while True:  # the workers bind after they started
+        Client = s.TCPClient()
+        Client.setup("127.0.0.1", port)
+        if Client.connect():
+            break
+        Client.close()
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    Client.send_data(b'pid')
+    pid = int(Client.recv_data().response)
+    Client.close()
+    return pid
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT isn't available")
+def test_launch_reuse_port():
+    group = s.TCPServer.launch(workers=2, reuse_port=True, port=0, on_receive=echo_pid)
+    try:
+        assert group._listener is None and group.port != 0
+        pids = set()
+        for _ in range(100):  # the kernel hashes the connections, so both workers get some
+            pids.add(_pid(group.port))
+            if len(pids) == 2:
+                break
+        assert pids == set(group.pids)
+    finally:
+        group.close()
@@ -0,0 +1,136 @@
+import socket
+import time
+
+import pytest
+
+import simplesockets.secure_sockets as s
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.coalesce import Coalesce
+from simplesockets._support_files.reconnect import Reconnect
+from tests.conftest import wait
+
+
+def _listening_socket(port: int = 0) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    sock.listen(5)
+    return sock
+
+
+def test_backoff():
+    settings = Reconnect(initial_delay=0.1, max_delay=1.0, jitter=0.5)
+    delays = [settings.delay(attempt) for attempt in range(1, 8)]
+    assert 0.05 <= delays[0] <= 0.1 and 0.1 <= delays[1] <= 0.2
+    assert all(0.5 <= delay <= 1.0 for delay in delays[4:])
+
+    buffer = Reconnect(max_messages=2).buffer()
+    assert buffer.put(b'first') and buffer.put(bytearray(b'second')) and not buffer.put(b'third')
+    assert buffer.drain() == [b'first', b'second'] and buffer.dropped == 1 and buffer.size == 0
+
+
+@pytest.mark.parametrize("classes", [(TCPServer, TCPClient, {}), (s.SecureServer, s.SecureClient,
+                                                                    {"keysize": 1024})])
+def test_reconnect(classes):
+    server_class, client_class, kwargs = classes
+    received = []
+
+    def start_server(port: int = 0):
+        server = server_class()
+        server.setup(sock=_listening_socket(port), on_receive=lambda client, data: received.append(data.response),
+                     **kwargs)
+        server.start()
+        return server
+
+    def stop_server(server):
+        server.socket.shutdown(socket.SHUT_RDWR)  # the Server doesn't own a socket passed to `setup()`
+        server.close()
+
+    Server = start_server()
+    port = Server.socket.getsockname()[1]
+
+    Client = client_class()
+    Client.setup("127.0.0.1", port, reconnect=Reconnect(initial_delay=0.05, max_delay=0.2))
+    assert Client.connect()
+    Client.autorecv()
+    Client.send_data(b'before')
+    assert wait(lambda: received == [b'before'])
+
+    stop_server(Server)
+    assert wait(lambda: not Client.event.is_connected)
+    assert Client.send_data(b'during') and Client.send_data(b'outage')
+    cpu = time.process_time()
+    time.sleep(1)
+    cpu = time.process_time() - cpu  # the Client only tries to reconnect now and then
+
+    Server = start_server(port)
+    assert wait(lambda: Client.reconnects == 1)
+    Client.send_data(b'after')
+    assert wait(lambda: len(received) == 4)
+
+    Client.close()
+    stop_server(Server)
+
+    assert received == [b'before', b'during', b'outage', b'after']
+    assert Client.buffered == 0 and cpu < 0.3
+
+
+@pytest.mark.parametrize("classes", [(TCPServer, TCPClient, {}), (s.SecureServer, s.SecureClient,
+                                                                    {"keysize": 1024})])
+def test_reconnect_coalesced(classes):
+    server_class, client_class, kwargs = classes
+    received = []
+
+    def start_server(port: int = 0):
+        server = server_class()
+        server.setup(sock=_listening_socket(port), on_receive=lambda client, data: received.append(data.response),
+                     **kwargs)
+        server.start()
+        return server
+
+    Server = start_server()
+    port = Server.socket.getsockname()[1]
+
+    Client = client_class()
+    Client.setup("127.0.0.1", port, reconnect=Reconnect(initial_delay=0.05, max_delay=0.2),
+                 coalesce=Coalesce(max_delay=60))
+    assert Client.connect()
+    Client.autorecv()
+    assert Client.send_data(b'before') and Client.flush()
+    assert wait(lambda: received == [b'before'])
+
+    for number in range(3):  # they wait for the deadline when the connection is lost
+        assert Client.send_data(b'buffered %d' % number)
+    Server.socket.shutdown(socket.SHUT_RDWR)
+    Server.close()
+    assert wait(lambda: not Client.event.is_connected)
+    assert Client.send_data(b'during') and Client.flush()
+
+    Server = start_server(port)
+    assert wait(lambda: Client.reconnects == 1)
+    assert Client.send_data(b'after') and Client.flush()
+    assert wait(lambda: len(received) == 6)
+
+    Client.close()
+    Server.socket.shutdown(socket.SHUT_RDWR)
+    Server.close()
+
+    assert received == [b'before', b'buffered 0', b'buffered 1', b'buffered 2', b'during', b'after']
+
+
+def test_give_up():
+    Server = TCPServer()
+    Server.setup(port=0)
+    Server.start()
+
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], reconnect=Reconnect(initial_delay=0.01, max_attempts=3))
+    assert Client.connect()
+    Client.autorecv()
+    assert wait(lambda: Server.clients)  # `close()` only closes the connections which were accepted
+    Server.close()
+
+    assert wait(lambda: not Client.event.is_connected)
+    assert wait(lambda: not Client._lost)
+    assert Client.reconnects == 0 and not Client.event.is_connected
+    Client.close()
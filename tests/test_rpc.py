@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+import simplesockets.secure_sockets as s
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.dispatch import Dispatcher
+from simplesockets._support_files.error import RemoteError
+from tests.conftest import wait
+
+
+def test_pipelined_requests():
+    Server = TCPServer()
+    Server.setup(port=0, dispatcher=Dispatcher(4, ordered=False))
+    order = []
+
+    @Server.register_handler
+    def echo(client, request):
+        time.sleep(float(request.response))
+        order.append(request.response)
+        return request.response
+
+    Server.register_handler(lambda client, request: request.response.upper(), method="upper")
+    Server.start()
+
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    assert Client.connect()
+
+    futures = [Client.request(delay) for delay in (b'0.6', b'0.3', b'0.0')]
+    replies = [future.result(5).response for future in futures]
+    upper = Client.request(b'method', method="upper").result(5).response
+
+    Client.close()
+    Server.close()
+
+    assert replies == [b'0.6', b'0.3', b'0.0']
+    assert order == [b'0.0', b'0.3', b'0.6']  # the replies were send out of order
+    assert upper == b'METHOD'
+
+
+def test_request_errors():
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024)
+
+    @Server.register_handler
+    def handler(client, request):
+        if request.response == b'sleep':
+            time.sleep(1)
+        elif request.response == b'raise':
+            raise KeyError("missing")
+        return b'ok'
+
+    Server.start()
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    assert Client.connect()
+
+    with pytest.raises(TimeoutError):
+        Client.request(b'sleep', timeout=0.2).result(5)
+    with pytest.raises(RemoteError, match="missing"):
+        Client.request(b'raise').result(5)
+    with pytest.raises(RemoteError, match="unknown method"):
+        Client.request(b'', method="unknown").result(5)
+    reply = Client.request(b'', timeout=5).result(5).response  # the late reply of the first request is ignored
+
+    Client.close()
+    Server.close()
+
+    assert reply == b'ok'
+
+
+def test_timeout_thread_stops():
+    Server = TCPServer()
+    Server.setup(port=0, engine="selector")
+    Server.register_handler(lambda client, request: request.response)
+    Server.start()
+    before = threading.active_count()
+
+    for _ in range(5):
+        Client = TCPClient()
+        Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+        assert Client.connect()
+        assert Client.request(b'echo', timeout=30).result(5).response == b'echo'
+        assert Client.ping(30) > 0
+        Client.close()
+
+    wait(lambda: threading.active_count() <= before)
+    after = threading.active_count()
+    Server.close()
+
+    assert after <= before
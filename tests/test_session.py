@@ -0,0 +1,202 @@
+import socket
+import time
+
+import pytest
+
+import simplesockets.secure_sockets as s
+from simplesockets._support_files.error import AuthenticationError
+from simplesockets._support_files.ecdh import ServerKey
+from simplesockets._support_files.framing import HEADER
+from simplesockets._support_files.session import Session
+
+
+def test_session():
+    client = Session(b'k' * 32, b'salt', initiator=True)
+    server = Session(b'k' * 32, b'salt', initiator=False)
+
+    first = client.encrypt(b'message')
+    second = client.encrypt(b'message')
+    assert first != second  # every message gets its own nonce
+    assert server.decrypt(first) == b'message' and server.decrypt(second) == b'message'
+    assert client.decrypt(server.encrypt(bytearray(b'reply'))) == b'reply'
+
+    tampered = bytearray(client.encrypt(b'message'))
+    tampered[0] ^= 1
+    with pytest.raises(AuthenticationError):
+        server.decrypt(tampered)
+
+
+@pytest.mark.parametrize("framed", [True, False])
+def test_secure_exchange(framed):
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, framed=framed, on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], framed=framed)
+    assert Client.connect()
+
+    received = []
+    for message in (b'first', b'second', b'third'):
+        Client.send_data(message)
+        received.append(Client.recv_data().response)
+        time.sleep(0.05)  # the unframed protocol can't separate messages
+
+    Client.close()
+    Server.close()
+
+    assert received == [b'first', b'second', b'third']
+
+
+def test_key_file(tmp_path):
+    key_file = str(tmp_path / "server.pem")
+
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, key_file=key_file)
+    first = Server.privatekey
+    Server.close()
+
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, key_file=key_file, generate_in_background=True)
+    assert Server.wait_for_key(10)
+    Server.start()
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    connected = Client.connect()
+
+    Client.close()
+    Server.close()
+
+    assert connected and Server.privatekey == first
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_handshake_pool(engine):
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, engine=engine, handshake_timeout=0.5)
+    Server.start()
+    port = Server.socket.getsockname()[1]
+
+    stalled = socket.create_connection(("127.0.0.1", port))  # never answers the handshake
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", port)
+    start = time.monotonic()
+    connected = Client.connect()
+    duration = time.monotonic() - start
+
+    time.sleep(1)
+    stats = Server.handshake_stats()
+
+    Client.close()
+    stalled.close()
+    Server.close()
+
+    assert connected and duration < 0.5
+    assert stats["accepted"] == 2 and stats["completed"] == 1 and stats["timeouts"] == 1
+    assert stats["latency_p50_ms"] > 0
+
+
+def test_resumption():
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1])
+    received = []
+    resumed = []
+    for message in (b'full', b'resumed', b'again'):
+        assert Client.connect() if not received else Client.reconnect()
+        resumed.append(Client.resumed)
+        Client.send_data(message)
+        received.append(Client.recv_data().response)
+        Client.close()
+
+    Client.forget_ticket()
+    assert Client.reconnect()
+    resumed.append(Client.resumed)
+    Client.close()
+
+    stats = Server.handshake_stats()
+    Server.close()
+
+    assert received == [b'full', b'resumed', b'again']
+    assert resumed == [False, True, True, False]
+    assert stats["resumed"] == 2
+
+
+def test_x25519_handshake():
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+    port = Server.socket.getsockname()[1]
+
+    received = []
+    for handshake in ("x25519", "rsa"):  # both kinds of Clients at the same Server
+        Client = s.SecureClient()
+        Client.setup("127.0.0.1", port, handshake=handshake)
+        assert Client.connect()
+        Client.send_data(handshake.encode())
+        received.append(Client.recv_data().response)
+        Client.close()
+    Server.close()
+
+    Server = s.SecureServer()
+    Server.setup(port=0, handshakes=("x25519",))
+    Server.start()
+    port = Server.socket.getsockname()[1]
+
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", port, handshake="x25519")
+    ecdh_connected = Client.connect()
+    Client.close()
+    Client = s.SecureClient()
+    Client.setup("127.0.0.1", port)
+    rsa_connected = Client.connect()
+    Client.close()
+    Server.close()
+
+    assert received == [b'x25519', b'rsa']
+    assert Server.privatekey is None and ecdh_connected and not rsa_connected
+
+
+def test_handshake_deadline():
+    Server = s.SecureServer()
+    Server.setup(port=0, keysize=1024, handshake_workers=1, handshake_timeout=0.5)
+    Server.start()
+
+    dripping = socket.create_connection(("127.0.0.1", Server.socket.getsockname()[1]))
+    dripping.settimeout(5)
+    dripping.recv(4096)  # the public key
+    dripping.sendall(HEADER.pack(0, 256))  # announces the encrypted key, which never arrives completely
+    start = time.monotonic()
+    closed = False
+    while not closed and time.monotonic() - start < 3:
+        try:
+            dripping.send(b'\0')  # every byte restarts a timeout of a single recv
+            time.sleep(0.3)
+            dripping.setblocking(False)
+            try:
+                closed = dripping.recv(4096) == b''
+            except BlockingIOError:
+                pass
+            dripping.setblocking(True)
+        except OSError:
+            closed = True
+    duration = time.monotonic() - start
+    stats = Server.handshake_stats()
+
+    dripping.close()
+    Server.close()
+
+    assert closed and duration < 1.5
+    assert stats["timeouts"] == 1 and stats["failed"] == 0
+
+
+def test_server_key_lifetime():
+    ephemeral = ServerKey()
+    assert ephemeral.get()[1] != ephemeral.get()[1]  # a new key for every handshake by default
+    reused = ServerKey(lifetime=60)
+    assert reused.get()[1] == reused.get()[1]
@@ -0,0 +1,60 @@
+import socket
+
+import pytest
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets._support_files.sockopts import SocketOptions
+from tests.conftest import wait
+
+
+def test_presets():
+    options = SocketOptions.preset("bulk-throughput", keepidle=30)
+    assert options.sndbuf == 4 << 20 and options.keepidle == 30 and options.nodelay is False
+    assert SocketOptions.resolve("low-latency").nodelay is True and SocketOptions.resolve(None) is None
+    with pytest.raises(ValueError):
+        SocketOptions.preset("fast")
+    with pytest.raises(ValueError):
+        SocketOptions(sndbuf=-1)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    failed = SocketOptions(nodelay=True, keepalive=False, keepidle=10).apply(sock)
+    assert failed == [] and sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    sock.close()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    options = SocketOptions(nodelay=True, sndbuf=1 << 16)
+    state = lambda: (sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY),
+                     sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF))
+    options.apply(sock, connected=False)  # only the buffer sizes
+    before = state()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 14)
+    options.apply(sock, connected=True)  # only the options of the connection
+    after = state()
+    sock.close()
+    assert not before[0] and before[1] >= 1 << 16 and after[0] and after[1] < 1 << 16
+
+
+def test_applied():
+    Server = TCPServer()
+    Server.setup(port=0, socket_options="low-latency")
+    Server.start()
+
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1],
+                 socket_options=SocketOptions(nodelay=True, keepalive=True, keepcnt=3))
+    assert Client.connect()
+    assert wait(lambda: len(Server.clients) == 1)
+    accepted = list(Server.clients.values())[0].socket
+
+    listener_reuse = Server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+    server_options = (accepted.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY),
+                      accepted.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+    client_options = (Client.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY),
+                      Client.socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+    keepcnt = Client.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) if hasattr(socket, "TCP_KEEPCNT") \
+        else 3
+
+    Client.close()
+    Server.close()
+
+    assert listener_reuse and all(server_options) and all(client_options) and keepcnt == 3
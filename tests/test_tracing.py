@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from simplesockets.simple_sockets import TCPClient, TCPServer
+from simplesockets.secure_sockets import SecureClient, SecureServer
+from simplesockets._support_files.compression import Compression
+from simplesockets._support_files.tracing import Tracer
+from tests.conftest import wait
+
+
+def test_sampling():
+    hooked = []
+    tracer = Tracer(sample_rate=0.25, capacity=3, hooks=[hooked.append])
+    traces = [tracer.sample("recv") for _ in range(8)]
+    assert [trace is not None for trace in traces] == [False, False, False, True] * 2
+
+    for _ in range(2):
+        traces[3].lap("recv")
+        traces[7].lap("recv")
+    assert len(tracer) == 3 and tracer.recorded == 4 and len(hooked) == 4
+    assert [span.message for span in tracer.spans()] == [2, 1, 2]
+
+    with pytest.raises(ValueError):
+        Tracer(sample_rate=0)
+
+
+@pytest.mark.parametrize("engine", ["threaded", "selector"])
+def test_pipeline(engine, tmp_path):
+    tracer = Tracer()
+    Server = SecureServer()
+    Server.setup(port=0, engine=engine, handshakes=("x25519",), compression=Compression(), tracer=tracer,
+                 on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    Client = SecureClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], handshake="x25519", compression=Compression())
+    assert Client.connect()
+    tracer.clear()  # the spans of the handshake
+    Client.send_data(b'traced' * 100)
+    assert Client.recv_data().response == b'traced' * 100
+    assert wait(lambda: any(span.name == "on_receive" for span in tracer.spans()))
+
+    Client.close()
+    Server.close()
+
+    spans = tracer.spans()
+    received = [span.name for span in spans if span.pipeline == "recv"]
+    sent = [span.name for span in spans if span.pipeline == "send"]
+    assert received == ["recv", "decrypt", "decompress", "inbox", "event", "on_receive"]
+    assert sent == ["compress", "encrypt", "send"]
+    assert len({span.message for span in spans}) == 2 and all(span.duration >= 0 for span in spans)
+
+    path = tmp_path / "trace.json"
+    assert tracer.export_chrome(str(path)) == len(spans)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"} and events[0]["name"] == spans[0].name
+
+    path = tmp_path / "trace.jsonl"
+    assert tracer.export_jsonl(str(path)) == len(spans)
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == [span.name for span in spans]
+
+
+def test_client():
+    tracer = Tracer()
+    Server = TCPServer()
+    Server.setup(port=0, on_receive=lambda client, data: client.send(data.response))
+    Server.start()
+
+    received = []
+    Client = TCPClient()
+    Client.setup("127.0.0.1", Server.socket.getsockname()[1], tracer=tracer, on_receive=received.append)
+    assert Client.connect()
+    Client.autorecv()
+    Client.send_data(b'hello')
+    assert wait(lambda: len(tracer) == 5)
+
+    Client.close()
+    Server.close()
+
+    assert [(span.pipeline, span.name) for span in tracer.spans()] == [
+        ("send", "send"), ("recv", "recv"), ("recv", "on_receive"), ("recv", "inbox"), ("recv", "event")]